@@ -404,7 +404,7 @@ async def prepare_report_md(request: Request):
             if 'params' in analysis and analysis['params']:
                 p_vals = analysis['params']
                 p_errs = analysis.get('standard_errors', [0.0] * len(p_vals))
-                param_names = ['a', 'b', 'c', 'd', 'e']
+                param_names = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
                 
                 params_md = []
                 for i, (val, err) in enumerate(zip(p_vals, p_errs)):
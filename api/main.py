@@ -3,6 +3,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from api.routes.analyze import router as analyze_router
 from api.routes.ocr import router as ocr_router
 from api.routes.edit import router as edit_router
+from api.services.render_service import render_service
+from api.services.warmup_service import warmup_service, WARMUP_ON_STARTUP
+from api.services.storage_service import LOCAL_PLOTS_DIR
+from api.services.upload_queue import upload_queue
+from api.services.retention_service import plot_retention, GC_ENABLED
+from api.services.llm_client import llm_client
+from api.utils.curve_fitting import shutdown_fit_pool
+import asyncio
 import os
 from dotenv import load_dotenv
 
@@ -27,17 +35,65 @@ app.add_middleware(
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
+@app.on_event("startup")
+async def start_warmup():
+    # Run in the background: the server accepts connections immediately and
+    # /api/ready reports 503 until the warm-up has finished
+    if WARMUP_ON_STARTUP:
+        asyncio.get_running_loop().run_in_executor(None, warmup_service.run)
+    else:
+        warmup_service.skip()
+
+@app.on_event("startup")
+async def configure_llm_client():
+    # One Gemini configuration per process (model handles and connections are reused)
+    llm_client.configure()
+
+@app.on_event("startup")
+async def start_plot_gc():
+    # Scheduled retention sweeps of stored plot objects
+    if GC_ENABLED:
+        app.state.plot_gc_task = asyncio.create_task(plot_retention.run_forever())
+
+@app.on_event("shutdown")
+async def stop_plot_gc():
+    task = getattr(app.state, "plot_gc_task", None)
+    if task is not None:
+        task.cancel()
+
+@app.on_event("shutdown")
+async def shutdown_render_workers():
+    render_service.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_fit_workers():
+    shutdown_fit_pool()
+
+@app.on_event("shutdown")
+async def drain_upload_queue():
+    # Finish write-behind uploads whose URLs were already handed out
+    await upload_queue.drain()
+
 # Include routers
 app.include_router(analyze_router, prefix="/api")
 app.include_router(ocr_router, prefix="/api/ocr")
 app.include_router(edit_router, prefix="/api/edit")
 
-# Serve generated plots
-plots_dir = os.path.join(os.path.dirname(__file__), "static", "plots")
+# Serve generated plots (local storage backend writes here; FileResponse uses
+# the server's pathsend extension for zero-copy sends where available)
+plots_dir = LOCAL_PLOTS_DIR
 if not os.path.exists(plots_dir):
     os.makedirs(plots_dir)
 app.mount("/plots", StaticFiles(directory=plots_dir), name="plots")
 
+@app.middleware("http")
+async def immutable_plot_headers(request, call_next):
+    # Plot files are never rewritten under the same name, so browsers/CDN may cache them for a year
+    response = await call_next(request)
+    if request.url.path.startswith("/plots/") and response.status_code == 200:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
 static_dir = os.path.join(os.path.dirname(__file__), "static")
 
 # SPA Routing Support:
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from io import BytesIO
 import numpy as np
 import pandas as pd
 import sys
@@ -8,17 +9,153 @@ import os
 # Ensure utils are importable
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from api.utils.curve_fitting import smart_curve_fitting, equation_to_latex
+from api.utils.curve_fitting import smart_curve_fitting, equation_to_latex, validate_fit_options, DEFAULT_CV_FOLDS
 from api.utils.physics_formulas import get_recommended_formulas
 from api.utils.outlier_detection import remove_outliers
+from api.utils.derivatives import resolve_derivative_options, compute_derived_columns, constant_summary
 from api.services.ai_service import generate_ai_content
 from api.services.template_service import load_report_template
-from api.services.plot_service import generate_plot_base64, generate_residual_plot_base64, generate_plot_buffer, generate_residual_plot_buffer
-from api.services.storage_service import upload_plot_to_supabase
+from api.services.render_service import render_service
+from api.services.plot_cache import plot_cache, make_plot_key
+from api.services.plot_service import IMAGE_FORMATS, validate_renditions
+from api.services.storage_service import store_plot, object_index, object_name, get_storage_backend
+from api.services.upload_queue import upload_queue
+from api.services.retention_service import plot_retention
+from api.services.llm_cache import llm_cache
+from api.services.llm_scheduler import llm_scheduler
+from api.services.warmup_service import warmup_service
+from api.services.chart_spec import build_chart_spec, fit_grid
+import asyncio
+import json
 import uuid
 
 router = APIRouter()
 
+
+def _serialize_best_model(best_model, min_sig_figs, x_unit, y_unit):
+    """smart_curve_fitting 결과를 JSON 응답용 딕셔너리로 변환"""
+    latex_equation = equation_to_latex(best_model['equation'], best_model['params'])
+    return {
+        "name": best_model["name"],
+        "model_key": best_model["model_key"],
+        "r_squared": float(best_model["r_squared"]),
+        "adj_r_squared": float(best_model.get("adj_r_squared", best_model["r_squared"])),
+        "aic": float(best_model.get("aic", 0)),
+        "cv_error": float(best_model["cv_error"]) if best_model.get("cv_error") is not None else None,
+        "selection": best_model.get("selection", "penalty"),
+        "params": [float(p) for p in best_model["params"]],
+        "standard_errors": [float(se) for se in best_model.get("standard_errors", [])],
+        "equation": best_model["equation"],
+        "latex": latex_equation,
+        "trendline": best_model.get("trendline", []),
+        "min_sig_figs": min_sig_figs,
+        "x_unit": x_unit,
+        "y_unit": y_unit
+    }
+
+async def _cached_report_plots(params, combined=False, renditions=None, wait_for_upload=False, **render_kwargs):
+    """
+    회귀 + 잔차 그래프를 한 번의 렌더링으로 생성 (공유 x축 서브플롯)
+    combined=False: 두 패널을 잘라 각각 업로드 ('regression', 'residual')
+    combined=True: 합친 이미지 하나만 업로드 ('combined')
+    renditions: ('thumb', 'screen', 'print') 중 일부 - 한 번 구성한 figure를 해상도별로 래스터화
+    렌더링 입력의 해시가 캐시에 있으면 렌더링/업로드 없이 기존 URL 반환
+    이미지는 콘텐츠 해시(SHA-256) 이름으로 저장되어 같은 이미지는 다시 업로드하지 않음
+    wait_for_upload=False: URL을 바로 반환하고 업로드는 백그라운드 큐(write-behind)에서 재시도와 함께 처리
+
+    Returns:
+    - {rendition: {kind: URL}} (renditions가 없으면 {'screen': {...}})
+    """
+    render_kwargs['split'] = not combined
+    if renditions:
+        render_kwargs['renditions'] = tuple(renditions)
+    key = make_plot_key('combined', render_kwargs, params)
+    kinds = ('combined',) if combined else ('regression', 'residual')
+    names = tuple(renditions) if renditions else ('screen',)
+
+    urls = {name: {kind: plot_cache.get(f"{key}:{kind}@{name}") for kind in kinds} for name in names}
+    cached = [url for by_kind in urls.values() for url in by_kind.values()]
+    if all(url is not None for url in cached):
+        # 보존 기간 정리(GC)로 삭제된 객체를 가리키는 캐시 항목은 다시 렌더링
+        backend = get_storage_backend()
+        pending = upload_queue.pending_names()
+        missing = [object_name(url) for url in cached if object_name(url) not in pending]
+        if all(await asyncio.gather(*(asyncio.to_thread(backend.confirm, name) for name in missing))):
+            return urls
+
+    if renditions:
+        rendered = await render_service.render('renditions', **render_kwargs)
+    else:
+        rendered = {'screen': await render_service.render('combined', **render_kwargs)}
+
+    # 모든 이미지를 동시에 업로드 (동시 업로드 수는 storage_service에서 제한)
+    # 기본은 write-behind: 콘텐츠 해시로 URL을 미리 정하고 업로드 완료는 기다리지 않음
+    image_format = IMAGE_FORMATS[render_kwargs.get('fmt', 'png')]
+    store = store_plot if wait_for_upload else upload_queue.enqueue
+    uploads = []
+    for name, images in rendered.items():
+        if combined:
+            images = (images,)
+        for kind, image_bytes in zip(kinds, images):
+            uploads.append((name, kind, store(image_bytes, image_format['extension'], image_format['content_type'])))
+
+    uploaded = await asyncio.gather(*(upload for _, _, upload in uploads))
+    for (name, kind, _), url in zip(uploads, uploaded):
+        plot_cache.put(f"{key}:{kind}@{name}", url)
+        urls[name][kind] = url
+    return urls
+
+async def _ai_report_section(entry, template, template_content, csv_raw_data=None, regenerate=False, on_token=None):
+    """보고서 항목 하나의 AI 분석/고찰 섹션 생성 (그래프 플레이스홀더는 이미지 태그로 치환)"""
+    exp_name, analysis = entry["exp_name"], entry["analysis"]
+    x_vals, y_vals = entry["x_vals"], entry["y_vals"]
+    plot_url, res_url = entry["plot_url"], entry["res_url"]
+    ai_section = []
+
+    # 📊 원본 데이터 통계 계산 추가
+    raw_data_summary = None
+    if len(x_vals) > 0 and len(y_vals) > 0:
+        raw_data_summary = {
+            "count": int(len(x_vals)),
+            "x_min": float(np.min(x_vals)),
+            "x_max": float(np.max(x_vals)),
+            "y_min": float(np.min(y_vals)),
+            "y_max": float(np.max(y_vals)),
+            "y_mean": float(np.mean(y_vals)),
+            "y_std": float(np.std(y_vals))
+        }
+
+    # 🛠️ 템플릿 내 그래프 플레이스홀더를 실제 HTML 이미지 태그로 치환 (사이즈 조절 가능하도록)
+    processed_template = template_content
+    if processed_template:
+        # HTML 이미지 태그 (Supabase 공개 URL 사용)
+        img_html = f'<img src="{plot_url}" width="600" align="center" />' if plot_url else ""
+        res_html = f'<img src="{res_url}" width="600" align="center" />' if res_url else ""
+
+        # 다양한 플레이스홀더 패턴 대응
+        processed_template = processed_template.replace("![실험 그래프]({{graph_path}})", img_html)
+        processed_template = processed_template.replace("![잔차도]({{residual_path}})", res_html)
+        processed_template = processed_template.replace("{{graph_path}}", img_html)
+        processed_template = processed_template.replace("{{residual_path}}", res_html)
+        # 자유낙하 등 특정 템플릿 대응
+        processed_template = processed_template.replace("{{graph_trial1_05}}", img_html)
+
+    ai_section.append("")  # Blank line before AI section
+    ai_section.append(f"#### 📊 AI 실험 결과 분석 및 고찰 ({exp_name})")
+
+    ai_content = await generate_ai_content(exp_name, analysis, template, processed_template, raw_data_summary, csv_raw_data, regenerate=regenerate, on_token=on_token)
+
+    # 🖼️ AI 응답의 그래프 플레이스홀더를 실제 이미지로 치환 (Supabase URL 사용)
+    img_html = f'<img src="{plot_url}" width="600" align="center" />' if plot_url else ""
+    res_html = f'<img src="{res_url}" width="600" align="center" />' if res_url else ""
+
+    ai_content = ai_content.replace("{{GRAPH_REGRESSION}}", f"\n\n{img_html}\n\n")
+    ai_content = ai_content.replace("{{GRAPH_RESIDUAL}}", f"\n\n{res_html}\n\n")
+
+    ai_section.append(ai_content)
+    ai_section.append("")  # Blank line after AI section
+    return "\n\n".join(ai_section)
+
 @router.get("/analyze")
 async def analyze_get():
     """GET 요청 처리 (정보 제공)"""
@@ -42,6 +179,7 @@ async def analyze(request: Request):
         raw_y = data.get("raw_y", [])
         x_unit = data.get("x_unit", "")
         y_unit = data.get("y_unit", "")
+        y_err = data.get("y_err", None)  # Y 측정 불확도 (스칼라 또는 배열, 미분 불확도 전파용)
         
         if len(x_data) == 0 or len(y_data) == 0:
             return JSONResponse(status_code=400, content={"status": "error", "message": "Data cannot be empty"})
@@ -49,6 +187,11 @@ async def analyze(request: Request):
         if len(x_data) != len(y_data):
             return JSONResponse(status_code=400, content={"status": "error", "message": "X and Y data must have the same length"})
         
+        if y_err is not None:
+            y_err = np.array(y_err, dtype=float)
+            if y_err.ndim and len(y_err) != len(y_data):
+                return JSONResponse(status_code=400, content={"status": "error", "message": "y_err must be a scalar or match the length of Y data"})
+        
         # 유효숫자 계산 (Least Precise Rule)
         from api.utils.significant_figures import count_sig_figs, format_with_uncertainty
         
@@ -72,22 +215,31 @@ async def analyze(request: Request):
         remove_outliers_flag = options.get("remove_outliers", False)
         if remove_outliers_flag and len(x_data) >= 4:
             df_temp = pd.DataFrame({"x": x_data, "y": y_data})
+            if y_err is not None and y_err.ndim:
+                df_temp["y_err"] = y_err
             outlier_method = options.get("outlier_method", "iqr")
             outlier_multiplier = options.get("outlier_multiplier", 1.5)
             
             df_cleaned, outliers_removed = remove_outliers(df_temp, "y", method=outlier_method, multiplier=outlier_multiplier)
             x_data = df_cleaned["x"].values
             y_data = df_cleaned["y"].values
+            if "y_err" in df_cleaned:
+                y_err = df_cleaned["y_err"].values
         
         if len(x_data) < 2:
             return JSONResponse(status_code=400, content={"status": "error", "message": "Not enough data points after outlier removal"})
         
         # 회귀 분석
         manual_model = options.get("manual_model", None)
-        if manual_model:
-            best_model = smart_curve_fitting(x_data, y_data, models_to_try=[manual_model])
-        else:
-            best_model = smart_curve_fitting(x_data, y_data)
+        try:
+            fit_options = validate_fit_options(
+                options.get("multi_start", None), options.get("selection", "penalty"), options.get("cv_folds", DEFAULT_CV_FOLDS)
+            )
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+        # 피팅은 워커 스레드에서 실행 (다중 시작점 풀 대기 중에도 이벤트 루프는 다른 요청/스트림을 처리)
+        models_to_try = [manual_model] if manual_model else None
+        best_model = await asyncio.to_thread(smart_curve_fitting, x_data, y_data, models_to_try=models_to_try, **fit_options)
         
         if not best_model:
             return JSONResponse(status_code=500, content={"status": "error", "message": "Failed to fit any model"})
@@ -96,31 +248,59 @@ async def analyze(request: Request):
         y_pred = best_model['func'](x_data, *best_model['params'])
         residuals = (y_data - y_pred).tolist()
         
+        # 미분 파이프라인 (위치 → 속도 → 가속도 등): 도함수 열을 만들고 각각 피팅
+        derived = []
+        try:
+            derivative_options = resolve_derivative_options(options.get("derivatives", None))
+            if derivative_options:
+                x_sorted, columns = compute_derived_columns(x_data, y_data, derivative_options, y_err=y_err, x_unit=x_unit, y_unit=y_unit)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+        
+        if derivative_options:
+            for column in columns:
+                # 상수 열(예: 등가속도)은 평균 ± 불확도로 보고하고 직선만 피팅
+                # (잡음 섞인 상수에 감쇠 진동·구간별 모델이 선택되는 것 방지)
+                summary = constant_summary(x_sorted, column['y'], column['y_err'], window=column['window'])
+                models = ['linear'] if summary['is_constant'] else None
+                derived_fit = await asyncio.to_thread(smart_curve_fitting, x_sorted, column['y'], models_to_try=models, **fit_options)
+                derived.append({
+                    "order": column['order'],
+                    "unit": column['unit'],
+                    "method": derivative_options['method'],
+                    "x": x_sorted.tolist(),
+                    "y": column['y'].tolist(),
+                    "y_err": column['y_err'].tolist() if column['y_err'] is not None else None,
+                    "constant": summary if summary['is_constant'] else None,
+                    "best_model": _serialize_best_model(derived_fit, min_sig_figs, x_unit, column['unit']) if derived_fit else None
+                })
+        
+        # 차트 명세 (클라이언트 렌더링용): True 또는 {x_label, y_label, title, x_range, y_range, is_log}
+        chart_spec = None
+        chart_option = options.get("chart_spec", False)
+        if chart_option:
+            chart_option = chart_option if isinstance(chart_option, dict) else {}
+            chart_spec = build_chart_spec(
+                x_data, y_data, best_model['func'], best_model['params'],
+                x_label=chart_option.get("x_label", "X"),
+                y_label=chart_option.get("y_label", "Y"),
+                title=chart_option.get("title", ""),
+                x_unit=x_unit, y_unit=y_unit,
+                x_range=chart_option.get("x_range"),
+                y_range=chart_option.get("y_range"),
+                is_log=chart_option.get("is_log", False)
+            )
+        
         # 공식 추천
         df_for_formulas = pd.DataFrame({"x": x_data, "y": y_data})
         recommended_formulas = get_recommended_formulas(df_for_formulas)
         
-        # LaTeX 수식 생성
-        latex_equation = equation_to_latex(best_model['equation'], best_model['params'])
-        
         return JSONResponse(content={
             "status": "success",
-            "best_model": {
-                "name": best_model["name"],
-                "model_key": best_model["model_key"],
-                "r_squared": float(best_model["r_squared"]),
-                "adj_r_squared": float(best_model.get("adj_r_squared", best_model["r_squared"])),
-                "aic": float(best_model.get("aic", 0)),
-                "params": [float(p) for p in best_model["params"]],
-                "standard_errors": [float(se) for se in best_model.get("standard_errors", [])],
-                "equation": best_model["equation"],
-                "latex": latex_equation,
-                "trendline": best_model.get("trendline", []),
-                "min_sig_figs": min_sig_figs,
-                "x_unit": x_unit,
-                "y_unit": y_unit
-            },
+            "best_model": _serialize_best_model(best_model, min_sig_figs, x_unit, y_unit),
+            "derived": derived,
             "residuals": residuals,
+            "chart_spec": chart_spec,
             "recommended_formulas": recommended_formulas[:5],
             "data_info": {
                 "original_count": int(original_count),
@@ -131,191 +311,400 @@ async def analyze(request: Request):
     except Exception as e:
         return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
 
+def _report_options(body):
+    """
+    보고서 요청 본문 검증 및 옵션 정리
+
+    Raises:
+    - ValueError: 잘못된 요청 (400 응답용 메시지)
+    """
+    # 보고서는 배치 작업이므로 multi_start=True이면 'batch' 예산 사용
+    multi_start = body.get('multi_start', None)
+    if multi_start is True:
+        multi_start = 'batch'
+    # 그래프 인코딩: png(기본), png8(팔레트 최적화 PNG), webp(무손실), svg
+    image_format = body.get('image_format', 'png')
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image_format: {image_format}")
+    # 해상도별 그래프 (예: ["thumb", "screen", "print"]) - 없으면 화면용 한 가지만 생성
+    renditions = body.get('renditions', None)
+    if renditions:
+        renditions = validate_renditions(renditions, image_format)
+    if not body.get('items', []):
+        raise ValueError("No analysis items provided")
+    fit_options = validate_fit_options(multi_start, body.get('selection', 'penalty'), body.get('cv_folds', DEFAULT_CV_FOLDS))
+    return {
+        "template": body.get('template', 'none'),
+        "items": body.get('items', []),
+        "use_ai": body.get('use_ai', False),
+        # True면 AI 응답 캐시를 무시하고 새로 생성
+        "regenerate": bool(body.get('regenerate', False)),
+        "fit_options": fit_options,
+        "image_format": image_format,
+        # True면 회귀/잔차 패널을 합친 이미지 하나만 업로드 (잔차도 자리는 비움)
+        "combined_plot": bool(body.get('combined_plot', False)),
+        "renditions": renditions,
+        # True면 업로드 완료까지 기다린 뒤 응답 (기본: 백그라운드 업로드, /api/uploads에서 진행 상황 확인)
+        "wait_for_uploads": bool(body.get('wait_for_uploads', False)),
+        # True면 그래프를 렌더링/업로드하지 않고 클라이언트 렌더링용 차트 명세(charts)만 반환 (AI 고찰 생략)
+        "preview": bool(body.get('preview', False)),
+        # Get CSV raw data from request body (if provided by frontend)
+        "csv_raw_data": body.get('csv_raw_data', None)
+    }
+
+
+async def _no_emit(event, data):
+    pass
+
+
+async def _build_report(opts, emit=None):
+    """
+    보고서 생성 본체 - 진행 상황을 `await emit(event, data)`로 알림 (SSE 스트리밍용)
+
+    events: 'start', 'item' (표), 'plots' (그래프 URL), 'ai_token' (AI 응답 조각), 'ai_section' (완성된 AI 섹션),
+            'item_error' (항목 하나의 분석/그래프 실패 - 보고서에는 오류 안내가 대신 들어감)
+
+    Returns:
+    - dict: /prepare-report-md 응답 본문
+    """
+    # AI 응답은 알림을 받는 쪽이 있을 때만 스트리밍으로 요청
+    streaming = emit is not None
+    emit = emit or _no_emit
+    template, items = opts["template"], opts["items"]
+    image_format, renditions, preview = opts["image_format"], opts["renditions"], opts["preview"]
+    # 미리보기는 빠른 초안용이므로 AI 고찰(LLM 호출)은 생략
+    use_ai = opts["use_ai"] and not preview
+    plot_renditions = []
+    charts = []
+    report_id = uuid.uuid4().hex
+
+    print(f"DEBUG: prepare_report_md called with {len(items)} items, use_ai={use_ai}")
+    await emit("start", {"report_id": report_id, "items": len(items)})
+
+    md_content = ["# 물리 실험 보고서"]
+    if template and template != 'none':
+        md_content.append(f"## {template.replace('_', ' ')}")
+
+    template_content = load_report_template(template)
+
+    md_content.append("## 1. 실험 결과 및 분석")
+
+    # 항목 하나의 피팅 → 표 → 그래프 예약 (해당 항목이 없으면 None)
+    async def prepare_item(idx, item):
+        exp_name = item.get('experiment_name', f'실험 {idx+1}')
+        data = item.get('data', {})
+        x_label = item.get('x_label', 'X')
+        y_label = item.get('y_label', 'Y')
+        x_unit = item.get('x_unit', '')
+        y_unit = item.get('y_unit', '')
+        raw_x = item.get('raw_x', [])
+        raw_y = item.get('raw_y', [])
+
+        # Regression Data (Raw)
+        x_vals = np.array(data.get('x', []), dtype=float)
+        y_vals = np.array(data.get('y', []), dtype=float)
+
+        # Remove NaNs if any (prevent calculation failure)
+        mask = ~np.isnan(x_vals) & ~np.isnan(y_vals)
+        x_vals = x_vals[mask]
+        y_vals = y_vals[mask]
+
+        if len(x_vals) < 2:
+            return None
+
+        # 🛠️ ALWAYS use Python to recalculate analysis for the final report (Source of Truth)
+        # This ensures Step 3 is high-quality even if Step 2 was a fast frontend preview.
+        # 피팅은 워커 스레드에서 실행 (그동안 이벤트 루프는 그래프 업로드/스트리밍 이벤트 전송을 계속 처리)
+        analysis = await asyncio.to_thread(
+            smart_curve_fitting, x_vals, y_vals, **opts["fit_options"]
+        )
+        if not analysis:
+            return None
+
+        # 유효숫자 및 오차 전파 (Least Precise Rule)
+        from api.utils.significant_figures import count_sig_figs, format_with_uncertainty, format_value_sigfigs
+
+        min_sig_figs = 10
+        for val_list in [raw_x, raw_y]:
+            for v in val_list:
+                if v:
+                    try:
+                        count = count_sig_figs(str(v))
+                        if count > 0:
+                            min_sig_figs = min(min_sig_figs, count)
+                    except:
+                        pass
+        if min_sig_figs == 10: min_sig_figs = 3
+
+        analysis['min_sig_figs'] = min_sig_figs
+        analysis['x_unit'] = x_unit
+        analysis['y_unit'] = y_unit
+
+        # LaTeX 수식 생성
+        latex_equation = equation_to_latex(analysis['equation'], analysis['params'])
+
+        # Prediction for residuals
+        y_pred_vals = analysis['func'](x_vals, *analysis['params'])
+        residuals_vals = y_vals - y_pred_vals
+
+        item_md = [f"### 1.{idx+1}. {exp_name}", ""]  # Blank line before table
+
+        # Summary Table
+        table_rows = [
+            "| 항목 | 내용 |",
+            "| :--- | :--- |",
+            f"| 최적 모델 | {analysis.get('name', 'N/A')} |",
+            f"| 회귀 수식 | {latex_equation.replace('$', '')} |",
+            f"| 결정계수 (R²) | {analysis.get('r_squared', 0):.4f} |",
+            f"| X 단위 | {x_unit if x_unit else 'N/A'} |",
+            f"| Y 단위 | {y_unit if y_unit else 'N/A'} |",
+            f"| 유효숫자 기준 | {min_sig_figs} digits |"
+        ]
+
+        if 'params' in analysis and analysis['params']:
+            p_vals = analysis['params']
+            p_errs = analysis.get('standard_errors', [0.0] * len(p_vals))
+            # 수식과 같은 문자 (구간별 선형 3구간 = 6개 파라미터 a~f)
+            param_names = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+            # format_with_uncertainty uses sigfig-aware rounding for the error and value
+            params_md = [f"{param_names[i] if i < len(param_names) else f'p{i}'} = {format_with_uncertainty(v, e, sig_figs=2)}" for i, (v, e) in enumerate(zip(p_vals, p_errs))]
+            table_rows.append(f"| 추정 파라미터 | {', '.join(params_md)} |")
+
+        item_md.append("\n".join(table_rows))
+        item_md.append("")
+
+        # Extract settings from item if available (passed from Step 2)
+        # body.items structure: [{data, x_label, y_label, x_range, y_range, is_log_scale, ...}]
+        x_range = item.get('x_range')
+        y_range = item.get('y_range')
+        is_log = item.get('is_log_scale', False)
+
+        # 🖼️ Generate plots and upload to Supabase Storage (identical inputs reuse the cached URL)
+        # 모든 항목의 렌더링/업로드를 먼저 예약하고, 아래 단계에서 결과를 모아 본문을 완성
+        entry = {"index": idx, "exp_name": exp_name, "analysis": analysis, "x_vals": x_vals, "y_vals": y_vals,
+                 "plot_task": None, "plot_url": None, "res_url": None}
+        chart = None
+        if preview:
+            # 미리보기: 서버 렌더링 없이 차트 명세만 반환 (본문에는 그래프 링크를 넣지 않음 - 클라이언트가 charts로 그림)
+            chart = {
+                "id": f"chart-{idx}",
+                "index": idx,
+                "experiment_name": exp_name,
+                "spec": build_chart_spec(
+                    x_vals, y_vals, analysis['func'], analysis['params'],
+                    x_label=x_label, y_label=y_label, title=f"{exp_name} 회귀 분석",
+                    x_unit=x_unit, y_unit=y_unit, x_range=x_range, y_range=y_range, is_log=is_log
+                )
+            }
+            charts.append(chart)
+        else:
+            # 피팅 곡선은 정렬된 조밀 격자에서 계산 (비정렬/대용량 x에서도 매끄러운 선)
+            x_fit, y_fit = fit_grid(x_vals, analysis['func'], analysis['params'], is_log)
+
+            entry["plot_task"] = asyncio.create_task(_cached_report_plots(
+                analysis['params'], combined=opts["combined_plot"], renditions=renditions, wait_for_upload=opts["wait_for_uploads"],
+                x_data=x_vals, y_data=y_vals, y_pred=y_fit, x_fit=x_fit, residuals=residuals_vals,
+                x_label=x_label, y_label=y_label, title=f"{exp_name} 회귀 분석", residual_title=f"{exp_name} 잔차 분석",
+                x_range=x_range, y_range=y_range, is_log=is_log, fmt=image_format
+            ))
+        return entry, item_md, chart
+
+    report_items = []
+    for idx, item in enumerate(items):
+        exp_name = item.get('experiment_name', f'실험 {idx+1}')
+        try:
+            prepared = await prepare_item(idx, item)
+        except Exception as e:
+            # 한 항목의 피팅/차트 오류가 보고서 전체를 실패시키지 않음: 오류 안내로 대체
+            print(f"ERROR: Report item '{exp_name}' failed: {type(e).__name__}: {e}")
+            error_md = f"### 1.{idx+1}. {exp_name}\n\n> ⚠️ 분석 중 오류 발생: {e}"
+            md_content.append(error_md)
+            await emit("item_error", {"index": idx, "experiment_name": exp_name, "stage": "analysis", "message": str(e), "markdown": error_md})
+            continue
+        if prepared is None:
+            continue
+        entry, item_md, chart = prepared
+        md_content.extend(item_md)
+        await emit("item", {"index": idx, "experiment_name": exp_name, "markdown": "\n\n".join(item_md), "chart": chart})
+
+        # AI 고찰이 들어갈 자리 (항목 순서 유지)
+        entry["ai_slot"] = len(md_content)
+        md_content.append(None)
+        report_items.append(entry)
+
+    # 항목별로 그래프 완료 → AI 고찰 생성 순서로 진행 (모든 항목 동시 진행, 끝나는 대로 알림)
+    async def collect_plots(entry):
+        plot_urls = await entry["plot_task"]
+        # 본문에는 화면용 해상도 (없으면 요청된 첫 해상도) 사용
+        primary = plot_urls.get('screen') or next(iter(plot_urls.values()))
+        entry["plot_url"] = primary.get('combined') or primary.get('regression')
+        entry["res_url"] = primary.get('residual')
+        entry["plot_urls"] = plot_urls
+        await emit("plots", {
+            "index": entry["index"], "experiment_name": entry["exp_name"],
+            "plot_url": entry["plot_url"], "res_url": entry["res_url"], "renditions": plot_urls if renditions else None
+        })
+
+    # AI 고찰의 동시 요청 수는 ai_service에서 제한, 결과는 항목 순서대로 배치
+    async def ai_section(entry):
+        async def on_token(text):
+            await emit("ai_token", {"index": entry["index"], "text": text})
+        try:
+            section = await _ai_report_section(entry, template, template_content, opts["csv_raw_data"], opts["regenerate"],
+                                              on_token=on_token if streaming else None)
+        except Exception as e:
+            # 한 항목의 실패가 다른 항목의 결과를 잃게 하지 않음
+            section = f"#### 📊 AI 실험 결과 분석 및 고찰 ({entry['exp_name']})\n\nAI 내용 생성 중 오류 발생: {e}"
+        # 그래프 오류 안내가 있으면 그 뒤에 배치
+        note = md_content[entry["ai_slot"]]
+        md_content[entry["ai_slot"]] = f"{note}\n\n{section}" if note else section
+        await emit("ai_section", {"index": entry["index"], "experiment_name": entry["exp_name"], "markdown": section})
+
+    async def finish_item(entry):
+        if entry["plot_task"] is not None:
+            try:
+                await collect_plots(entry)
+            except Exception as e:
+                # 그래프 실패는 해당 항목에만 안내를 남기고 나머지(AI 고찰 포함)는 계속 진행
+                print(f"ERROR: Plots for '{entry['exp_name']}' failed: {type(e).__name__}: {e}")
+                entry["plot_task"] = None
+                note = f"> ⚠️ 그래프 생성 중 오류 발생: {e}"
+                md_content[entry["ai_slot"]] = note
+                await emit("item_error", {"index": entry["index"], "experiment_name": entry["exp_name"], "stage": "plots", "message": str(e), "markdown": note})
+        if use_ai:
+            await ai_section(entry)
+
+    await asyncio.gather(*(finish_item(entry) for entry in report_items))
+
+    plotted = [entry for entry in report_items if entry["plot_task"] is not None]
+    report_plot_urls = []
+    for entry in plotted:
+        if renditions:
+            plot_renditions.append({"experiment_name": entry["exp_name"], "urls": entry["plot_urls"]})
+        report_plot_urls.extend(url for by_kind in entry["plot_urls"].values() for url in by_kind.values())
+    # Capture the first plot URL to return for context usage
+    first_plot_url = plotted[0]["plot_url"] if plotted else None
+
+    # 보고서가 참조하는 그래프 객체 기록 (보존 기간/참조 수 기반 GC)
+    if report_plot_urls:
+        await asyncio.to_thread(plot_retention.record, report_id, report_plot_urls)
+
+    md_content = [chunk for chunk in md_content if chunk is not None]
+    final_markdown = "\n\n".join(md_content)
+    print(f"DEBUG: Report generated successfully. Total length: {len(final_markdown)} chars")
+
+    return {
+        "status": "success",
+        "report_id": report_id,
+        "markdown": final_markdown,
+        "plot_url": first_plot_url,
+        "charts": charts,
+        "renditions": plot_renditions
+    }
+
+
 @router.post("/prepare-report-md")
 async def prepare_report_md(request: Request):
     """여러 분석 항목을 하나의 마크다운 보고서 초안으로 병합하며 그래프 이미지를 Base64로 포함합니다."""
     try:
         body = await request.json()
-        template = body.get('template', 'none')
-        items = body.get('items', [])
-        use_ai = body.get('use_ai', False)
-        
-        print(f"DEBUG: prepare_report_md called with {len(items)} items, use_ai={use_ai}")
-        
-        if not items:
-            return JSONResponse(status_code=400, content={"status": "error", "message": "No analysis items provided"})
-
-        md_content = ["# 물리 실험 보고서"]
-        if template and template != 'none':
-            md_content.append(f"## {template.replace('_', ' ')}")
-        
-        template_content = load_report_template(template)
-        
-        template_content = load_report_template(template)
-
-        md_content.append("## 1. 실험 결과 및 분석")
-        
-        for idx, item in enumerate(items):
-            exp_name = item.get('experiment_name', f'실험 {idx+1}')
-            data = item.get('data', {})
-            x_label = item.get('x_label', 'X')
-            y_label = item.get('y_label', 'Y')
-            x_unit = item.get('x_unit', '')
-            y_unit = item.get('y_unit', '')
-            raw_x = item.get('raw_x', [])
-            raw_y = item.get('raw_y', [])
-            
-            # Regression Data (Raw)
-            x_vals = np.array(data.get('x', []), dtype=float)
-            y_vals = np.array(data.get('y', []), dtype=float)
-            
-            # Remove NaNs if any (prevent calculation failure)
-            mask = ~np.isnan(x_vals) & ~np.isnan(y_vals)
-            x_vals = x_vals[mask]
-            y_vals = y_vals[mask]
-
-            if len(x_vals) < 2:
-                continue
-
-            # 🛠️ ALWAYS use Python to recalculate analysis for the final report (Source of Truth)
-            # This ensures Step 3 is high-quality even if Step 2 was a fast frontend preview.
-            analysis = smart_curve_fitting(x_vals, y_vals)
-            if not analysis:
-                continue
-            
-            # 유효숫자 및 오차 전파 (Least Precise Rule)
-            from api.utils.significant_figures import count_sig_figs, format_with_uncertainty, format_value_sigfigs
-            
-            min_sig_figs = 10
-            for val_list in [raw_x, raw_y]:
-                for v in val_list:
-                    if v:
-                        try:
-                            count = count_sig_figs(str(v))
-                            if count > 0:
-                                min_sig_figs = min(min_sig_figs, count)
-                        except:
-                            pass
-            if min_sig_figs == 10: min_sig_figs = 3
-            
-            analysis['min_sig_figs'] = min_sig_figs
-            analysis['x_unit'] = x_unit
-            analysis['y_unit'] = y_unit
-                
-            # LaTeX 수식 생성
-            latex_equation = equation_to_latex(analysis['equation'], analysis['params'])
-            
-            # Prediction for plotting
-            y_pred_vals = analysis['func'](x_vals, *analysis['params'])
-            residuals_vals = y_vals - y_pred_vals
-            
-            md_content.append(f"### 1.{idx+1}. {exp_name}")
-            md_content.append("")  # Blank line before table
-            
-            # Summary Table
-            table_rows = [
-                "| 항목 | 내용 |",
-                "| :--- | :--- |",
-                f"| 최적 모델 | {analysis.get('name', 'N/A')} |",
-                f"| 회귀 수식 | {latex_equation.replace('$', '')} |",
-                f"| 결정계수 (R²) | {analysis.get('r_squared', 0):.4f} |",
-                f"| X 단위 | {x_unit if x_unit else 'N/A'} |",
-                f"| Y 단위 | {y_unit if y_unit else 'N/A'} |",
-                f"| 유효숫자 기준 | {min_sig_figs} digits |"
-            ]
-            
-            if 'params' in analysis and analysis['params']:
-                p_vals = analysis['params']
-                p_errs = analysis.get('standard_errors', [0.0] * len(p_vals))
-                param_names = ['a', 'b', 'c', 'd', 'e']
-                # format_with_uncertainty uses sigfig-aware rounding for the error and value
-                params_md = [f"{param_names[i] if i < 5 else f'p{i}'} = {format_with_uncertainty(v, e, sig_figs=2)}" for i, (v, e) in enumerate(zip(p_vals, p_errs))]
-                table_rows.append(f"| 추정 파라미터 | {', '.join(params_md)} |")
-            
-            md_content.append("\n".join(table_rows))
-            md_content.append("")
-            
-            # Extract settings from item if available (passed from Step 2)
-            # body.items structure: [{data, x_label, y_label, x_range, y_range, is_log_scale, ...}]
-            x_range = item.get('x_range')
-            y_range = item.get('y_range')
-            is_log = item.get('is_log_scale', False)
-
-            # 🖼️ Generate plots and upload to Supabase Storage
-            plot_filename = f"report_graph_{uuid.uuid4()}.png"
-            res_filename = f"report_residual_{uuid.uuid4()}.png"
-            
-            # Generate plot buffers
-            plot_buffer = generate_plot_buffer(x_vals, y_vals, y_pred_vals, x_label, y_label, f"{exp_name} 회귀 분석", x_range=x_range, y_range=y_range, is_log=is_log)
-            res_buffer = generate_residual_plot_buffer(x_vals, residuals_vals, x_label, y_label, f"{exp_name} 잔차 분석", x_range=x_range)
-            
-            # Upload to Supabase and get public URLs
-            plot_url = upload_plot_to_supabase(plot_buffer, plot_filename)
-            res_url = upload_plot_to_supabase(res_buffer, res_filename)
-            
-            # Capture the first plot URL to return for context usage
-            if 'first_plot_url' not in locals():
-                first_plot_url = plot_url
-            
-            # AI Discussion
-            if use_ai:
-                # 📊 원본 데이터 통계 계산 추가
-                raw_data_summary = None
-                if len(x_vals) > 0 and len(y_vals) > 0:
-                    raw_data_summary = {
-                        "count": int(len(x_vals)),
-                        "x_min": float(np.min(x_vals)),
-                        "x_max": float(np.max(x_vals)),
-                        "y_min": float(np.min(y_vals)),
-                        "y_max": float(np.max(y_vals)),
-                        "y_mean": float(np.mean(y_vals)),
-                        "y_std": float(np.std(y_vals))
-                    }
-
-                # 🛠️ 템플릿 내 그래프 플레이스홀더를 실제 HTML 이미지 태그로 치환 (사이즈 조절 가능하도록)
-                processed_template = template_content
-                if processed_template:
-                    # HTML 이미지 태그 (Supabase 공개 URL 사용)
-                    img_html = f'<img src="{plot_url}" width="600" align="center" />'
-                    res_html = f'<img src="{res_url}" width="600" align="center" />'
-                    
-                    # 다양한 플레이스홀더 패턴 대응
-                    processed_template = processed_template.replace("![실험 그래프]({{graph_path}})", img_html)
-                    processed_template = processed_template.replace("![잔차도]({{residual_path}})", res_html)
-                    processed_template = processed_template.replace("{{graph_path}}", img_html)
-                    processed_template = processed_template.replace("{{residual_path}}", res_html)
-                    # 자유낙하 등 특정 템플릿 대응
-                    processed_template = processed_template.replace("{{graph_trial1_05}}", img_html)
-
-                md_content.append("")  # Blank line before AI section
-                md_content.append(f"#### 📊 AI 실험 결과 분석 및 고찰 ({exp_name})")
-                
-                # Get CSV raw data from request body (if provided by frontend)
-                csv_raw_data = body.get('csv_raw_data', None)
-                
-                ai_content = await generate_ai_content(exp_name, analysis, template, processed_template, raw_data_summary, csv_raw_data)
-                
-                # 🖼️ AI 응답의 그래프 플레이스홀더를 실제 이미지로 치환 (Supabase URL 사용)
-                img_html = f'<img src="{plot_url}" width="600" align="center" />'
-                res_html = f'<img src="{res_url}" width="600" align="center" />'
-                
-                ai_content = ai_content.replace("{{GRAPH_REGRESSION}}", f"\n\n{img_html}\n\n")
-                ai_content = ai_content.replace("{{GRAPH_RESIDUAL}}", f"\n\n{res_html}\n\n")
-                
-                md_content.append(ai_content)
-                md_content.append("")  # Blank line after AI section
-
-        final_markdown = "\n\n".join(md_content)
-        print(f"DEBUG: Report generated successfully. Total length: {len(final_markdown)} chars")
-        
-        return JSONResponse(content={
-            "status": "success", 
-            "markdown": final_markdown,
-            "plot_url": locals().get('first_plot_url', None)
-        })
+        try:
+            opts = _report_options(body)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+        return JSONResponse(content=await _build_report(opts))
     except Exception as e:
         return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
 
+
+def _sse(event, data):
+    """Server-Sent Events 메시지 한 개"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/prepare-report-md/stream")
+async def prepare_report_md_stream(request: Request):
+    """
+    /prepare-report-md의 스트리밍 버전 (text/event-stream)
+
+    항목별 표('item'), 그래프 URL('plots'), AI 응답 조각('ai_token')과 완성된 AI 섹션('ai_section')을
+    준비되는 즉시 전송하고, 마지막에 전체 응답 본문('done') 또는 'error'를 보냅니다.
+    항목 하나의 피팅/그래프 실패는 'item_error'로 알리고 나머지 항목은 계속 진행합니다.
+    'ai_token'은 원문 그대로이며 그래프 플레이스홀더 치환은 'ai_section'에 반영됩니다.
+    """
+    try:
+        body = await request.json()
+        opts = _report_options(body)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+    events = asyncio.Queue()
+
+    async def emit(event, data):
+        await events.put((event, data))
+
+    async def run():
+        try:
+            await emit("done", await _build_report(opts, emit))
+        except Exception as e:
+            await emit("error", {"status": "error", "message": str(e)})
+        finally:
+            await events.put(None)
+
+    async def stream():
+        task = asyncio.create_task(run())
+        try:
+            while (message := await events.get()) is not None:
+                yield _sse(*message)
+        finally:
+            # 클라이언트 연결이 끊기면 남은 작업 취소
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @router.get("/health")
 async def health():
     return {"status": "healthy", "service": "analysis"}
+
+@router.get("/ready")
+async def ready():
+    """
+    준비 상태 확인 (startup warm-up 완료 전에는 503 - readiness/startup probe용)
+    필수 단계가 실패한 상태면 실패한 단계를 백그라운드에서 다시 시도 (다음 probe에서 반영)
+    """
+    if warmup_service.status == 'failed':
+        asyncio.get_running_loop().run_in_executor(None, warmup_service.run)
+    report = warmup_service.report()
+    if not warmup_service.ready:
+        return JSONResponse(status_code=503, content=report)
+    return report
+
+@router.get("/metrics")
+async def metrics():
+    """렌더링 큐 깊이 및 지연 시간 등 서비스 지표"""
+    return {
+        "render": render_service.metrics(),
+        "plot_cache": plot_cache.metrics(),
+        "storage": {"backend": get_storage_backend().name, **object_index.metrics()},
+        "uploads": upload_queue.metrics(),
+        "retention": plot_retention.metrics(),
+        "llm_cache": llm_cache.metrics(),
+        "llm": llm_scheduler.metrics()
+    }
+
+@router.get("/uploads")
+async def uploads():
+    """백그라운드(write-behind) 업로드 상태 - 대기 중인 업로드와 최근 실패 목록"""
+    return upload_queue.status()
+
+@router.delete("/reports/{report_id}/plots")
+async def release_report_plots(report_id: str):
+    """보고서의 그래프 참조 해제 - 다른 보고서가 참조하지 않는 객체는 다음 GC 때 삭제"""
+    released = await asyncio.to_thread(plot_retention.release, report_id)
+    if not released:
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Unknown report: {report_id}"})
+    return {"status": "success", "released": released}
@@ -25,7 +25,8 @@ async def generate_new_section(request: Request):
         "prompt": "오차 원인 분석 추가",
         "context_before": "...",
         "context_after": "...",
-        "report_context": {...}  # optional
+        "report_context": {...},  # optional
+        "regenerate": false  # optional - bypass the response cache
     }
     
     Response:
@@ -52,7 +53,8 @@ async def generate_new_section(request: Request):
             prompt=prompt,
             context_before=context_before,
             context_after=context_after,
-            report_context=report_context
+            report_context=report_context,
+            regenerate=bool(body.get("regenerate", False))
         )
         
         return JSONResponse(content={
@@ -78,7 +80,8 @@ async def modify_existing_section(request: Request):
         "instruction": "더 학술적으로 수정",
         "context_before": "...",
         "context_after": "...",
-        "report_context": {...}  # optional
+        "report_context": {...},  # optional
+        "regenerate": false  # optional - bypass the response cache
     }
     
     Response:
@@ -108,7 +111,8 @@ async def modify_existing_section(request: Request):
             instruction=instruction,
             context_before=context_before,
             context_after=context_after,
-            report_context=report_context
+            report_context=report_context,
+            regenerate=bool(body.get("regenerate", False))
         )
         
         return JSONResponse(content={
@@ -132,7 +136,8 @@ async def rewrite_text_endpoint(request: Request):
     {
         "text": "원본 텍스트...",
         "prompt": "학술적으로 수정해주세요" | null,
-        "preset": "formal" | "concise" | "expand" | "grammar" | null
+        "preset": "formal" | "concise" | "expand" | "grammar" | null,
+        "regenerate": false  # optional - bypass the response cache
     }
     
     Either prompt or preset is required
@@ -160,7 +165,7 @@ async def rewrite_text_endpoint(request: Request):
                 content={"status": "error", "message": "Either prompt or preset is required"}
             )
         
-        result = await rewrite_text(text, prompt)
+        result = await rewrite_text(text, prompt, regenerate=bool(body.get("regenerate", False)))
         
         return JSONResponse(content={
             "status": "success",
@@ -2,7 +2,7 @@
 OCR API Routes
 Handles image upload and conversion to CSV using Gemini Vision
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import JSONResponse
 import sys
 import os
@@ -16,11 +16,11 @@ router = APIRouter()
 
 
 @router.post("/upload")
-async def upload_image_for_ocr(file: UploadFile = File(...)):
+async def upload_image_for_ocr(file: UploadFile = File(...), regenerate: bool = Form(False)):
     """
     Upload an image and convert to CSV using Gemini Vision AI
     
-    Request: multipart/form-data with image file
+    Request: multipart/form-data with image file (optional regenerate=true bypasses the response cache)
     Response: {
         "status": "success",
         "csv_data": str,
@@ -49,7 +49,7 @@ async def upload_image_for_ocr(file: UploadFile = File(...)):
             )
         
         # Process image with Gemini Vision AI
-        result = await process_image_to_csv_with_gemini(image_bytes)
+        result = await process_image_to_csv_with_gemini(image_bytes, regenerate=regenerate)
         
         return JSONResponse(content={
             "status": "success",
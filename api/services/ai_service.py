@@ -1,20 +1,42 @@
+import asyncio
 import os
-import google.generativeai as genai
 import re
 
+from api.services.llm_client import llm_client
+from api.services.llm_scheduler import PRIORITY_REPORT
 
-async def generate_ai_content(exp_name, analysis, template_id, template_content=None, raw_data_summary=None, csv_data=None):
+# Maximum number of report generations sent to the model at once (process-wide)
+AI_CONCURRENCY = int(os.getenv("AI_CONCURRENCY", "4"))
+
+_generation_slots = None
+
+# 유니코드 특수 달러 기호들 (수식 구분자로는 일반 $만 인식됨)
+DOLLAR_VARIANTS = [
+    '\uFF04',  # Fullwidth Dollar Sign (＄)
+    '\uFE69',  # Small Dollar Sign (﹩)
+    '\U0001F4B2',  # Heavy Dollar Sign (💲)
+]
+
+
+def _normalize_dollars(text):
+    """특수 달러 기호를 정규 $ (U+0024)로 치환"""
+    for variant in DOLLAR_VARIANTS:
+        text = text.replace(variant, '$')
+    return text
+
+
+async def generate_ai_content(exp_name, analysis, template_id, template_content=None, raw_data_summary=None, csv_data=None, regenerate=False, on_token=None):
+    """
+    실험 항목 하나의 AI 보고서 초안 생성
+
+    on_token: 지정하면 응답을 스트리밍으로 받아 조각마다 `await on_token(text)` 호출
+    (반환값은 스트리밍 여부와 관계없이 완성된 전체 텍스트)
+    """
     # Load API key at runtime, not at import time
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    if not GOOGLE_API_KEY:
+    if not llm_client.available:
         return "AI API 키가 설정되지 않아 내용을 생성할 수 없습니다."
     
-    # --- [AI API LOGIC - NOW ACTIVE] ---
-    genai.configure(api_key=GOOGLE_API_KEY)
-    
     try:
-        model = genai.GenerativeModel('gemini-3-pro-preview')
-        
         # Build prompt using template if available
         template_context = ""
         if template_content:
@@ -52,7 +74,7 @@ async def generate_ai_content(exp_name, analysis, template_id, template_content=
         if 'params' in analysis:
             p_vals = analysis.get('params', [])
             p_errs = analysis.get('standard_errors', [0.0] * len(p_vals))
-            p_names = ['a', 'b', 'c', 'd', 'e']
+            p_names = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
             for i, (v, e) in enumerate(zip(p_vals, p_errs)):
                 n = p_names[i] if i < len(p_names) else f"p{i}"
                 # Use scientific formatting for uncertainties
@@ -137,7 +159,19 @@ async def generate_ai_content(exp_name, analysis, template_id, template_content=
 지금부터 위 지침을 완벽히 숙지하고 보고서 초안 작성을 시작하십시오.
 """
         
-        response = await model.generate_content_async(prompt)
+        # 동일한 프롬프트는 응답 캐시에서 반환 (regenerate=True면 새로 생성)
+        global _generation_slots
+        if _generation_slots is None:
+            _generation_slots = asyncio.Semaphore(AI_CONCURRENCY)
+        async with _generation_slots:
+            if on_token is not None:
+                chunks = []
+                async for chunk in llm_client.stream(prompt, regenerate=regenerate, priority=PRIORITY_REPORT):
+                    chunk = _normalize_dollars(chunk)
+                    chunks.append(chunk)
+                    await on_token(chunk)
+                return "".join(chunks) if chunks else "AI 응답이 생성되지 않았습니다."
+            response = await llm_client.generate(prompt, regenerate=regenerate, priority=PRIORITY_REPORT)
         
         # Check if response was blocked or has no text
         if not response.text:
@@ -152,17 +186,7 @@ async def generate_ai_content(exp_name, analysis, template_id, template_content=
             return error_msg
         
         # 🔧 후처리: 특수 달러 기호를 정규 $ (U+0024)로 치환
-        result_text = response.text
-        # 유니코드 특수 달러 기호들을 일반 $로 치환
-        dollar_variants = [
-            '\uFF04',  # Fullwidth Dollar Sign (＄)
-            '\uFE69',  # Small Dollar Sign (﹩)
-            '\U0001F4B2',  # Heavy Dollar Sign (💲)
-        ]
-        for variant in dollar_variants:
-            result_text = result_text.replace(variant, '$')
-        
-        return result_text
+        return _normalize_dollars(response.text)
     except Exception as e:
         error_str = str(e)
         if "429" in error_str or "quota" in error_str.lower():
@@ -0,0 +1,80 @@
+"""
+Chart Spec Service
+Builds a declarative, client-renderable description of the regression and
+residual charts (data, fit grid, residuals, axes) so previews skip server rendering.
+"""
+import numpy as np
+
+from api.utils.downsampling import downsample
+
+CHART_SPEC_VERSION = 1
+
+# Number of points on the fitted-curve grid (charts and rendered report plots)
+FIT_GRID_POINTS = 400
+
+# Series longer than this are downsampled (LTTB) before being sent to the client
+CHART_MAX_POINTS = 2000
+
+
+def fit_grid(x_data, func, params, is_log=False, n_points=FIT_GRID_POINTS):
+    """
+    Sorted dense grid over the data range and the fitted curve evaluated on it
+    (geometric spacing on log axes so the curve stays smooth there).
+    """
+    x = np.asarray(x_data, dtype=float)
+    if is_log and np.min(x) > 0:
+        x_fit = np.geomspace(np.min(x), np.max(x), n_points)
+    else:
+        x_fit = np.linspace(np.min(x), np.max(x), n_points)
+    return x_fit, np.asarray(func(x_fit, *params), dtype=float)
+
+
+def _axis_range(value):
+    """[min, max] override with '' / None meaning auto → [float | None, float | None] or None."""
+    if not value or len(value) != 2:
+        return None
+    return [None if v in ["", None] else float(v) for v in value]
+
+
+def _series(x, y, max_points):
+    x_out, y_out = downsample(x, y, max_points)
+    # JSON has no NaN/Inf: non-finite values become null gaps
+    return {
+        "x": [float(v) for v in x_out],
+        "y": [float(v) if np.isfinite(v) else None for v in y_out]
+    }
+
+
+def build_chart_spec(x_data, y_data, func, params, x_label='X', y_label='Y', title='', x_unit='', y_unit='',
+                     x_range=None, y_range=None, is_log=False, max_points=CHART_MAX_POINTS):
+    """
+    회귀/잔차 차트 명세 생성 (클라이언트 렌더링용)
+
+    Returns:
+    - dict: {'version', 'title', 'axes', 'series': {'data', 'fit', 'residuals'}, 'point_count', 'downsampled'}
+    """
+    x = np.asarray(x_data, dtype=float)
+    y = np.asarray(y_data, dtype=float)
+    residuals = y - np.asarray(func(x, *params), dtype=float)
+    x_fit, y_fit = fit_grid(x, func, params, is_log)
+
+    # 로그 축은 모든 값이 양수일 때만 적용 (서버 렌더링과 동일한 규칙)
+    x_log = bool(is_log and np.all(x > 0))
+    y_log = bool(is_log and np.all(y > 0))
+
+    return {
+        "version": CHART_SPEC_VERSION,
+        "title": title,
+        "axes": {
+            "x": {"label": x_label, "unit": x_unit, "range": _axis_range(x_range), "scale": "log" if x_log else "linear"},
+            "y": {"label": y_label, "unit": y_unit, "range": _axis_range(y_range), "scale": "log" if y_log else "linear"},
+            "residual_y": {"label": f"{y_label} 잔차", "unit": y_unit, "range": None, "scale": "linear"}
+        },
+        "series": {
+            "data": _series(x, y, max_points),
+            "fit": _series(x_fit, y_fit, max_points),
+            "residuals": _series(x, residuals, max_points)
+        },
+        "point_count": int(len(x)),
+        "downsampled": bool(len(x) > max_points)
+    }
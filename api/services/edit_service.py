@@ -2,9 +2,7 @@
 Unified AI Text Editing Service
 Combines simple rewrite and context-aware generation/modification
 """
-import os
-import google.generativeai as genai
-
+from api.services.llm_client import llm_client
 
 
 # Preset prompts for quick rewrite access
@@ -16,7 +14,7 @@ PRESET_PROMPTS = {
 }
 
 
-async def rewrite_text(text: str, prompt: str, context_before: str = "", context_after: str = "") -> str:
+async def rewrite_text(text: str, prompt: str, context_before: str = "", context_after: str = "", regenerate: bool = False) -> str:
     """
     Rewrite text using Gemini AI with custom prompt and optional context
     
@@ -25,20 +23,15 @@ async def rewrite_text(text: str, prompt: str, context_before: str = "", context
         prompt: User's instruction for how to rewrite
         context_before: Optional previous paragraph(s) for context
         context_after: Optional following paragraph(s) for context
+        regenerate: Bypass the response cache and ask the model again
     
     Returns:
         Rewritten text
     """
-    # Configure API at runtime, not import time
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    if not GOOGLE_API_KEY:
+    if not llm_client.available:
         raise Exception("GOOGLE_API_KEY 환경변수가 설정되지 않았습니다.")
     
-    genai.configure(api_key=GOOGLE_API_KEY)
-    
     try:
-        model = genai.GenerativeModel('gemini-3-pro-preview')
-        
         context_section = ""
         if context_before or context_after:
             context_section = f"""
@@ -58,7 +51,7 @@ async def rewrite_text(text: str, prompt: str, context_before: str = "", context
 
 수정된 텍스트:"""
 
-        response = model.generate_content(full_prompt)
+        response = await llm_client.generate(full_prompt, regenerate=regenerate)
         
         if response.text:
             return response.text.strip()
@@ -73,20 +66,16 @@ async def generate_section(
     prompt: str,
     context_before: str = "",
     context_after: str = "",
-    report_context: dict = None
+    report_context: dict = None,
+    regenerate: bool = False
 ) -> str:
     """
     Generate a new section/paragraph based on user prompt
     """
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    if not GOOGLE_API_KEY:
+    if not llm_client.available:
         raise Exception("GOOGLE_API_KEY 환경변수가 설정되지 않았습니다.")
     
-    genai.configure(api_key=GOOGLE_API_KEY)
-    
     try:
-        model = genai.GenerativeModel('gemini-3-pro-preview')
-        
         ai_prompt = f"""당신은 물리학 실험 보고서 작성 전문가입니다.
 
 [컨텍스트]
@@ -100,7 +89,7 @@ async def generate_section(
 마크다운 형식으로 작성하되, 수식이 필요한 경우 LaTeX 문법을 사용하세요 (예: $R^2$, $E=mc^2$).
 """
         
-        response = model.generate_content(ai_prompt)
+        response = await llm_client.generate(ai_prompt, regenerate=regenerate)
         
         if not response.text:
             return "AI 응답을 생성할 수 없습니다."
@@ -118,7 +107,9 @@ async def modify_section(
     original_text: str,
     instruction: str,
     context_before: str = "",
-    context_after: str = ""
+    context_after: str = "",
+    report_context: dict = None,
+    regenerate: bool = False
 ) -> str:
     """
     Modify an existing section/paragraph with context awareness
@@ -128,5 +119,6 @@ async def modify_section(
         text=original_text,
         prompt=instruction,
         context_before=context_before,
-        context_after=context_after
+        context_after=context_after,
+        regenerate=regenerate
     )
@@ -0,0 +1,321 @@
+"""
+Fast Plot Rasterizer
+Draws the fixed report layout (scatter, fit/zero line, grid, axes, labels, legend)
+directly with Pillow primitives, bypassing the matplotlib artist/layout machinery.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+from matplotlib import font_manager, ticker
+from PIL import Image, ImageDraw, ImageFont
+
+from api.services.plot_service import (
+    FIGURE_SIZE, FIGURE_DPI, RESIDUAL_COLOR, encode_image, resolve_font, _display_series
+)
+
+PLOT_FAST_PATH = os.getenv("PLOT_FAST_PATH", "true").lower() in ("1", "true", "yes")
+
+# Drawn at SUPERSAMPLE x resolution and box-reduced, which gives antialiased edges
+SUPERSAMPLE = 2
+PT = FIGURE_DPI / 72 * SUPERSAMPLE  # one point in supersampled pixels
+
+# Geometry/styling mirrors matplotlib's defaults and PlotRenderer's templates
+PAD = 1.08 * 10 * PT              # tight_layout pad
+TICK_LENGTH = 3.5 * PT
+TICK_PAD = 3.5 * PT
+LABEL_PAD = 4 * PT
+TITLE_PAD = 15 * PT
+GRID_COLOR = (176, 176, 176, 77)  # '#b0b0b0', alpha 0.3
+GRID_WIDTH = 0.8 * PT
+SPINE_WIDTH = 0.8 * PT
+MARKER_DIAMETER = np.sqrt(50) * PT
+MARKER_EDGE = 0.5 * PT
+MARKER_ALPHA = 0.6
+LINE_WIDTH = 2 * PT
+FIT_COLOR = (255, 0, 0)
+FIT_ALPHA = 0.8
+ZERO_ALPHA = 0.7
+DASH = (3.7, 1.6)                 # lines.dashed_pattern, scaled by line width
+LEGEND_EDGE = (204, 204, 204)
+TICK_FONT_SIZE = 10
+LABEL_FONT_SIZE = 12
+TITLE_FONT_SIZE = 14
+
+
+def _hex_to_rgb(color):
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+# ============================================
+# Fonts and cached glyph masks
+# ============================================
+
+@lru_cache(maxsize=None)
+def _font(size_pt, bold=False):
+    family = resolve_font()
+    path = font_manager.findfont(font_manager.FontProperties(family=family, weight='bold' if bold else 'normal'))
+    return ImageFont.truetype(path, int(round(size_pt * PT)))
+
+
+@lru_cache(maxsize=4096)
+def _text_mask(text, size_pt, bold=False, rotate=False):
+    """Renders a string once into an 8-bit alpha mask; tick labels repeat across plots."""
+    font = _font(size_pt, bold)
+    ascent, descent = font.getmetrics()
+    width = max(1, int(np.ceil(font.getlength(text))))
+    mask = Image.new('L', (width, ascent + descent))
+    ImageDraw.Draw(mask).text((0, 0), text, font=font, fill=255)
+    if rotate:
+        mask = mask.transpose(Image.Transpose.ROTATE_90)
+    return mask
+
+
+def _paste_text(canvas, text, size_pt, xy, anchor, bold=False, rotate=False, color=(0, 0, 0)):
+    """anchor: (horizontal, vertical) fractions of the text box placed at xy."""
+    mask = _text_mask(text, size_pt, bold, rotate)
+    x = int(round(xy[0] - anchor[0] * mask.width))
+    y = int(round(xy[1] - anchor[1] * mask.height))
+    canvas.paste(color, (x, y, x + mask.width, y + mask.height), mask)
+
+# ============================================
+# Ticks (same locator/formatter as matplotlib's linear axes)
+# ============================================
+
+def _ticks(lo, hi):
+    lo, hi = min(lo, hi), max(lo, hi)
+    locs = ticker.MaxNLocator(nbins=9, steps=[1, 2, 2.5, 5, 10]).tick_values(lo, hi)
+    span = hi - lo
+    locs = locs[(locs >= lo - 1e-10 * span) & (locs <= hi + 1e-10 * span)]
+    formatter = ticker.ScalarFormatter()
+    formatter.create_dummy_axis()
+    formatter.axis.set_view_interval(lo, hi)
+    labels = formatter.format_ticks(locs)
+    return locs, labels, formatter.get_offset()
+
+
+def _limits(values, extra=(), override=None):
+    """
+    Autoscale with 5% margins (axes.xmargin/ymargin), then apply a [min, max] override.
+    A zero-width result (e.g. x_range=[2, 2]) is widened like matplotlib's set_xlim does.
+    """
+    data = np.concatenate([np.asarray(v, dtype=float).ravel() for v in values] + [np.asarray(extra, dtype=float)])
+    lo, hi = (float(np.min(data)), float(np.max(data))) if data.size else (0.0, 1.0)
+    if hi == lo:
+        delta = abs(lo) * 0.05 if lo else 0.05
+        lo, hi = lo - delta, hi + delta
+    else:
+        margin = 0.05 * (hi - lo)
+        lo, hi = lo - margin, hi + margin
+    if override and len(override) == 2:
+        if override[0] not in ["", None]: lo = float(override[0])
+        if override[1] not in ["", None]: hi = float(override[1])
+    if hi == lo:
+        # Same expansion as matplotlib's nonsingular limits (set_xlim(2, 2) -> (1.9, 2.1))
+        delta = abs(lo) * 0.05 if lo else 0.05
+        lo, hi = lo - delta, hi + delta
+    return lo, hi
+
+# ============================================
+# Primitives
+# ============================================
+
+def _dashed_hline(draw, x0, x1, y, color, width):
+    on, off = DASH[0] * width, DASH[1] * width
+    x = x0
+    while x < x1:
+        draw.line([(x, y), (min(x + on, x1), y)], fill=color, width=int(round(width)))
+        x += on + off
+
+
+def _dashed_vline(draw, x, y0, y1, color, width):
+    on, off = DASH[0] * width, DASH[1] * width
+    y = y0
+    while y < y1:
+        draw.line([(x, y), (x, min(y + on, y1))], fill=color, width=int(round(width)))
+        y += on + off
+
+
+def _blend_layer(base, layer, alpha):
+    """Composites an opaque-drawn layer with a uniform alpha (no double-blending at line joints)."""
+    mask = layer.getchannel('A').point(lambda a: int(a * alpha))
+    base.paste(layer.convert('RGB'), (0, 0), mask)
+
+
+def _scatter(draw, px, py, rgb):
+    r = MARKER_DIAMETER / 2
+    fill = rgb + (int(255 * MARKER_ALPHA),)
+    edge = (255, 255, 255, int(255 * MARKER_ALPHA))
+    edge_width = max(1, int(round(MARKER_EDGE)))
+    for cx, cy in zip(px, py):
+        draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=fill, outline=edge, width=edge_width)
+
+# ============================================
+# Panel rendering
+# ============================================
+
+class FastPlotRenderer:
+    """Pillow renderer for PlotRenderer's fixed regression/residual layout."""
+
+    @staticmethod
+    def supports(is_log=False, fmt='png', arrays=()):
+        """Advanced options (log axes, vector output) and non-finite data go to matplotlib."""
+        if not PLOT_FAST_PATH or is_log or fmt == 'svg':
+            return False
+        return all(np.all(np.isfinite(np.asarray(a, dtype=float))) for a in arrays if a is not None)
+
+    def _panel(self, x_label, y_label, title, xlim, ylim, draw_data, legend_entries, legend_points):
+        width, height = (int(FIGURE_SIZE[0] * FIGURE_DPI * SUPERSAMPLE), int(FIGURE_SIZE[1] * FIGURE_DPI * SUPERSAMPLE))
+        canvas = Image.new('RGB', (width, height), 'white')
+
+        xlocs, xlabels, xoffset = _ticks(*xlim)
+        ylocs, ylabels, yoffset = _ticks(*ylim)
+
+        # Layout: reserve room for title, axis labels and tick labels (tight_layout equivalent)
+        tick_h = _text_mask('0', TICK_FONT_SIZE).height
+        ytick_w = max((_text_mask(s, TICK_FONT_SIZE).width for s in ylabels), default=0)
+        left = PAD + _text_mask(y_label, LABEL_FONT_SIZE, True, True).width + LABEL_PAD + ytick_w + TICK_PAD + TICK_LENGTH
+        top = PAD + _text_mask(title, TITLE_FONT_SIZE, True).height + TITLE_PAD
+        if yoffset:
+            top = max(top, PAD + 2 * tick_h)
+        bottom = height - (PAD + _text_mask(x_label, LABEL_FONT_SIZE, True).height + LABEL_PAD + tick_h + TICK_PAD + TICK_LENGTH)
+        right = width - PAD - (_text_mask(xlabels[-1], TICK_FONT_SIZE).width / 2 if len(xlabels) else 0)
+        box = (int(left), int(top), int(right), int(bottom))
+        box_w, box_h = box[2] - box[0], box[3] - box[1]
+
+        def to_px(xv, yv):
+            xv, yv = np.asarray(xv, dtype=float), np.asarray(yv, dtype=float)
+            return (xv - xlim[0]) / (xlim[1] - xlim[0]) * box_w, (ylim[1] - yv) / (ylim[1] - ylim[0]) * box_h
+
+        # Plot area: grid + data, clipped to the axes box
+        area = Image.new('RGB', (box_w, box_h), 'white')
+        grid = ImageDraw.Draw(area, 'RGBA')
+        for gx in to_px(xlocs, np.zeros_like(xlocs))[0]:
+            _dashed_vline(grid, gx, 0, box_h, GRID_COLOR, GRID_WIDTH)
+        for gy in to_px(np.zeros_like(ylocs), ylocs)[1]:
+            _dashed_hline(grid, 0, box_w, gy, GRID_COLOR, GRID_WIDTH)
+        draw_data(area, to_px)
+        canvas.paste(area, box[:2])
+
+        draw = ImageDraw.Draw(canvas)
+        spine = int(round(SPINE_WIDTH))
+        draw.rectangle(box, outline=(0, 0, 0), width=spine)
+
+        # Ticks and tick labels
+        for gx, label in zip(to_px(xlocs, np.zeros_like(xlocs))[0] + box[0], xlabels):
+            draw.line([(gx, box[3]), (gx, box[3] + TICK_LENGTH)], fill=(0, 0, 0), width=spine)
+            _paste_text(canvas, label, TICK_FONT_SIZE, (gx, box[3] + TICK_LENGTH + TICK_PAD), (0.5, 0))
+        for gy, label in zip(to_px(np.zeros_like(ylocs), ylocs)[1] + box[1], ylabels):
+            draw.line([(box[0] - TICK_LENGTH, gy), (box[0], gy)], fill=(0, 0, 0), width=spine)
+            _paste_text(canvas, label, TICK_FONT_SIZE, (box[0] - TICK_LENGTH - TICK_PAD, gy), (1, 0.5))
+        if xoffset:
+            _paste_text(canvas, xoffset, TICK_FONT_SIZE, (box[2], box[3] + TICK_LENGTH + TICK_PAD + tick_h), (1, 0))
+        if yoffset:
+            _paste_text(canvas, yoffset, TICK_FONT_SIZE, (box[0], box[1]), (0, 1))
+
+        # Axis labels and title
+        _paste_text(canvas, x_label, LABEL_FONT_SIZE, ((box[0] + box[2]) / 2, box[3] + TICK_LENGTH + TICK_PAD + tick_h + LABEL_PAD), (0.5, 0), bold=True)
+        _paste_text(canvas, y_label, LABEL_FONT_SIZE, (box[0] - TICK_LENGTH - TICK_PAD - ytick_w - LABEL_PAD, (box[1] + box[3]) / 2), (1, 0.5), bold=True, rotate=True)
+        _paste_text(canvas, title, TITLE_FONT_SIZE, ((box[0] + box[2]) / 2, box[1] - TITLE_PAD), (0.5, 1), bold=True)
+
+        px, py = to_px(*legend_points)
+        self._legend(canvas, box, legend_entries, px + box[0], py + box[1])
+        return canvas.reduce(SUPERSAMPLE)
+
+    @staticmethod
+    def _legend(canvas, box, entries, px, py):
+        """Framed legend with shadow; position chosen like loc='best' (fewest covered points)."""
+        em = TICK_FONT_SIZE * PT
+        masks = [_text_mask(label, TICK_FONT_SIZE) for _, label, _ in entries]
+        handle_w = 2.0 * em
+        row_h = max(m.height for m in masks)
+        legend_w = 0.4 * em * 2 + handle_w + 0.8 * em + max(m.width for m in masks)
+        legend_h = 0.4 * em * 2 + row_h * len(entries) + 0.5 * em * (len(entries) - 1)
+        gap = 0.5 * em
+
+        candidates = [
+            (box[2] - gap - legend_w, box[1] + gap),                 # upper right
+            (box[0] + gap, box[1] + gap),                            # upper left
+            (box[0] + gap, box[3] - gap - legend_h),                 # lower left
+            (box[2] - gap - legend_w, box[3] - gap - legend_h),      # lower right
+        ]
+        def covered(pos):
+            return int(np.count_nonzero((px >= pos[0]) & (px <= pos[0] + legend_w) & (py >= pos[1]) & (py <= pos[1] + legend_h)))
+        lx, ly = min(candidates, key=covered)
+
+        draw = ImageDraw.Draw(canvas, 'RGBA')
+        shadow = 2 * PT
+        radius = int(0.4 * em)
+        draw.rounded_rectangle((lx + shadow, ly + shadow, lx + legend_w + shadow, ly + legend_h + shadow), radius, fill=(0, 0, 0, 128))
+        # The frame hides the shadow underneath it, as in matplotlib's output
+        draw.rounded_rectangle((lx, ly, lx + legend_w, ly + legend_h), radius, fill=(255, 255, 255), outline=LEGEND_EDGE, width=int(round(SPINE_WIDTH)))
+
+        y = ly + 0.4 * em
+        for (kind, _, style), mask in zip(entries, masks):
+            cy = y + row_h / 2
+            hx0 = lx + 0.4 * em
+            if kind == 'marker':
+                _scatter(draw, [hx0 + handle_w / 2], [cy], style)
+            else:
+                rgb, alpha, dashed = style
+                color = rgb + (int(255 * alpha),)
+                if dashed:
+                    _dashed_hline(draw, hx0, hx0 + handle_w, cy, color, LINE_WIDTH)
+                else:
+                    draw.line([(hx0, cy), (hx0 + handle_w, cy)], fill=color, width=int(round(LINE_WIDTH)))
+            tx = int(round(hx0 + handle_w + 0.8 * em))
+            canvas.paste((0, 0, 0), (tx, int(round(y)), tx + mask.width, int(round(y)) + mask.height), mask)
+            y += row_h + 0.5 * em
+
+    def render_regression(self, x_data, y_data, y_pred=None, x_label='X', y_label='Y', title='Plot', x_range=None, y_range=None, color='#3b82f6', fmt='png', x_fit=None) -> bytes:
+        x = np.asarray(x_data, dtype=float)
+        y = np.asarray(y_data, dtype=float)
+        sx, sy = _display_series(x, y)
+        rgb = _hex_to_rgb(color)
+
+        curve = None
+        if y_pred is not None:
+            curve = _display_series(x if x_fit is None else x_fit, y_pred)
+        xlim = _limits([x] + ([curve[0]] if curve else []), override=x_range)
+        ylim = _limits([y] + ([curve[1]] if curve else []), override=y_range)
+
+        def draw_data(area, to_px):
+            _scatter(ImageDraw.Draw(area, 'RGBA'), *to_px(sx, sy), rgb)
+            if curve is not None:
+                layer = Image.new('RGBA', area.size)
+                lx, ly = to_px(*curve)
+                ImageDraw.Draw(layer).line(list(zip(lx, ly)), fill=FIT_COLOR + (255,), width=int(round(LINE_WIDTH)), joint='curve')
+                _blend_layer(area, layer, FIT_ALPHA)
+
+        entries = [('marker', '실험 데이터', rgb)]
+        if curve is not None:
+            entries.append(('line', '피팅된 곡선', (FIT_COLOR, FIT_ALPHA, False)))
+        points = (np.concatenate([sx] + ([curve[0]] if curve else [])), np.concatenate([sy] + ([curve[1]] if curve else [])))
+        image = self._panel(x_label, y_label, title, xlim, ylim, draw_data, entries, points)
+        return encode_image(image, fmt)
+
+    def render_residual(self, x_data, residuals, x_label='X', y_label='Y', title='잔차 분석', x_range=None, fmt='png') -> bytes:
+        x = np.asarray(x_data, dtype=float)
+        r = np.asarray(residuals, dtype=float)
+        sx, sr = _display_series(x, r)
+        rgb = _hex_to_rgb(RESIDUAL_COLOR)
+        xlim = _limits([x], override=x_range)
+        ylim = _limits([r], extra=[0.0])
+
+        def draw_data(area, to_px):
+            _scatter(ImageDraw.Draw(area, 'RGBA'), *to_px(sx, sr), rgb)
+            layer = Image.new('RGBA', area.size)
+            zero_y = to_px(0.0, 0.0)[1]
+            _dashed_hline(ImageDraw.Draw(layer), 0, area.width, float(zero_y), FIT_COLOR + (255,), LINE_WIDTH)
+            _blend_layer(area, layer, ZERO_ALPHA)
+
+        entries = [('marker', '잔차', rgb), ('line', 'Y = 0', (FIT_COLOR, ZERO_ALPHA, True))]
+        image = self._panel(x_label, f'{y_label} 잔차', title, xlim, ylim, draw_data, entries, (sx, sr))
+        return encode_image(image, fmt)
+
+
+_fast_renderer = FastPlotRenderer()
+
+
+def get_fast_renderer() -> FastPlotRenderer:
+    return _fast_renderer
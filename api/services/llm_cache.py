@@ -0,0 +1,144 @@
+"""
+LLM Response Cache
+Disk-backed (SQLite) cache of generated text keyed by a hash of the normalized
+prompt, model and generation config, with TTL and size-based eviction.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "llm_cache.sqlite3"))
+
+# Entries expire after this long; the oldest-used entries are evicted beyond the size budget
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 86400)))
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_responses_access ON llm_responses (last_access);
+"""
+
+
+def _normalize_text(text: str) -> str:
+    """Whitespace-insensitive form: trailing spaces and blank-line runs do not change the key."""
+    lines = [line.rstrip() for line in text.strip().splitlines()]
+    return "\n".join(line for i, line in enumerate(lines) if line or (i and lines[i - 1]))
+
+
+def _part_digest(part):
+    if isinstance(part, str):
+        return _normalize_text(part)
+    if isinstance(part, (bytes, bytearray)):
+        return "bytes:" + hashlib.sha256(part).hexdigest()
+    if hasattr(part, "tobytes") and hasattr(part, "size") and hasattr(part, "mode"):
+        # PIL image: hash the decoded pixels plus geometry
+        return f"image:{part.mode}:{part.size}:" + hashlib.sha256(part.tobytes()).hexdigest()
+    return repr(part)
+
+
+def make_llm_key(contents, model: str, generation_config=None) -> str:
+    """SHA-256 over (model, normalized prompt parts, generation config)."""
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    if generation_config is not None and not isinstance(generation_config, dict):
+        generation_config = {k: v for k, v in vars(generation_config).items() if v is not None}
+    payload = json.dumps({
+        "model": model,
+        "contents": [_part_digest(part) for part in parts],
+        "config": generation_config or {}
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed response cache shared by every AI feature (and across workers
+    on the same host). Lookups refresh last_access; writes evict expired entries
+    and then least-recently-used ones until the total text size fits max_bytes.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT text, created_at FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] < now - self.ttl_seconds:
+                self._misses += 1
+                return None
+            with db:
+                db.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+            self._hits += 1
+            return row[0]
+
+    def put(self, key, model, text):
+        now = time.time()
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?, ?)",
+                           (key, model, text, size, now, now))
+                self._evictions += db.execute("DELETE FROM llm_responses WHERE created_at < ?",
+                                              (now - self.ttl_seconds,)).rowcount
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+                if total > self.max_bytes:
+                    excess = total - self.max_bytes
+                    doomed = []
+                    for old_key, old_size in db.execute("SELECT key, size FROM llm_responses ORDER BY last_access"):
+                        if excess <= 0:
+                            break
+                        doomed.append((old_key,))
+                        excess -= old_size
+                    db.executemany("DELETE FROM llm_responses WHERE key = ?", doomed)
+                    self._evictions += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM llm_responses")
+
+    def metrics(self) -> dict:
+        with self._lock:
+            entries, size = self._db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses").fetchone()
+        lookups = self._hits + self._misses
+        return {
+            "enabled": LLM_CACHE_ENABLED,
+            "entries": entries,
+            "bytes": size,
+            "capacity_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else None
+        }
+
+
+llm_cache = LLMCache()
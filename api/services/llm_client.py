@@ -0,0 +1,149 @@
+"""
+Shared Gemini Client
+Configures the Gemini SDK once per process, keeps one model handle per model
+name and gives every AI feature the same async generate() / stream() calls.
+"""
+import os
+import threading
+
+import google.generativeai as genai
+
+from api.services.llm_cache import llm_cache, make_llm_key, LLM_CACHE_ENABLED
+from api.services.llm_scheduler import llm_scheduler, estimate_tokens, PRIORITY_INTERACTIVE
+
+DEFAULT_GEMINI_MODEL = "gemini-3-pro-preview"
+
+
+class CachedResponse:
+    """Response served from the LLM cache (same .text interface as the SDK response)."""
+    cached = True
+
+    def __init__(self, text):
+        self.text = text
+
+
+class LLMClient:
+    """
+    Process-wide Gemini access.
+
+    genai.configure() replaces the SDK's cached service clients (and their
+    pooled gRPC channels), so it runs exactly once here instead of per request.
+    The API key and model name are read when the client is first configured
+    (after .env.local has been loaded).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._configured = False
+        self._models = {}
+        self.model_name = None
+
+    @property
+    def available(self) -> bool:
+        """True when an API key is configured."""
+        return bool(os.getenv("GOOGLE_API_KEY"))
+
+    def configure(self) -> bool:
+        """Idempotent setup (called at startup and lazily on first use). Returns False without an API key."""
+        if self._configured:
+            return True
+        with self._lock:
+            if self._configured:
+                return True
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key:
+                return False
+            genai.configure(api_key=api_key)
+            self.model_name = os.getenv("GEMINI_MODEL", DEFAULT_GEMINI_MODEL)
+            self._configured = True
+            print(f"DEBUG: Gemini client configured (model={self.model_name})")
+            return True
+
+    def model(self, name: str = None) -> genai.GenerativeModel:
+        """Cached model handle (default: GEMINI_MODEL)."""
+        if not self.configure():
+            raise Exception("GOOGLE_API_KEY 환경변수가 설정되지 않았습니다.")
+        name = name or self.model_name
+        handle = self._models.get(name)
+        if handle is None:
+            with self._lock:
+                handle = self._models.setdefault(name, genai.GenerativeModel(name))
+        return handle
+
+    async def generate(self, contents, model: str = None, generation_config=None, cache: bool = True, regenerate: bool = False,
+                       priority: int = PRIORITY_INTERACTIVE):
+        """
+        Async generation on the shared client.
+
+        Args:
+            contents: prompt string, or a list of parts (e.g. [prompt, PIL image])
+            model: model name override (default: GEMINI_MODEL)
+            generation_config: optional genai generation config
+            cache: look up / store the text in the persistent response cache
+            regenerate: skip the cache lookup (the fresh response still replaces the cached one)
+            priority: scheduler priority (PRIORITY_INTERACTIVE / PRIORITY_REPORT)
+
+        Returns:
+            The SDK response, or a CachedResponse (callers read response.text)
+        """
+        handle = self.model(model)
+        name = model or self.model_name
+        use_cache = cache and LLM_CACHE_ENABLED
+        if use_cache:
+            key = make_llm_key(contents, name, generation_config)
+            if not regenerate:
+                text = llm_cache.get(key)
+                if text is not None:
+                    return CachedResponse(text)
+
+        # Rate limits, priority ordering and 429 retries are handled by the shared scheduler
+        response = await llm_scheduler.run(
+            lambda: handle.generate_content_async(contents, generation_config=generation_config),
+            estimate_tokens(contents), priority
+        )
+
+        if use_cache:
+            # Blocked / empty responses are never cached
+            try:
+                text = response.text
+            except ValueError:
+                text = None
+            if text:
+                llm_cache.put(key, name, text)
+        return response
+
+    async def stream(self, contents, model: str = None, generation_config=None, cache: bool = True, regenerate: bool = False,
+                     priority: int = PRIORITY_INTERACTIVE):
+        """
+        Async generator of text chunks as the model produces them (same arguments as generate()).
+        A cache hit is yielded as a single chunk; a fully consumed stream is cached.
+        """
+        handle = self.model(model)
+        name = model or self.model_name
+        use_cache = cache and LLM_CACHE_ENABLED
+        if use_cache:
+            key = make_llm_key(contents, name, generation_config)
+            if not regenerate:
+                text = llm_cache.get(key)
+                if text is not None:
+                    yield text
+                    return
+
+        chunks = []
+        async for chunk in llm_scheduler.stream(
+            lambda: handle.generate_content_async(contents, generation_config=generation_config, stream=True),
+            estimate_tokens(contents), priority
+        ):
+            try:
+                text = chunk.text
+            except ValueError:
+                continue  # chunk without text parts (e.g. safety feedback)
+            if text:
+                chunks.append(text)
+                yield text
+
+        if use_cache and chunks:
+            llm_cache.put(key, name, "".join(chunks))
+
+
+llm_client = LLMClient()
@@ -0,0 +1,243 @@
+"""
+LLM Request Scheduler
+Admits Gemini calls through request/token rate buckets in priority order and
+retries quota (429) errors with exponential backoff and jitter.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import random
+import time
+from collections import deque
+
+# Quota of the API key (requests and tokens per minute)
+LLM_RPM = float(os.getenv("LLM_RPM", "60"))
+LLM_TPM = float(os.getenv("LLM_TPM", "1000000"))
+
+# Retries of a call rejected with 429 and the backoff schedule between them
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "2"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "60"))
+
+# Token estimate for admission: prompt characters per token, reserved output tokens, tokens per image
+CHARS_PER_TOKEN = 3
+OUTPUT_TOKEN_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "2048"))
+IMAGE_TOKEN_ESTIMATE = 258
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0  # edit / OCR - a user is waiting on a single short call
+PRIORITY_REPORT = 1       # report sections - batch work
+
+WAIT_HISTORY = 500
+
+
+def estimate_tokens(contents) -> int:
+    """Rough prompt + output token count used to reserve TPM budget before the call."""
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    prompt = 0
+    for part in parts:
+        prompt += math.ceil(len(part) / CHARS_PER_TOKEN) if isinstance(part, str) else IMAGE_TOKEN_ESTIMATE
+    return prompt + OUTPUT_TOKEN_ESTIMATE
+
+
+def is_rate_limited(error) -> bool:
+    """429 / RESOURCE_EXHAUSTED from the SDK (or any error reporting it)."""
+    if getattr(error, "code", None) == 429:
+        return True
+    text = str(error)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text or "quota" in text.lower()
+
+
+class TokenBucket:
+    """Continuously refilled bucket: `per_minute` units, burst up to one minute's worth."""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount) -> float:
+        """Seconds until `amount` units are available (0 = now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def available(self) -> float:
+        self._refill()
+        return self.level
+
+    def adjust(self, amount):
+        """Corrects an earlier reservation (positive = used more than reserved); may go negative."""
+        self._refill()
+        self.level -= amount
+
+
+class LLMScheduler:
+    """
+    Central admission control for model calls.
+
+    Callers wait in a priority queue (FIFO within a priority). The dispatcher
+    admits the head of the queue once both the request bucket (RPM) and the
+    token bucket (TPM) can cover it. A 429 response pauses all admissions for
+    the backoff delay - so a burst backs off together instead of cascading -
+    and the call is retried up to LLM_MAX_RETRIES times.
+    """
+
+    def __init__(self, rpm=LLM_RPM, tpm=LLM_TPM, max_retries=LLM_MAX_RETRIES):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self._waiters = []
+        self._seq = itertools.count()
+        self._loop = None
+        self._wakeup = None
+        self._dispatcher = None
+        self._paused_until = 0.0
+        self._waits = deque(maxlen=WAIT_HISTORY)
+        self._admitted = 0
+        self._rate_limited = 0
+        self._retries = 0
+        self._failures = 0
+
+    def _ensure_started(self):
+        """Creates the dispatcher on the running loop (again if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._waiters = []
+        self._wakeup = asyncio.Event()
+        self._dispatcher = loop.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        while True:
+            # Callers that gave up (cancelled) leave the queue
+            while self._waiters and self._waiters[0][4].done():
+                heapq.heappop(self._waiters)
+            if not self._waiters:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            _, _, tokens, enqueued, future = self._waiters[0]
+            delay = max(self._paused_until - time.monotonic(), self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if delay > 0:
+                # Sleep until the budget refills, or earlier if a new (maybe higher-priority) caller arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self._admitted += 1
+            self._waits.append(time.monotonic() - enqueued)
+            future.set_result(None)
+
+    async def acquire(self, tokens, priority=PRIORITY_INTERACTIVE):
+        """Waits for admission (one request + `tokens` of TPM budget)."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), tokens, time.monotonic(), future))
+        self._wakeup.set()
+        await future
+
+    def _backoff(self, attempt, error):
+        """Pauses admissions after a 429; returns the delay (exponential, capped, 50-100% jitter)."""
+        self._rate_limited += 1
+        delay = min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt) * random.uniform(0.5, 1.0)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        print(f"DEBUG: LLM rate limited (attempt {attempt + 1}), backing off {delay:.1f}s: {error}")
+        return delay
+
+    def _reconcile(self, reserved, usage):
+        """Charges the difference between the reserved and the reported token usage."""
+        used = getattr(usage, "total_token_count", None) if usage is not None else None
+        if used:
+            self.tokens.adjust(used - reserved)
+
+    async def run(self, call, tokens, priority=PRIORITY_INTERACTIVE):
+        """
+        Runs `await call()` once admitted; 429 errors are retried with backoff.
+
+        Returns:
+            The call's result (the last error is raised after LLM_MAX_RETRIES retries)
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(tokens, priority)
+            try:
+                result = await call()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    self._failures += 1
+                    raise
+                self._retries += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+                continue
+            self._reconcile(tokens, getattr(result, "usage_metadata", None))
+            return result
+
+    async def stream(self, open_stream, tokens, priority=PRIORITY_INTERACTIVE):
+        """
+        Async generator over `await open_stream()` chunks once admitted.
+        A 429 before the first chunk is retried like run(); later errors propagate.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(tokens, priority)
+            started = False
+            usage = None
+            try:
+                async for chunk in await open_stream():
+                    started = True
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    yield chunk
+            except Exception as e:
+                if started or not is_rate_limited(e) or attempt == self.max_retries:
+                    self._failures += 1
+                    raise
+                self._retries += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+                continue
+            self._reconcile(tokens, usage)
+            return
+
+    def metrics(self) -> dict:
+        waits = sorted(self._waits)
+        queued = [w for w in self._waiters if not w[4].done()]
+        return {
+            "queue_depth": len(queued),
+            "queue_depth_by_priority": {
+                "interactive": sum(1 for w in queued if w[0] == PRIORITY_INTERACTIVE),
+                "report": sum(1 for w in queued if w[0] == PRIORITY_REPORT)
+            },
+            "admitted": self._admitted,
+            "rate_limited": self._rate_limited,
+            "retries": self._retries,
+            "failures": self._failures,
+            "wait_ms": {
+                "avg": round(sum(waits) / len(waits) * 1000, 1) if waits else None,
+                "p95": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 1) if waits else None,
+                "max": round(waits[-1] * 1000, 1) if waits else None
+            },
+            "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "rpm_available": round(self.requests.available(), 1),
+            "tpm_available": round(self.tokens.available())
+        }
+
+
+llm_scheduler = LLMScheduler()
@@ -2,14 +2,14 @@
 OCR Service with Gemini Vision (Single-Stage)
 Uses Gemini multimodal to directly read images and extract table data
 """
-import os
 import io
 from typing import Dict
-import google.generativeai as genai
 from PIL import Image
 
+from api.services.llm_client import llm_client
 
-async def process_image_to_csv_with_gemini(image_bytes: bytes) -> Dict:
+
+async def process_image_to_csv_with_gemini(image_bytes: bytes, regenerate: bool = False) -> Dict:
     """
     Convert image to CSV using Gemini Vision (single-stage approach).
     Gemini directly analyzes the image and extracts table data.
@@ -18,16 +18,12 @@ async def process_image_to_csv_with_gemini(image_bytes: bytes) -> Dict:
     understands the visual structure of tables.
     """
     
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    if not GOOGLE_API_KEY:
+    if not llm_client.available:
         raise Exception("GOOGLE_API_KEY not configured")
     
     try:
         print("🤖 Gemini Vision: Analyzing image and extracting data...")
         
-        genai.configure(api_key=GOOGLE_API_KEY)
-        model = genai.GenerativeModel('gemini-3-pro-preview')
-        
         # Load image from bytes
         img = Image.open(io.BytesIO(image_bytes))
         print(f"📸 Image loaded: {img.size[0]}x{img.size[1]} pixels")
@@ -89,7 +85,7 @@ Angle(deg),Range_1st(cm),Range_2nd(cm),Range_3rd(cm)
 """
         
         # Send image + prompt to Gemini
-        response = await model.generate_content_async([extraction_prompt, img])
+        response = await llm_client.generate([extraction_prompt, img], regenerate=regenerate)
         
         if not response.text:
             raise Exception("Gemini failed to extract data from image")
@@ -0,0 +1,88 @@
+"""
+Plot Render Cache
+Maps a content hash of (plot kind, data arrays, fitted params, style arguments)
+to the public URL of an already rendered and uploaded image.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+PLOT_CACHE_SIZE = int(os.getenv("PLOT_CACHE_SIZE", "512"))
+
+
+def make_plot_key(kind, render_kwargs, params=None) -> str:
+    """
+    Builds a stable SHA-256 key from every input that affects the rendered image.
+    Arrays are hashed by dtype/shape/bytes; everything else via canonical JSON.
+    """
+    digest = hashlib.sha256(kind.encode('utf-8'))
+    for name in sorted(render_kwargs):
+        value = render_kwargs[name]
+        digest.update(name.encode('utf-8'))
+        if isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value, dtype=float)
+            digest.update(str(array.shape).encode('utf-8'))
+            digest.update(array.tobytes())
+        else:
+            digest.update(json.dumps(value, sort_keys=True, default=str).encode('utf-8'))
+    if params is not None:
+        digest.update(np.asarray(params, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+class PlotCache:
+    """
+    Size-bounded LRU cache of plot key -> public URL with hit-rate metrics.
+    Thread-safe: retention sweeps and upload failures invalidate entries from worker threads.
+    """
+
+    def __init__(self, max_entries=PLOT_CACHE_SIZE):
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            url = self._entries.get(key)
+            if url is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return url
+
+    def put(self, key, url):
+        with self._lock:
+            self._entries[key] = url
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate_urls(self, urls):
+        """Drops entries pointing at objects that no longer exist in storage."""
+        urls = set(urls)
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if v in urls]:
+                del self._entries[key]
+
+    def metrics(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "capacity": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else None
+        }
+
+
+plot_cache = PlotCache()
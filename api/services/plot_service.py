@@ -1,203 +1,440 @@
 import matplotlib
 matplotlib.use('Agg')  # Non-GUI backend
-import matplotlib.pyplot as plt
+from matplotlib import font_manager
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
 import base64
+import threading
 from io import BytesIO
+import os
 import platform
+from PIL import Image
+
+from api.utils.downsampling import downsample, DOWNSAMPLE_METHODS
 
 # Font configuration with fallback for Docker/Linux environments
 system_os = platform.system()
-try:
-    if system_os == "Windows":
-        plt.rcParams['font.family'] = 'Malgun Gothic'
-    elif system_os == "Darwin":
-        plt.rcParams['font.family'] = 'AppleGothic'
+if system_os == "Windows":
+    KOREAN_FONT = 'Malgun Gothic'
+elif system_os == "Darwin":
+    KOREAN_FONT = 'AppleGothic'
+else:
+    # Linux/Docker: try NanumGothic, fallback to DejaVu Sans
+    KOREAN_FONT = 'NanumGothic'
+FALLBACK_FONT = 'DejaVu Sans'
+matplotlib.rcParams['font.family'] = KOREAN_FONT
+matplotlib.rcParams['axes.unicode_minus'] = False
+
+_resolved_font = None
+
+
+def resolve_font() -> str:
+    """
+    Resolves the Korean font once per process and pins it in rcParams.
+    The first call builds/loads matplotlib's font cache, which is the slow part
+    of a cold start; later calls are free.
+    """
+    global _resolved_font
+    if _resolved_font is None:
+        try:
+            font_manager.findfont(font_manager.FontProperties(family=KOREAN_FONT), fallback_to_default=False)
+            _resolved_font = KOREAN_FONT
+        except ValueError:
+            _resolved_font = FALLBACK_FONT
+        matplotlib.rcParams['font.family'] = _resolved_font
+    return _resolved_font
+
+FIGURE_SIZE = (8, 6)
+COMBINED_FIGURE_SIZE = (8, 12)  # regression + residual panels, each the size of a single plot
+FIGURE_DPI = 100
+
+# Resolutions produced from one artist tree (render_renditions): editor thumbnails, screen, print/PDF
+RENDITION_DPI = {'thumb': 40, 'screen': FIGURE_DPI, 'print': 300}
+RESIDUAL_COLOR = '#8b5cf6'
+
+# Series longer than this are downsampled for display (full data still sets the axis limits)
+MAX_DISPLAY_POINTS = int(os.getenv("PLOT_MAX_POINTS", "2000"))
+DOWNSAMPLE_METHOD = os.getenv("PLOT_DOWNSAMPLE_METHOD", "lttb")
+if DOWNSAMPLE_METHOD not in DOWNSAMPLE_METHODS:
+    DOWNSAMPLE_METHOD = 'lttb'
+
+# Output encodings: png (default), png8 (palette-quantized + optimized PNG),
+# webp (lossless WebP) and svg (vector axes/text with rasterized scatter layers)
+IMAGE_FORMATS = {
+    'png': {'content_type': 'image/png', 'extension': 'png'},
+    'png8': {'content_type': 'image/png', 'extension': 'png'},
+    'webp': {'content_type': 'image/webp', 'extension': 'webp'},
+    'svg': {'content_type': 'image/svg+xml', 'extension': 'svg'},
+}
+
+
+def validate_renditions(renditions, fmt='png'):
+    renditions = tuple(renditions)
+    unknown = [name for name in renditions if name not in RENDITION_DPI]
+    if unknown or not renditions:
+        raise ValueError(f"Unsupported renditions: {unknown or renditions} (choose from {', '.join(RENDITION_DPI)})")
+    if fmt == 'svg':
+        raise ValueError("SVG is resolution-independent; renditions need a raster format")
+    return renditions
+
+
+def validate_image_format(fmt):
+    if fmt not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {fmt} (choose from {', '.join(IMAGE_FORMATS)})")
+    return fmt
+
+
+def encode_image(image, fmt='png') -> bytes:
+    """Encodes a PIL image (e.g. a slice of a rendered canvas) in a raster output format."""
+    validate_image_format(fmt)
+    if fmt == 'svg':
+        raise ValueError("SVG output needs the figure, not a raster image")
+    buf = BytesIO()
+    if fmt == 'png8':
+        # Flatten onto the white background, then reduce to a 256-colour palette
+        image = image.convert('RGB').quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+        image.save(buf, format='PNG', optimize=True)
+    elif fmt == 'webp':
+        image.save(buf, format='WEBP', lossless=True, quality=100, method=4)
     else:
-        # Linux/Docker: try NanumGothic, fallback to DejaVu Sans
-        plt.rcParams['font.family'] = 'NanumGothic'
-except:
-    plt.rcParams['font.family'] = 'DejaVu Sans'
-plt.rcParams['axes.unicode_minus'] = False
+        image.save(buf, format='PNG')
+    return buf.getvalue()
 
 
-def generate_plot_buffer(x_data, y_data, y_pred=None, x_label='X', y_label='Y', title='Plot', x_range=None, y_range=None, color='#3b82f6', is_log=False) -> BytesIO:
-    """Generates a matplotlib plot and returns it as a BytesIO buffer for upload."""
-    plt.figure(figsize=(8, 6))
-    plt.scatter(x_data, y_data, alpha=0.6, s=50, c=color, label='실험 데이터', edgecolors='white', linewidth=0.5)
-    
-    if y_pred is not None:
-        plt.plot(x_data, y_pred, 'r-', linewidth=2, label='피팅된 곡선', alpha=0.8)
-    
-    plt.xlabel(x_label, fontsize=12, fontweight='bold')
-    plt.ylabel(y_label, fontsize=12, fontweight='bold')
-    plt.title(title, fontsize=14, fontweight='bold', pad=15)
-    
+def encode_figure(fig, fmt='png', dpi=FIGURE_DPI) -> bytes:
+    """Encodes a finished figure in the requested output format at `dpi`."""
+    validate_image_format(fmt)
+    buf = BytesIO()
+    if fmt == 'png8':
+        fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight')
+        return encode_image(Image.open(BytesIO(buf.getvalue())), fmt)
+    elif fmt == 'webp':
+        fig.savefig(buf, format='webp', dpi=dpi, bbox_inches='tight', pil_kwargs={'lossless': True, 'quality': 100, 'method': 4})
+    else:
+        fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches='tight')
+    return buf.getvalue()
+
+
+def split_panels(fig, axes, fmt='png', dpi=FIGURE_DPI):
+    """
+    Slices one drawn figure into one image per axes without re-rendering.
+    Each crop is the axes' tight bbox (title, labels, legend) plus a 0.1 inch pad,
+    clamped so neighbouring panels never bleed into each other.
+    """
+    pad = dpi / 10
+    canvas = fig.canvas
+    fig.set_dpi(dpi)
+    try:
+        canvas.draw()
+        renderer = canvas.get_renderer()
+        rgba = np.array(canvas.buffer_rgba())
+        boxes = [ax.get_tightbbox(renderer) for ax in axes]
+    finally:
+        fig.set_dpi(FIGURE_DPI)
+    height, width = rgba.shape[:2]
+
+    # Display coords have their origin at the bottom-left, array rows at the top
+    # Same column range for every slice so the panels stay aligned side by side in a report
+    cols = slice(max(0, int(np.floor(min(b.x0 for b in boxes) - pad))), min(width, int(np.ceil(max(b.x1 for b in boxes) + pad))))
+    images = []
+    for i, box in enumerate(boxes):
+        top = height - box.y1 - pad
+        bottom = height - box.y0 + pad
+        if i > 0:
+            top = max(top, (height - boxes[i - 1].y0 + height - box.y1) / 2)
+        if i + 1 < len(boxes):
+            bottom = min(bottom, (height - box.y0 + height - boxes[i + 1].y1) / 2)
+        rows = slice(max(0, int(np.floor(top))), min(height, int(np.ceil(bottom))))
+        images.append(encode_image(Image.fromarray(rgba[rows, cols]), fmt))
+    return images
+
+
+def _apply_range(ax, x_range=None, y_range=None):
+    """Applies optional [min, max] overrides; empty strings/None keep the autoscaled limit."""
     if x_range and len(x_range) == 2:
-        if x_range[0] not in ["", None]: plt.xlim(left=float(x_range[0]))
-        if x_range[1] not in ["", None]: plt.xlim(right=float(x_range[1]))
+        if x_range[0] not in ["", None]: ax.set_xlim(left=float(x_range[0]))
+        if x_range[1] not in ["", None]: ax.set_xlim(right=float(x_range[1]))
     if y_range and len(y_range) == 2:
-        if y_range[0] not in ["", None]: plt.ylim(bottom=float(y_range[0]))
-        if y_range[1] not in ["", None]: plt.ylim(top=float(y_range[1]))
-
-    if is_log:
-        import numpy as np
-        x_check = np.array(x_data)
-        y_check = np.array(y_data)
-        if np.all(x_check > 0): plt.xscale('log')
-        if np.all(y_check > 0): plt.yscale('log')
-
-    plt.legend(loc='best', frameon=True, shadow=True)
-    plt.grid(True, alpha=0.3, linestyle='--')
-    plt.tight_layout()
-    
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-    plt.close()
-    buf.seek(0)
-    return buf
+        if y_range[0] not in ["", None]: ax.set_ylim(bottom=float(y_range[0]))
+        if y_range[1] not in ["", None]: ax.set_ylim(top=float(y_range[1]))
+
+
+def _display_series(x, y):
+    """Sorts by x and downsamples (shape-preserving) to at most MAX_DISPLAY_POINTS points."""
+    return downsample(x, y, MAX_DISPLAY_POINTS, DOWNSAMPLE_METHOD)
+
+
+def _data_bounds(x, y):
+    """Corner points of the full data, so autoscaling ignores how the display series was thinned."""
+    if len(x) == 0:
+        return np.empty((0, 2))
+    return np.array([[np.min(x), np.min(y)], [np.max(x), np.max(y)]])
+
+
+def _fast_path(is_log=False, fmt='png', arrays=()):
+    """Returns the Pillow fast-path renderer when it can draw this plot, otherwise None (use matplotlib)."""
+    from api.services.fast_plot import FastPlotRenderer, get_fast_renderer
+    return get_fast_renderer() if FastPlotRenderer.supports(is_log, fmt, arrays) else None
+
+
+class PlotRenderer:
+    """
+    Reusable-figure renderer built on the Figure/FigureCanvasAgg object API.
+
+    Each instance owns one pre-styled figure per plot kind and only swaps the
+    data artists (set_offsets / set_data), labels and limits between renders.
+    No pyplot global state is touched, but a single instance is not meant to be
+    shared across threads - use get_renderer() for a per-thread instance.
+    """
+
+    def __init__(self):
+        resolve_font()
+        self._regression = self._build_regression_template()
+        self._residual = self._build_residual_template()
+        self._combined = self._build_combined_template()
+
+    @staticmethod
+    def _new_axes():
+        fig = Figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.grid(True, alpha=0.3, linestyle='--')
+        return fig, ax
+
+    def _build_regression_template(self):
+        fig, ax = self._new_axes()
+        scatter = ax.scatter([], [], alpha=0.6, s=50, c='#3b82f6', label='실험 데이터', edgecolors='white', linewidth=0.5, rasterized=True)
+        fit_line, = ax.plot([], [], 'r-', linewidth=2, label='피팅된 곡선', alpha=0.8)
+        return {'fig': fig, 'ax': ax, 'scatter': scatter, 'line': fit_line}
+
+    def _build_residual_template(self):
+        fig, ax = self._new_axes()
+        scatter = ax.scatter([], [], alpha=0.6, s=50, c=RESIDUAL_COLOR, edgecolors='white', linewidth=0.5, label='잔차', rasterized=True)
+        zero_line = ax.axhline(y=0, color='r', linestyle='--', linewidth=2, alpha=0.7, label='Y = 0')
+        return {'fig': fig, 'ax': ax, 'scatter': scatter, 'line': zero_line}
+
+    @staticmethod
+    def _build_combined_template():
+        fig = Figure(figsize=COMBINED_FIGURE_SIZE, dpi=FIGURE_DPI)
+        FigureCanvasAgg(fig)
+        ax, res_ax = fig.subplots(2, 1, sharex=True)
+        for axis in (ax, res_ax):
+            axis.grid(True, alpha=0.3, linestyle='--')
+            # Keep x tick labels on both panels so each slice stands on its own
+            axis.tick_params(labelbottom=True)
+        scatter = ax.scatter([], [], alpha=0.6, s=50, c='#3b82f6', label='실험 데이터', edgecolors='white', linewidth=0.5, rasterized=True)
+        fit_line, = ax.plot([], [], 'r-', linewidth=2, label='피팅된 곡선', alpha=0.8)
+        res_scatter = res_ax.scatter([], [], alpha=0.6, s=50, c=RESIDUAL_COLOR, edgecolors='white', linewidth=0.5, label='잔차', rasterized=True)
+        zero_line = res_ax.axhline(y=0, color='r', linestyle='--', linewidth=2, alpha=0.7, label='Y = 0')
+        return {'fig': fig, 'ax': ax, 'scatter': scatter, 'line': fit_line, 'res_ax': res_ax, 'res_scatter': res_scatter, 'zero_line': zero_line}
+
+    @staticmethod
+    def _reset_axes(ax, x_label, y_label, title):
+        ax.set_xscale('linear')
+        ax.set_yscale('linear')
+        ax.set_autoscale_on(True)
+        # An inverted x_range/y_range ([max, min]) must not carry over to the next render
+        if ax.xaxis_inverted():
+            ax.invert_xaxis()
+        if ax.yaxis_inverted():
+            ax.invert_yaxis()
+        ax.set_xlabel(x_label, fontsize=12, fontweight='bold')
+        ax.set_ylabel(y_label, fontsize=12, fontweight='bold')
+        ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
+
+    @staticmethod
+    def _autoscale(ax, points):
+        # relim() ignores collections, so add the scatter offsets explicitly
+        ax.relim(visible_only=True)
+        if len(points):
+            ax.update_datalim(points)
+        ax.autoscale_view()
+
+    @staticmethod
+    def _encode(fig, fmt='png'):
+        fig.tight_layout()
+        return encode_figure(fig, fmt)
+
+    def render_regression(self, x_data, y_data, y_pred=None, x_label='X', y_label='Y', title='Plot', x_range=None, y_range=None, color='#3b82f6', is_log=False, fmt='png', x_fit=None, fast_path=True) -> bytes:
+        """
+        Renders the data scatter + fitted curve and returns the image encoded as `fmt`.
+        `y_pred` is evaluated at `x_fit` (a dense grid) when given, otherwise at `x_data`.
+        Standard plots go through the Pillow fast path; fast_path=False forces matplotlib.
+        """
+        fast = _fast_path(is_log, fmt, (x_data, y_data, y_pred, x_fit)) if fast_path else None
+        if fast is not None:
+            return fast.render_regression(x_data, y_data, y_pred, x_label, y_label, title, x_range, y_range, color, fmt, x_fit)
+
+        t = self._regression
+        ax, scatter, fit_line = t['ax'], t['scatter'], t['line']
+        x = np.asarray(x_data, dtype=float)
+        y = np.asarray(y_data, dtype=float)
+
+        self._reset_axes(ax, x_label, y_label, title)
+        scatter.set_offsets(np.column_stack(_display_series(x, y)))
+        scatter.set_facecolor(color)
+        points = _data_bounds(x, y)
+
+        handles = [scatter]
+        if y_pred is not None:
+            fit_line.set_data(*_display_series(x if x_fit is None else x_fit, y_pred))
+            fit_line.set_visible(True)
+            handles.append(fit_line)
+        else:
+            fit_line.set_data([], [])
+            fit_line.set_visible(False)
+
+        if is_log:
+            if np.all(x > 0): ax.set_xscale('log')
+            if np.all(y > 0): ax.set_yscale('log')
+        self._autoscale(ax, points)
+        _apply_range(ax, x_range, y_range)
+
+        ax.legend(handles=handles, loc='best', frameon=True, shadow=True)
+        return self._encode(t['fig'], fmt)
+
+    def render_combined(self, x_data, y_data, y_pred, residuals, x_label='X', y_label='Y', title='Plot', residual_title='잔차 분석', x_range=None, y_range=None, color='#3b82f6', is_log=False, fmt='png', split=True, x_fit=None):
+        """
+        Draws the regression and residual panels in one figure with a shared x-axis.
+
+        With split=True the figure is drawn once and sliced into
+        (regression image, residual image); otherwise the whole figure is
+        returned as a single image. SVG cannot be sliced from the raster
+        canvas, so split SVG output falls back to two separate renders.
+        `y_pred` is evaluated at `x_fit` (a dense grid) when given, otherwise at `x_data`.
+        """
+        if split and _fast_path(is_log, fmt, (x_data, y_data, y_pred, residuals, x_fit)) is not None:
+            # The fast path draws each panel directly, so there is nothing to slice
+            return (
+                self.render_regression(x_data, y_data, y_pred, x_label, y_label, title, x_range, y_range, color, is_log, fmt, x_fit),
+                self.render_residual(x_data, residuals, x_label, y_label, residual_title, x_range, fmt)
+            )
+        if split and fmt == 'svg':
+            return (
+                self.render_regression(x_data, y_data, y_pred, x_label, y_label, title, x_range, y_range, color, is_log, fmt, x_fit),
+                self.render_residual(x_data, residuals, x_label, y_label, residual_title, x_range, fmt)
+            )
+
+        fig, axes = self._draw_combined(x_data, y_data, y_pred, residuals, x_label, y_label, title, residual_title, x_range, y_range, color, is_log, x_fit)
+        if split:
+            return tuple(split_panels(fig, axes, fmt))
+        return encode_figure(fig, fmt)
+
+    def render_renditions(self, x_data, y_data, y_pred, residuals, x_label='X', y_label='Y', title='Plot', residual_title='잔차 분석', x_range=None, y_range=None, color='#3b82f6', is_log=False, fmt='png', split=True, x_fit=None, renditions=tuple(RENDITION_DPI)):
+        """
+        Builds the combined figure's artist tree once and rasterizes it at every
+        requested resolution (see RENDITION_DPI). Marker sizes and fonts are in
+        points, so each rendition is the same picture at a different pixel density.
+
+        Returns {rendition: (regression image, residual image)} with split=True,
+        otherwise {rendition: combined image}.
+        """
+        renditions = validate_renditions(renditions, fmt)
+        fig, axes = self._draw_combined(x_data, y_data, y_pred, residuals, x_label, y_label, title, residual_title, x_range, y_range, color, is_log, x_fit)
+        images = {}
+        for name in renditions:
+            dpi = RENDITION_DPI[name]
+            images[name] = tuple(split_panels(fig, axes, fmt, dpi)) if split else encode_figure(fig, fmt, dpi)
+        return images
+
+    def _draw_combined(self, x_data, y_data, y_pred, residuals, x_label, y_label, title, residual_title, x_range, y_range, color, is_log, x_fit):
+        """Updates the combined template's artists and layout; returns (figure, (ax, res_ax))."""
+        t = self._combined
+        ax, res_ax = t['ax'], t['res_ax']
+        x = np.asarray(x_data, dtype=float)
+        y = np.asarray(y_data, dtype=float)
+
+        self._reset_axes(ax, x_label, y_label, title)
+        self._reset_axes(res_ax, x_label, f'{y_label} 잔차', residual_title)
+
+        residuals = np.asarray(residuals, dtype=float)
+        t['scatter'].set_offsets(np.column_stack(_display_series(x, y)))
+        t['scatter'].set_facecolor(color)
+        t['line'].set_data(*_display_series(x if x_fit is None else x_fit, y_pred))
+        t['res_scatter'].set_offsets(np.column_stack(_display_series(x, residuals)))
+        points = _data_bounds(x, y)
+        res_points = _data_bounds(x, residuals)
+
+        if is_log:
+            # x scale is shared, so the residual panel follows a log x-axis too
+            if np.all(x > 0): ax.set_xscale('log')
+            if np.all(y > 0): ax.set_yscale('log')
+        self._autoscale(ax, points)
+        self._autoscale(res_ax, res_points)
+        _apply_range(ax, x_range, y_range)
+
+        ax.legend(handles=[t['scatter'], t['line']], loc='best', frameon=True, shadow=True)
+        res_ax.legend(handles=[t['res_scatter'], t['zero_line']], loc='best', frameon=True, shadow=True)
+
+        fig = t['fig']
+        fig.tight_layout()
+        return fig, (ax, res_ax)
+
+    def render_residual(self, x_data, residuals, x_label='X', y_label='Y', title='잔차 분석', x_range=None, fmt='png', fast_path=True) -> bytes:
+        """Renders the residual scatter with a zero line and returns the image encoded as `fmt`."""
+        fast = _fast_path(False, fmt, (x_data, residuals)) if fast_path else None
+        if fast is not None:
+            return fast.render_residual(x_data, residuals, x_label, y_label, title, x_range, fmt)
+
+        t = self._residual
+        ax, scatter, zero_line = t['ax'], t['scatter'], t['line']
+
+        self._reset_axes(ax, x_label, f'{y_label} 잔차', title)
+        scatter.set_offsets(np.column_stack(_display_series(x_data, residuals)))
+        points = _data_bounds(np.asarray(x_data, dtype=float), np.asarray(residuals, dtype=float))
+        self._autoscale(ax, points)
+        _apply_range(ax, x_range)
+
+        ax.legend(handles=[scatter, zero_line], loc='best', frameon=True, shadow=True)
+        return self._encode(t['fig'], fmt)
+
+
+_thread_local = threading.local()
+
+
+def get_renderer() -> PlotRenderer:
+    """Returns this thread's PlotRenderer, creating it on first use."""
+    renderer = getattr(_thread_local, 'renderer', None)
+    if renderer is None:
+        renderer = _thread_local.renderer = PlotRenderer()
+    return renderer
+
+
+def _to_data_uri(image_bytes: bytes, fmt='png') -> str:
+    base64_str = base64.b64encode(image_bytes).decode('utf-8')
+    return f"data:{IMAGE_FORMATS[fmt]['content_type']};base64,{base64_str}"
+
+
+def generate_plot_buffer(x_data, y_data, y_pred=None, x_label='X', y_label='Y', title='Plot', x_range=None, y_range=None, color='#3b82f6', is_log=False) -> BytesIO:
+    """Generates a matplotlib plot and returns it as a BytesIO buffer for upload."""
+    return BytesIO(get_renderer().render_regression(x_data, y_data, y_pred, x_label, y_label, title, x_range, y_range, color, is_log))
 
 
 def generate_residual_plot_buffer(x_data, residuals, x_label='X', y_label='Y', title='잔차 분석', x_range=None) -> BytesIO:
     """Generates a residual plot and returns it as a BytesIO buffer for upload."""
-    plt.figure(figsize=(8, 6))
-    plt.scatter(x_data, residuals, alpha=0.6, s=50, c='#8b5cf6', edgecolors='white', linewidth=0.5, label='잔차')
-    plt.axhline(y=0, color='r', linestyle='--', linewidth=2, alpha=0.7, label='Y = 0')
-    
-    plt.xlabel(x_label, fontsize=12, fontweight='bold')
-    plt.ylabel(f'{y_label} 잔차', fontsize=12, fontweight='bold')
-    plt.title(title, fontsize=14, fontweight='bold', pad=15)
-    
-    if x_range and len(x_range) == 2:
-        if x_range[0] not in ["", None]: plt.xlim(left=float(x_range[0]))
-        if x_range[1] not in ["", None]: plt.xlim(right=float(x_range[1]))
-
-    plt.legend(loc='best', frameon=True, shadow=True)
-    plt.grid(True, alpha=0.3, linestyle='--')
-    plt.tight_layout()
-    
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-    plt.close()
-    buf.seek(0)
-    return buf
+    return BytesIO(get_renderer().render_residual(x_data, residuals, x_label, y_label, title, x_range))
 
 
 def generate_plot_file(x_data, y_data, save_path, y_pred=None, x_label='X', y_label='Y', title='Plot', x_range=None, y_range=None, color='#3b82f6', is_log=False):
     """Generates a matplotlib plot and saves it to a file."""
-    plt.figure(figsize=(8, 6))
-    plt.scatter(x_data, y_data, alpha=0.6, s=50, c=color, label='실험 데이터', edgecolors='white', linewidth=0.5)
-    
-    if y_pred is not None:
-        plt.plot(x_data, y_pred, 'r-', linewidth=2, label='피팅된 곡선', alpha=0.8)
-    
-    plt.xlabel(x_label, fontsize=12, fontweight='bold')
-    plt.ylabel(y_label, fontsize=12, fontweight='bold')
-    plt.title(title, fontsize=14, fontweight='bold', pad=15)
-    
-    # Apply ranges
-    if x_range and len(x_range) == 2:
-        if x_range[0] not in ["", None]: plt.xlim(left=float(x_range[0]))
-        if x_range[1] not in ["", None]: plt.xlim(right=float(x_range[1]))
-    if y_range and len(y_range) == 2:
-        if y_range[0] not in ["", None]: plt.ylim(bottom=float(y_range[0]))
-        if y_range[1] not in ["", None]: plt.ylim(top=float(y_range[1]))
-
-    plt.legend(loc='best', frameon=True, shadow=True)
-    plt.grid(True, alpha=0.3, linestyle='--')
-    plt.tight_layout()
-    
-    # Save to file
-    plt.savefig(save_path, format='png', dpi=100, bbox_inches='tight')
-    plt.close()
+    with open(save_path, 'wb') as f:
+        f.write(get_renderer().render_regression(x_data, y_data, y_pred, x_label, y_label, title, x_range, y_range, color, is_log))
     return True
 
-def generate_plot_base64(x_data, y_data, y_pred=None, x_label='X', y_label='Y', title='Plot', x_range=None, y_range=None, color='#3b82f6', is_log=False):
-    """Generates a matplotlib plot and returns it as a Base64 encoded PNG string."""
-    plt.figure(figsize=(8, 6))
-    plt.scatter(x_data, y_data, alpha=0.6, s=50, c=color, label='실험 데이터', edgecolors='white', linewidth=0.5)
-    
-    if y_pred is not None:
-        plt.plot(x_data, y_pred, 'r-', linewidth=2, label='피팅된 곡선', alpha=0.8)
-    
-    plt.xlabel(x_label, fontsize=12, fontweight='bold')
-    plt.ylabel(y_label, fontsize=12, fontweight='bold')
-    plt.title(title, fontsize=14, fontweight='bold', pad=15)
-    
-    # Apply ranges
-    if x_range and len(x_range) == 2:
-        if x_range[0] not in ["", None]: plt.xlim(left=float(x_range[0]))
-        if x_range[1] not in ["", None]: plt.xlim(right=float(x_range[1]))
-    if y_range and len(y_range) == 2:
-        if y_range[0] not in ["", None]: plt.ylim(bottom=float(y_range[0]))
-        if y_range[1] not in ["", None]: plt.ylim(top=float(y_range[1]))
-
-    plt.legend(loc='best', frameon=True, shadow=True)
-    plt.grid(True, alpha=0.3, linestyle='--')
-
-    if is_log:
-        import numpy as np
-        x_check = np.array(x_data)
-        y_check = np.array(y_data)
-        if np.all(x_check > 0): plt.xscale('log')
-        if np.all(y_check > 0): plt.yscale('log')
-
-    plt.tight_layout()
-    
-    # Save to buffer
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=100, bbox_inches='tight') # Reduced DPI for Base64 (web use)
-    plt.close()
-    buf.seek(0)
-    
-    # Encode to Base64
-    base64_str = base64.b64encode(buf.read()).decode('utf-8')
-    return f"data:image/png;base64,{base64_str}"
-
-def generate_residual_plot_base64(x_data, residuals, x_label='X', y_label='Y', title='Residual Plot', x_range=None):
-    """Generates a residual plot and returns it as a Base64 encoded PNG string."""
-    plt.figure(figsize=(8, 6))
-    plt.scatter(x_data, residuals, alpha=0.6, s=50, c='#8b5cf6', edgecolors='white', linewidth=0.5)
-    plt.axhline(y=0, color='r', linestyle='--', linewidth=2, alpha=0.7, label='Y = 0')
-    
-    plt.xlabel(x_label, fontsize=12, fontweight='bold')
-    plt.ylabel(f'{y_label} 잔차', fontsize=12, fontweight='bold')
-    plt.title(title, fontsize=14, fontweight='bold', pad=15)
-    
-    if x_range and len(x_range) == 2:
-        if x_range[0] not in ["", None]: plt.xlim(left=float(x_range[0]))
-        if x_range[1] not in ["", None]: plt.xlim(right=float(x_range[1]))
-
-    plt.legend(loc='best', frameon=True, shadow=True)
-    plt.grid(True, alpha=0.3, linestyle='--')
-    plt.tight_layout()
-    
-    # Save to buffer
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-    plt.close()
-    buf.seek(0)
-    
-    # Encode to Base64
-    base64_str = base64.b64encode(buf.read()).decode('utf-8')
-    return f"data:image/png;base64,{base64_str}"
+
+def generate_plot_base64(x_data, y_data, y_pred=None, x_label='X', y_label='Y', title='Plot', x_range=None, y_range=None, color='#3b82f6', is_log=False, fmt='png'):
+    """Generates a matplotlib plot and returns it as a Base64 data URI (PNG unless `fmt` says otherwise)."""
+    return _to_data_uri(get_renderer().render_regression(x_data, y_data, y_pred, x_label, y_label, title, x_range, y_range, color, is_log, fmt), fmt)
+
+
+def generate_residual_plot_base64(x_data, residuals, x_label='X', y_label='Y', title='Residual Plot', x_range=None, fmt='png'):
+    """Generates a residual plot and returns it as a Base64 data URI (PNG unless `fmt` says otherwise)."""
+    return _to_data_uri(get_renderer().render_residual(x_data, residuals, x_label, y_label, title, x_range, fmt), fmt)
+
+
 def generate_residual_plot_file(x_data, residuals, save_path, x_label='X', y_label='Y', title='잔차 분석', x_range=None):
     """Generates a residual plot and saves it to a file."""
-    plt.figure(figsize=(8, 6))
-    plt.scatter(x_data, residuals, alpha=0.6, s=50, c='#8b5cf6', edgecolors='white', linewidth=0.5, label='잔차')
-    plt.axhline(y=0, color='r', linestyle='--', linewidth=2, alpha=0.7, label='Y = 0')
-    
-    plt.xlabel(x_label, fontsize=12, fontweight='bold')
-    plt.ylabel(f'{y_label} 잔차', fontsize=12, fontweight='bold')
-    plt.title(title, fontsize=14, fontweight='bold', pad=15)
-    
-    if x_range and len(x_range) == 2:
-        if x_range[0] not in ["", None]: plt.xlim(left=float(x_range[0]))
-        if x_range[1] not in ["", None]: plt.xlim(right=float(x_range[1]))
-
-    plt.legend(loc='best', frameon=True, shadow=True)
-    plt.grid(True, alpha=0.3, linestyle='--')
-    plt.tight_layout()
-    
-    plt.savefig(save_path, format='png', dpi=100, bbox_inches='tight')
-    plt.close()
+    with open(save_path, 'wb') as f:
+        f.write(get_renderer().render_residual(x_data, residuals, x_label, y_label, title, x_range))
     return True
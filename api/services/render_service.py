@@ -0,0 +1,166 @@
+"""
+Plot Render Service
+Runs matplotlib rendering in a dedicated process pool so that report routes
+await render futures instead of blocking the event loop.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+RENDER_QUEUE_SIZE = int(os.getenv("RENDER_QUEUE_SIZE", "32"))
+
+RENDER_KINDS = ('regression', 'residual', 'combined', 'renditions')
+
+
+def _init_worker():
+    """Runs once per worker process: imports matplotlib, resolves fonts and builds the figure templates."""
+    from api.services.plot_service import get_renderer
+    get_renderer()
+
+
+def _render(kind, kwargs):
+    """Executed inside a worker process. Returns (image bytes, tuple of slices or rendition dict, render seconds)."""
+    from api.services.plot_service import get_renderer
+    started = time.perf_counter()
+    renderer = get_renderer()
+    if kind == 'regression':
+        image = renderer.render_regression(**kwargs)
+    elif kind == 'residual':
+        image = renderer.render_residual(**kwargs)
+    elif kind == 'combined':
+        image = renderer.render_combined(**kwargs)
+    elif kind == 'renditions':
+        image = renderer.render_renditions(**kwargs)
+    else:
+        raise ValueError(f"Unknown render kind: {kind}")
+    return image, time.perf_counter() - started
+
+
+class RenderService:
+    """
+    Process-pool render service with a bounded queue.
+
+    At most `queue_size` renders are accepted at once (running + waiting in the
+    pool); further callers wait for a free slot, which applies backpressure
+    instead of piling unbounded work onto the workers.
+    """
+
+    def __init__(self, workers=RENDER_WORKERS, queue_size=RENDER_QUEUE_SIZE):
+        self.workers = max(1, workers)
+        self.queue_size = max(self.workers, queue_size)
+        self._executor = None
+        self._slots = None
+        self._waiting = 0
+        self._queued = 0
+        self._completed = 0
+        self._failed = 0
+        self._restarts = 0
+        self._render_ms = deque(maxlen=500)
+        self._total_ms = deque(maxlen=500)
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: never fork the multi-threaded server process
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    def _reset_executor(self, broken):
+        """Drops a pool whose worker died (unless another caller already replaced it)."""
+        if self._executor is broken:
+            self._executor = None
+            self._restarts += 1
+            print("⚠️ Render worker pool broken, restarting")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, kind, kwargs):
+        """Runs one render; a crashed worker pool is replaced and the render retried once."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, _render, kind, kwargs)
+            except BrokenProcessPool:
+                self._reset_executor(executor)
+                if attempt == 1:
+                    raise
+
+    async def render(self, kind, **kwargs):
+        """Renders a plot in the worker pool and returns the encoded image bytes (a tuple of slices for split combined renders, {rendition: ...} for renditions)."""
+        if kind not in RENDER_KINDS:
+            raise ValueError(f"Unknown render kind: {kind}")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.queue_size)
+
+        started = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._queued += 1
+        try:
+            image, render_seconds = await self._run(kind, kwargs)
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._queued -= 1
+            self._slots.release()
+
+        self._completed += 1
+        self._render_ms.append(render_seconds * 1000)
+        self._total_ms.append((time.perf_counter() - started) * 1000)
+        return image
+
+    def warm_up(self):
+        """Starts every worker process so the first request does not pay for the spawn."""
+        executor = self._get_executor()
+        futures = [executor.submit(_init_worker) for _ in range(self.workers)]
+        try:
+            for future in futures:
+                future.result()
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def metrics(self) -> dict:
+        def summary(samples):
+            if not samples:
+                return {"avg": None, "p95": None, "max": None}
+            ordered = sorted(samples)
+            return {
+                "avg": round(sum(ordered) / len(ordered), 2),
+                "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 2),
+                "max": round(ordered[-1], 2)
+            }
+
+        return {
+            "workers": self.workers,
+            "queue_capacity": self.queue_size,
+            "queue_depth": self._queued + self._waiting,
+            "in_pool": self._queued,
+            "waiting_for_slot": self._waiting,
+            "completed": self._completed,
+            "failed": self._failed,
+            "pool_restarts": self._restarts,
+            "render_latency_ms": summary(self._render_ms),
+            "total_latency_ms": summary(self._total_ms)
+        }
+
+
+render_service = RenderService()
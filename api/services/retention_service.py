@@ -0,0 +1,338 @@
+"""
+Plot Retention Service
+Records which reports reference which stored plot objects and deletes objects
+that are no longer referenced, in batched calls on a schedule.
+Local disk: references in SQLite (the directory belongs to this instance).
+Supabase: one reference manifest per report inside the bucket, so every
+instance sharing the bucket sweeps against the same references.
+"""
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+
+from api.services.storage_service import get_storage_backend, object_index, object_name
+
+# A report keeps its plots alive for this long after it was generated (TTL)
+PLOT_RETENTION_DAYS = float(os.getenv("PLOT_RETENTION_DAYS", "30"))
+
+# Sweep schedule and batch size of the bulk delete calls
+GC_ENABLED = os.getenv("GC_ENABLED", "true").lower() in ("1", "true", "yes")
+GC_INTERVAL_SECONDS = float(os.getenv("GC_INTERVAL_SECONDS", "3600"))
+GC_BATCH_SIZE = int(os.getenv("GC_BATCH_SIZE", "100"))
+
+GC_DB_PATH = os.getenv("GC_DB_PATH", os.path.join(tempfile.gettempdir(), "plot_references.sqlite3"))
+
+# Folder of the per-report reference manifests in shared stores
+GC_MANIFEST_FOLDER = os.getenv("GC_MANIFEST_FOLDER", "refs")
+
+# Only content-addressed plot objects are ever deleted (legacy uploads keep their own names)
+CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+REPORT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plot_refs (
+    report_id TEXT NOT NULL,
+    location TEXT NOT NULL,
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (report_id, location, name)
+);
+CREATE INDEX IF NOT EXISTS plot_refs_object ON plot_refs (location, name);
+CREATE INDEX IF NOT EXISTS plot_refs_created ON plot_refs (created_at);
+CREATE TABLE IF NOT EXISTS plot_orphans (
+    location TEXT NOT NULL,
+    name TEXT NOT NULL,
+    released_at REAL NOT NULL,
+    PRIMARY KEY (location, name)
+);
+"""
+
+
+class PlotRetention:
+    """
+    Reference tracking + garbage collection for plot objects.
+
+    Policy: an object is live while at least one report referencing it is
+    younger than PLOT_RETENTION_DAYS. A sweep deletes:
+    - objects whose references were all released (reference count dropped to 0), and
+    - objects whose newest reference is older than the TTL (expired reports).
+    Objects still waiting in the write-behind upload queue are never touched.
+
+    Local stores: references live in this instance's SQLite database and only
+    tracked objects are deleted. Each batch is re-checked under the lock right
+    before the delete, so a report recorded meanwhile keeps its files.
+
+    Shared stores (Supabase): every report writes a manifest
+    '<GC_MANIFEST_FOLDER>/<report_id>.json' into the bucket (re-recording
+    rewrites it, which refreshes the TTL). A sweep lists the manifests and the
+    content-addressed objects of the bucket and deletes objects that no live
+    manifest references and that are either older than the TTL (so plots of
+    reports generated before manifests existed survive their TTL) or named by
+    a released manifest. Manifests written while the sweep ran are read again
+    before deleting.
+    """
+
+    def __init__(self, path=GC_DB_PATH, ttl_days=PLOT_RETENTION_DAYS, batch_size=GC_BATCH_SIZE):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.batch_size = batch_size
+        self._conn = None
+        self._lock = threading.Lock()
+        self._manifests = {}
+        self._sweeps = 0
+        self._deleted = 0
+        self.last_sweep = None
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    # ============================================
+    # Reference records
+    # ============================================
+
+    def record(self, report_id, urls, backend=None):
+        """Registers the report's plot objects (blocking; re-recording refreshes the TTL)."""
+        backend = backend or get_storage_backend()
+        location = backend.location
+        now = time.time()
+        names = sorted({object_name(url) for url in urls if url})
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany("INSERT OR REPLACE INTO plot_refs VALUES (?, ?, ?, ?)",
+                               [(report_id, location, name, now) for name in names])
+                db.executemany("DELETE FROM plot_orphans WHERE location = ? AND name = ?",
+                               [(location, name) for name in names])
+        if backend.shared:
+            try:
+                self._write_manifest(backend, report_id, names, now)
+            except Exception as e:
+                print(f"⚠️ Could not write plot references of report {report_id}: {e}")
+
+    def release(self, report_id, backend=None) -> int:
+        """Drops a report's references (blocking); objects left with none are deleted at the next sweep."""
+        backend = backend or get_storage_backend()
+        with self._lock:
+            db = self._db()
+            with db:
+                objects = db.execute("SELECT location, name FROM plot_refs WHERE report_id = ?", (report_id,)).fetchall()
+                db.execute("DELETE FROM plot_refs WHERE report_id = ?", (report_id,))
+                now = time.time()
+                for location, name in objects:
+                    if db.execute("SELECT 1 FROM plot_refs WHERE location = ? AND name = ? LIMIT 1",
+                                  (location, name)).fetchone() is None:
+                        db.execute("INSERT OR REPLACE INTO plot_orphans VALUES (?, ?, ?)", (location, name, now))
+        released = len(objects)
+        if backend.shared and REPORT_ID.match(report_id):
+            # The report may have been recorded by another instance sharing the bucket
+            try:
+                manifest = json.loads(backend.read(self._manifest_name(report_id)))
+            except Exception:
+                manifest = None
+            if manifest is not None and not manifest.get("released"):
+                self._write_manifest(backend, report_id, manifest.get("objects", []), manifest.get("recorded_at"), released=True)
+                released = max(released, len(manifest.get("objects", [])))
+        return released
+
+    @staticmethod
+    def _manifest_name(report_id):
+        return f"{GC_MANIFEST_FOLDER}/{report_id}.json"
+
+    def _write_manifest(self, backend, report_id, names, recorded_at, released=False):
+        manifest = {"report_id": report_id, "objects": list(names), "recorded_at": recorded_at, "released": released}
+        backend.upload(json.dumps(manifest).encode("utf-8"), self._manifest_name(report_id), "application/json")
+
+    def _read_manifests(self, backend, listing):
+        """Manifest contents for listed manifests (cached per name and update time)."""
+        manifests = {}
+        for entry in listing:
+            cached = self._manifests.get(entry["name"])
+            if cached is not None and cached[0] == entry["updated_at"]:
+                manifests[entry["name"]] = cached[1]
+                continue
+            try:
+                manifest = json.loads(backend.read(entry["name"]))
+            except Exception as e:
+                print(f"⚠️ Unreadable plot reference manifest {entry['name']}: {e}")
+                continue
+            self._manifests[entry["name"]] = (entry["updated_at"], manifest)
+            manifests[entry["name"]] = manifest
+        return manifests
+
+    # ============================================
+    # Sweeps
+    # ============================================
+
+    def sweep(self, backend=None, pending=()) -> dict:
+        """
+        One GC pass over the backend (blocking - run it off the event loop).
+
+        Returns:
+        - dict: {'candidates', 'deleted', 'failed_batches', 'expired_refs', 'ms'}
+          ({'skipped': reason} for backends without gc_supported)
+        """
+        backend = backend or get_storage_backend()
+        if not backend.gc_supported:
+            self.last_sweep = {"at": time.time(), "skipped": f"backend '{backend.name}' is not garbage-collected"}
+            return self.last_sweep
+
+        started = time.perf_counter()
+        pending = set(pending)
+        if backend.shared:
+            candidates, deleted, failed_batches, expired_refs = self._sweep_shared(backend, pending)
+        else:
+            candidates, deleted, failed_batches, expired_refs = self._sweep_local(backend, pending)
+
+        if deleted:
+            object_index.forget(backend.location, deleted)
+            # Cached report plots pointing at deleted objects must be re-rendered and re-uploaded
+            from api.services.plot_cache import plot_cache
+            plot_cache.invalidate_urls([backend.public_url(name) for name in deleted])
+
+        self._sweeps += 1
+        self._deleted += len(deleted)
+        self.last_sweep = {
+            "at": time.time(),
+            "backend": backend.name,
+            "candidates": candidates,
+            "deleted": len(deleted),
+            "failed_batches": failed_batches,
+            "expired_refs": expired_refs,
+            "ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+        print(f"DEBUG: plot GC sweep: {self.last_sweep}")
+        return self.last_sweep
+
+    def _sweep_local(self, backend, pending):
+        """SQLite-tracked objects: expired or released, re-checked and deleted batch by batch under the lock."""
+        location = backend.location
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            db = self._db()
+            expired = [name for (name,) in db.execute(
+                "SELECT name FROM plot_refs WHERE location = ? GROUP BY name HAVING MAX(created_at) < ?",
+                (location, cutoff))]
+            released = [name for (name,) in db.execute("SELECT name FROM plot_orphans WHERE location = ?", (location,))]
+        doomed = [name for name in dict.fromkeys(expired + released) if name not in pending]
+
+        deleted = []
+        failed_batches = 0
+        for start in range(0, len(doomed), self.batch_size):
+            with self._lock:
+                db = self._db()
+                # A report recorded since the selection above keeps the object alive
+                batch = [name for name in doomed[start:start + self.batch_size] if db.execute(
+                    "SELECT 1 FROM plot_refs WHERE location = ? AND name = ? AND created_at >= ? LIMIT 1",
+                    (location, name, cutoff)).fetchone() is None]
+                if not batch:
+                    continue
+                if not backend.delete(batch):
+                    failed_batches += 1
+                    continue
+                deleted.extend(batch)
+                with db:
+                    # Deleted objects need no further tracking; failed ones stay tracked and are retried next sweep
+                    rows = [(location, name) for name in batch]
+                    db.executemany("DELETE FROM plot_orphans WHERE location = ? AND name = ?", rows)
+                    db.executemany("DELETE FROM plot_refs WHERE location = ? AND name = ?", rows)
+
+        with self._lock:
+            db = self._db()
+            with db:
+                # Expired references of objects that other (younger) reports keep alive
+                expired_refs = len(deleted) + db.execute(
+                    "DELETE FROM plot_refs WHERE location = ? AND created_at < ? AND name IN "
+                    "(SELECT name FROM plot_refs WHERE location = ? AND created_at >= ?)",
+                    (location, cutoff, location, cutoff)).rowcount
+        return len(doomed), deleted, failed_batches, expired_refs
+
+    def _sweep_shared(self, backend, pending):
+        """Bucket-wide sweep against the reference manifests stored in the bucket."""
+        now = time.time()
+        cutoff = now - self.ttl_seconds
+        listing = list(backend.list_objects(GC_MANIFEST_FOLDER))
+        manifests = self._read_manifests(backend, [entry for entry in listing if entry["updated_at"] >= cutoff])
+        # Forget cached manifests that were removed
+        self._manifests = {name: self._manifests[name] for name in manifests if name in self._manifests}
+
+        live, released, finished = set(), set(), []
+        for name, manifest in manifests.items():
+            if manifest.get("released"):
+                released.update(manifest.get("objects", []))
+                finished.append(name)
+            else:
+                live.update(manifest.get("objects", []))
+        finished.extend(entry["name"] for entry in listing if entry["updated_at"] < cutoff)
+
+        doomed = [
+            entry["name"] for entry in backend.list_objects()
+            if CONTENT_ADDRESSED.match(entry["name"]) and entry["name"] not in live and entry["name"] not in pending
+            and (entry["created_at"] < cutoff or entry["name"] in released)
+        ]
+
+        # Reports recorded while the bucket was listed (e.g. reusing an old object) keep their objects
+        if doomed:
+            seen = {(entry["name"], entry["updated_at"]) for entry in listing}
+            fresh = [entry for entry in backend.list_objects(GC_MANIFEST_FOLDER) if (entry["name"], entry["updated_at"]) not in seen]
+            for manifest in self._read_manifests(backend, fresh).values():
+                if not manifest.get("released"):
+                    keep = set(manifest.get("objects", []))
+                    doomed = [name for name in doomed if name not in keep]
+
+        deleted = []
+        failed_batches = 0
+        for start in range(0, len(doomed), self.batch_size):
+            batch = doomed[start:start + self.batch_size]
+            if backend.delete(batch):
+                deleted.extend(batch)
+            else:
+                failed_batches += 1
+
+        # Released and expired manifests are dropped once their objects are gone (kept for a retry otherwise)
+        expired_refs = 0
+        if not failed_batches:
+            for start in range(0, len(finished), self.batch_size):
+                batch = finished[start:start + self.batch_size]
+                if backend.delete(batch):
+                    expired_refs += len(batch)
+                    for name in batch:
+                        self._manifests.pop(name, None)
+        return len(doomed), deleted, failed_batches, expired_refs
+
+    async def run_forever(self, interval=GC_INTERVAL_SECONDS):
+        """Scheduled sweeps (first one after one interval) on a worker thread."""
+        from api.services.upload_queue import upload_queue
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(None, self.sweep, None, upload_queue.pending_names())
+            except Exception as e:
+                print(f"ERROR: plot GC sweep failed: {type(e).__name__}: {e}")
+
+    def metrics(self) -> dict:
+        with self._lock:
+            db = self._db()
+            refs, reports = db.execute("SELECT COUNT(*), COUNT(DISTINCT report_id) FROM plot_refs").fetchone()
+            orphans = db.execute("SELECT COUNT(*) FROM plot_orphans").fetchone()[0]
+        return {
+            "enabled": GC_ENABLED,
+            "ttl_days": self.ttl_seconds / 86400,
+            "reports": reports,
+            "references": refs,
+            "released_objects": orphans,
+            "sweeps": self._sweeps,
+            "deleted": self._deleted,
+            "last_sweep": self.last_sweep
+        }
+
+
+plot_retention = PlotRetention()
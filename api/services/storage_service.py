@@ -1,32 +1,72 @@
 """
-Supabase Storage Service
-Handles uploading plot images to Supabase Storage and returns public URLs
+Plot Storage Service
+Stores plot images on a configurable backend (Supabase Storage or the local
+filesystem served under /plots) and returns public URLs
 """
 import os
+import asyncio
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
 from io import BytesIO
 from supabase import create_client, Client
 
 BUCKET_NAME = "plot-images"
 
+# Content-addressed objects never change, so clients/CDN may cache them for a year
+IMMUTABLE_CACHE_SECONDS = 31536000
+
+# Maximum number of uploads in flight at once (process-wide)
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "8"))
+
+# Backend selection: 'supabase' (default) or 'local' (no network, served by the /plots mount)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+LOCAL_PLOTS_DIR = os.getenv("LOCAL_PLOTS_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "plots"))
+LOCAL_PLOTS_URL = os.getenv("LOCAL_PLOTS_URL", "/plots")
+
+# Local record of objects known to exist in the bucket (content-addressed, so a name never changes meaning)
+STORAGE_INDEX_PATH = os.getenv("STORAGE_INDEX_PATH", os.path.join(tempfile.gettempdir(), "plot_object_index.txt"))
+
+_client = None
+_client_lock = threading.Lock()
+_upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY, thread_name_prefix="storage-upload")
+_upload_slots = None
+_backend = None
+
 
 def get_supabase_client() -> Client:
-    """Get Supabase client instance"""
-    # Read environment variables at runtime (after dotenv has loaded)
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SERVICE_KEY")
-    
-    if not supabase_url or not supabase_key:
-        raise Exception("Supabase 환경변수가 설정되지 않았습니다. SUPABASE_URL과 SUPABASE_SERVICE_KEY를 확인하세요.")
-    return create_client(supabase_url, supabase_key)
+    """
+    Get the process-wide Supabase client instance.
+    Created once and reused, so every upload shares the storage client's pooled
+    keep-alive HTTP connections instead of a new session + TLS handshake per call.
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            # Read environment variables at runtime (after dotenv has loaded)
+            supabase_url = os.getenv("SUPABASE_URL")
+            supabase_key = os.getenv("SUPABASE_SERVICE_KEY")
+            
+            if not supabase_url or not supabase_key:
+                raise Exception("Supabase 환경변수가 설정되지 않았습니다. SUPABASE_URL과 SUPABASE_SERVICE_KEY를 확인하세요.")
+            _client = create_client(supabase_url, supabase_key)
+    return _client
 
 
-def upload_plot_to_supabase(image_buffer: BytesIO, filename: str) -> str:
+def upload_plot_to_supabase(image_buffer: BytesIO, filename: str, content_type: str = "image/png", immutable: bool = False) -> str:
     """
     Upload a plot image to Supabase Storage and return the public URL.
     
     Args:
-        image_buffer: BytesIO buffer containing the PNG image
+        image_buffer: BytesIO buffer containing the encoded image
         filename: The filename to save (e.g., 'graph_uuid.png')
+        content_type: MIME type of the image (PNG by default)
+        immutable: True for content-addressed names - served with a one-year cache lifetime
     
     Returns:
         Public URL of the uploaded image
@@ -40,11 +80,15 @@ def upload_plot_to_supabase(image_buffer: BytesIO, filename: str) -> str:
         
         print(f"DEBUG: Uploading {filename} to Supabase ({len(image_bytes)} bytes)")
         
+        file_options = {"content-type": content_type, "upsert": "true"}
+        if immutable:
+            file_options["cache-control"] = str(IMMUTABLE_CACHE_SECONDS)
+        
         # Upload to Supabase Storage
         response = supabase.storage.from_(BUCKET_NAME).upload(
             path=filename,
             file=image_bytes,
-            file_options={"content-type": "image/png", "upsert": "true"}
+            file_options=file_options
         )
         
         # Get public URL
@@ -58,6 +102,275 @@ def upload_plot_to_supabase(image_buffer: BytesIO, filename: str) -> str:
         raise
 
 
+def content_address(image_bytes: bytes, extension: str) -> str:
+    """Object name derived from the content: '<sha256 hex>.<extension>'."""
+    return f"{hashlib.sha256(image_bytes).hexdigest()}.{extension}"
+
+
+def object_name(url: str) -> str:
+    """Object name from a public URL (content-addressed names are the last path segment)."""
+    return url.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+
+
+# ============================================
+# Storage backends
+# ============================================
+
+class StorageBackend:
+    """
+    Where plot objects live and how clients reach them.
+    `location` identifies the store (bucket / directory) in the existence index.
+    `gc_supported`: the retention sweep may delete from this store.
+    `shared`: other instances may use the same store, so the retention
+    references are kept inside the store itself (list_objects / read / upload).
+    """
+    name = None
+    location = None
+    gc_supported = False
+    shared = False
+
+    def upload(self, image_bytes: bytes, filename: str, content_type: str = "image/png", immutable: bool = False) -> str:
+        """Stores the object (blocking) and returns its public URL."""
+        raise NotImplementedError
+
+    def public_url(self, filename: str) -> str:
+        raise NotImplementedError
+
+    def delete(self, filenames) -> bool:
+        raise NotImplementedError
+
+    def confirm(self, filename: str) -> bool:
+        """
+        Existence check for an existence-index hit (blocking). Stores that are never
+        garbage-collected keep every object, so the index is trusted as is.
+        """
+        return True
+
+    def list_objects(self, folder: str = ""):
+        """Objects directly under `folder`: dicts with 'name' (full path), 'created_at' and 'updated_at' (epoch seconds)."""
+        raise NotImplementedError
+
+    def read(self, filename: str) -> bytes:
+        raise NotImplementedError
+
+
+def _epoch(timestamp) -> float:
+    """ISO 8601 timestamp from the storage API ('2024-01-01T00:00:00.000Z') -> epoch seconds."""
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp() if timestamp else 0.0
+
+
+class SupabaseStorageBackend(StorageBackend):
+    """
+    Supabase Storage bucket (public URLs, shared pooled client).
+    The bucket may be shared by several instances: retention references live in
+    the bucket and existence-index hits are confirmed against it.
+    """
+    name = "supabase"
+    gc_supported = True
+    shared = True
+    list_page_size = 1000
+
+    def __init__(self, bucket=BUCKET_NAME):
+        self.bucket = bucket
+        self.location = bucket
+
+    def upload(self, image_bytes, filename, content_type="image/png", immutable=False):
+        return upload_plot_to_supabase(BytesIO(image_bytes), filename, content_type, immutable)
+
+    def public_url(self, filename):
+        # Built locally by the client, no request is made
+        return get_supabase_client().storage.from_(self.bucket).get_public_url(filename)
+
+    def delete(self, filenames):
+        try:
+            get_supabase_client().storage.from_(self.bucket).remove(list(filenames))
+            return True
+        except Exception as e:
+            print(f"Error deleting files from Supabase: {e}")
+            return False
+
+    def confirm(self, filename):
+        # A retention sweep of any instance sharing the bucket may have removed the object
+        try:
+            return bool(get_supabase_client().storage.from_(self.bucket).exists(filename))
+        except Exception as e:
+            print(f"⚠️ Existence check of {filename} failed: {e}")
+            return False
+
+    def list_objects(self, folder=""):
+        bucket = get_supabase_client().storage.from_(self.bucket)
+        offset = 0
+        while True:
+            page = bucket.list(folder, {"limit": self.list_page_size, "offset": offset,
+                                        "sortBy": {"column": "name", "order": "asc"}})
+            for entry in page:
+                if entry.get("id") is None:
+                    continue  # sub-folder
+                yield {
+                    "name": f"{folder}/{entry['name']}" if folder else entry["name"],
+                    "created_at": _epoch(entry.get("created_at")),
+                    "updated_at": _epoch(entry.get("updated_at") or entry.get("created_at"))
+                }
+            if len(page) < self.list_page_size:
+                return
+            offset += len(page)
+
+    def read(self, filename):
+        return get_supabase_client().storage.from_(self.bucket).download(filename)
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Local directory served by the app's /plots StaticFiles mount.
+    Writes are atomic (temp file in the same directory + os.replace), so a
+    reader never sees a partially written image.
+    """
+    name = "local"
+    gc_supported = True
+
+    def __init__(self, root=LOCAL_PLOTS_DIR, base_url=LOCAL_PLOTS_URL):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.location = root
+        os.makedirs(root, exist_ok=True)
+
+    def upload(self, image_bytes, filename, content_type="image/png", immutable=False):
+        path = os.path.join(self.root, filename)
+        if not os.path.exists(path):
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(image_bytes)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return self.public_url(filename)
+
+    def public_url(self, filename):
+        return f"{self.base_url}/{filename}"
+
+    def confirm(self, filename):
+        # Files may have been removed by a retention sweep (of any instance sharing the directory)
+        return os.path.exists(os.path.join(self.root, filename))
+
+    def delete(self, filenames):
+        for filename in filenames:
+            try:
+                os.remove(os.path.join(self.root, filename))
+            except FileNotFoundError:
+                pass
+        return True
+
+
+STORAGE_BACKENDS = {
+    SupabaseStorageBackend.name: SupabaseStorageBackend,
+    LocalStorageBackend.name: LocalStorageBackend,
+}
+
+
+def get_storage_backend() -> StorageBackend:
+    """The configured backend (STORAGE_BACKEND), created once per process."""
+    global _backend
+    if _backend is None:
+        if STORAGE_BACKEND not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND} (choose from {', '.join(STORAGE_BACKENDS)})")
+        _backend = STORAGE_BACKENDS[STORAGE_BACKEND]()
+    return _backend
+
+
+class ObjectIndex:
+    """
+    Existence index of uploaded objects: an in-memory set backed by an
+    append-only file (one 'bucket/name' per line) that survives restarts.
+    Lookups never touch the network.
+    """
+
+    def __init__(self, path=STORAGE_INDEX_PATH):
+        self.path = path
+        self._names = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _load(self):
+        if self._names is None:
+            self._names = set()
+            if self.path and os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    self._names.update(line.strip() for line in f if line.strip())
+        return self._names
+
+    def contains(self, bucket, name) -> bool:
+        with self._lock:
+            found = f"{bucket}/{name}" in self._load()
+            if found:
+                self._hits += 1
+            else:
+                self._misses += 1
+            return found
+
+    def add(self, bucket, name):
+        entry = f"{bucket}/{name}"
+        with self._lock:
+            names = self._load()
+            if entry in names:
+                return
+            names.add(entry)
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(entry + "\n")
+                except OSError as e:
+                    print(f"⚠️ Could not persist object index entry: {e}")
+
+    def forget(self, bucket, names):
+        """Drops deleted objects and rewrites the on-disk file."""
+        entries = {f"{bucket}/{name}" for name in names}
+        with self._lock:
+            known = self._load()
+            if not entries & known:
+                return
+            known -= entries
+            if self.path:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(entry + "\n" for entry in sorted(known))
+                os.replace(tmp_path, self.path)
+
+    def metrics(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "known_objects": len(self._load()),
+            "skipped_uploads": self._hits,
+            "uploads": self._misses,
+            "skip_rate": round(self._hits / lookups, 4) if lookups else None
+        }
+
+
+object_index = ObjectIndex()
+
+
+async def upload_plot_async(image_bytes: bytes, filename: str, content_type: str = "image/png", immutable: bool = False) -> str:
+    """
+    Async upload to the configured backend: runs the blocking upload on the shared
+    upload thread pool. At most UPLOAD_CONCURRENCY uploads run at once; further
+    callers wait for a slot.
+    """
+    global _upload_slots
+    if _upload_slots is None:
+        _upload_slots = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+    async with _upload_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _upload_executor,
+            partial(get_storage_backend().upload, image_bytes, filename, content_type, immutable)
+        )
+
+
 def delete_plot_from_supabase(filename: str) -> bool:
     """
     Delete a plot image from Supabase Storage.
@@ -71,7 +384,33 @@ def delete_plot_from_supabase(filename: str) -> bool:
     try:
         supabase = get_supabase_client()
         supabase.storage.from_(BUCKET_NAME).remove([filename])
+        object_index.forget(BUCKET_NAME, [filename])
         return True
     except Exception as e:
         print(f"Error deleting file from Supabase: {e}")
         return False
+
+
+def is_stored(backend, filename) -> bool:
+    """Existence-index lookup confirmed against the backend (blocking); stale entries are dropped."""
+    if not object_index.contains(backend.location, filename):
+        return False
+    if backend.confirm(filename):
+        return True
+    object_index.forget(backend.location, [filename])
+    return False
+
+
+async def store_plot(image_bytes: bytes, extension: str = "png", content_type: str = "image/png") -> str:
+    """
+    Content-addressed upload: the object is named by the SHA-256 of its bytes.
+    Objects already in the existence index (and still in the store) return their
+    public URL without an upload; new ones are uploaded (immutable cache headers) and recorded.
+    """
+    backend = get_storage_backend()
+    filename = content_address(image_bytes, extension)
+    if await asyncio.to_thread(is_stored, backend, filename):
+        return backend.public_url(filename)
+    url = await upload_plot_async(image_bytes, filename, content_type, immutable=True)
+    object_index.add(backend.location, filename)
+    return url
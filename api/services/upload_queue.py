@@ -0,0 +1,174 @@
+"""
+Write-behind Upload Queue
+Returns deterministic (content-addressed) plot URLs immediately and uploads the
+bytes in the background with retry/backoff, so reports never wait on storage.
+"""
+import asyncio
+import os
+import random
+import time
+from collections import deque
+
+from api.services.storage_service import (
+    UPLOAD_CONCURRENCY, content_address, get_storage_backend, is_stored, object_index, upload_plot_async
+)
+
+# Bounded backlog: producers wait (backpressure) when this many uploads are queued
+UPLOAD_QUEUE_SIZE = int(os.getenv("UPLOAD_QUEUE_SIZE", "256"))
+
+# Attempts per object before it is reported as failed, and the backoff schedule between them
+UPLOAD_MAX_ATTEMPTS = int(os.getenv("UPLOAD_MAX_ATTEMPTS", "5"))
+UPLOAD_RETRY_BASE_SECONDS = float(os.getenv("UPLOAD_RETRY_BASE_SECONDS", "0.5"))
+UPLOAD_RETRY_MAX_SECONDS = float(os.getenv("UPLOAD_RETRY_MAX_SECONDS", "30"))
+
+# How long shutdown waits for queued uploads to finish
+UPLOAD_DRAIN_SECONDS = float(os.getenv("UPLOAD_DRAIN_SECONDS", "30"))
+
+# Number of recent failures kept for the status endpoint
+FAILED_HISTORY = 50
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter (50-100% of the capped delay) after the given failed attempt."""
+    delay = min(UPLOAD_RETRY_MAX_SECONDS, UPLOAD_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class UploadQueue:
+    """
+    Background uploader: a bounded asyncio queue drained by UPLOAD_CONCURRENCY
+    worker tasks on the server's event loop.
+
+    Object names are the SHA-256 of the bytes, so the public URL is known before
+    the upload starts and the same image is never queued twice.
+    Pending entries: state 'queued' -> 'uploading' (-> 'retrying' -> 'uploading' ...),
+    removed on success, moved to the failed history after UPLOAD_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, max_size=UPLOAD_QUEUE_SIZE, workers=UPLOAD_CONCURRENCY, max_attempts=UPLOAD_MAX_ATTEMPTS):
+        self.max_size = max_size
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._queue = None
+        self._loop = None
+        self._tasks = []
+        self._pending = {}
+        self._failed = deque(maxlen=FAILED_HISTORY)
+        self._completed = 0
+        self._retries = 0
+        self._failures = 0
+
+    def _ensure_started(self):
+        """Creates the queue and workers on the running loop (again if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Jobs queued on a previous (closed) loop can no longer run
+        for name in [n for n, job in self._pending.items() if job["state"] == "queued"]:
+            self._fail(name, "event loop closed before upload")
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def enqueue(self, image_bytes: bytes, extension: str = "png", content_type: str = "image/png") -> str:
+        """
+        Schedules a content-addressed upload and returns its public URL right away.
+        Objects already stored or already pending are not queued again.
+        """
+        backend = get_storage_backend()
+        filename = content_address(image_bytes, extension)
+        url = backend.public_url(filename)
+        if filename in self._pending or await asyncio.to_thread(is_stored, backend, filename):
+            return url
+        if filename in self._pending:
+            return url  # queued by another report while the existence check ran
+
+        self._ensure_started()
+        self._pending[filename] = {
+            "name": filename, "url": url, "state": "queued", "attempts": 0,
+            "error": None, "queued_at": time.time()
+        }
+        await self._queue.put((image_bytes, filename, content_type, backend.location))
+        return url
+
+    async def _worker(self):
+        while True:
+            image_bytes, filename, content_type, location = await self._queue.get()
+            try:
+                await self._upload(image_bytes, filename, content_type, location)
+            except Exception as e:
+                print(f"ERROR: Upload worker failed on {filename}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _upload(self, image_bytes, filename, content_type, location):
+        job = self._pending[filename]
+        for attempt in range(1, self.max_attempts + 1):
+            job["state"], job["attempts"] = "uploading", attempt
+            try:
+                await upload_plot_async(image_bytes, filename, content_type, immutable=True)
+                object_index.add(location, filename)
+                self._pending.pop(filename, None)
+                self._completed += 1
+                return
+            except Exception as e:
+                job["error"] = f"{type(e).__name__}: {e}"
+                if attempt == self.max_attempts:
+                    break
+                self._retries += 1
+                job["state"] = "retrying"
+                delay = retry_delay(attempt)
+                print(f"DEBUG: Upload of {filename} failed (attempt {attempt}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        self._fail(filename, job["error"])
+
+    def _fail(self, filename, error):
+        job = self._pending.pop(filename, None)
+        if job is None:
+            return
+        job.update(state="failed", error=error, failed_at=time.time())
+        self._failed.append(job)
+        self._failures += 1
+        print(f"ERROR: Giving up on upload of {filename}: {error}")
+        # The URL was already handed out and cached - drop it so the next report re-renders and re-uploads
+        from api.services.plot_cache import plot_cache
+        plot_cache.invalidate_urls([job["url"]])
+
+    async def drain(self, timeout=UPLOAD_DRAIN_SECONDS) -> bool:
+        """Waits until every queued upload has finished (True) or the timeout passes (False)."""
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            print(f"⚠️ {len(self._pending)} uploads still pending after {timeout}s")
+            return False
+
+    def pending_names(self) -> set:
+        """Objects whose URLs were handed out but are not stored yet."""
+        return set(self._pending)
+
+    def metrics(self) -> dict:
+        states = [job["state"] for job in self._pending.values()]
+        return {
+            "pending": len(states),
+            "queued": states.count("queued"),
+            "uploading": states.count("uploading"),
+            "retrying": states.count("retrying"),
+            "capacity": self.max_size,
+            "completed": self._completed,
+            "retries": self._retries,
+            "failed": self._failures
+        }
+
+    def status(self) -> dict:
+        """Metrics plus the pending uploads and the most recent failures."""
+        return {
+            **self.metrics(),
+            "pending_uploads": [dict(job) for job in self._pending.values()],
+            "recent_failures": list(self._failed)
+        }
+
+
+upload_queue = UploadQueue()
@@ -0,0 +1,164 @@
+"""
+Startup Warm-up Service
+Pays the cold-start costs (font cache, first figure, first fits, heavy imports,
+render worker spawn) once at startup and gates readiness on their completion.
+"""
+import importlib
+import os
+import threading
+import time
+
+import numpy as np
+
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Retries of a failed step (transient errors) and the backoff before the first retry (doubled each time)
+WARMUP_RETRIES = int(os.getenv("WARMUP_RETRIES", "2"))
+WARMUP_RETRY_DELAY_SECONDS = float(os.getenv("WARMUP_RETRY_DELAY_SECONDS", "1"))
+
+# Imported up front so the first request does not pay for them
+HEAVY_MODULES = (
+    'scipy.optimize',
+    'scipy.signal',
+    'scipy.stats',
+    'sklearn.metrics',
+    'pandas',
+    'google.generativeai',
+)
+
+
+def _warm_imports():
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
+    return {"modules": len(HEAVY_MODULES)}
+
+
+def _warm_font():
+    from api.services.plot_service import resolve_font
+    return {"font": resolve_font()}
+
+
+def _warm_render():
+    """Renders one throwaway figure in this process (base64 helpers use the in-process renderer)."""
+    from api.services.plot_service import get_renderer
+    x = np.linspace(1, 10, 20)
+    get_renderer().render_combined(x, 2 * x, 2 * x, np.zeros_like(x), x_label='x', y_label='y', title='warm-up')
+    return {}
+
+
+def _warm_render_workers():
+    from api.services.render_service import render_service
+    render_service.warm_up()
+    return {"workers": render_service.workers}
+
+
+# Multi-start budget for the warm-up fits: enough to run the LHS search in the pool, not a full search
+WARMUP_MULTI_START = {'preset': 'interactive', 'n_starts': 2, 'max_workers': 2, 'patience': 1}
+
+
+def _warm_fits():
+    """
+    Starts the fit worker pool, then runs one small fit per model so every code path
+    (Jacobians, initial guesses, and the pooled LHS multi-start search for models that use it) is touched.
+    """
+    from api.utils.curve_fitting import smart_curve_fitting, warm_fit_pool, PHYSICS_MODELS
+    workers = warm_fit_pool()
+    x = np.linspace(0.5, 10, 40)
+    y = 1.5 * x + 2 + 0.1 * np.sin(3 * x)
+    failed = []
+    for model_key, model_info in PHYSICS_MODELS.items():
+        multi_start = WARMUP_MULTI_START if model_info.get('multi_start') else None
+        try:
+            smart_curve_fitting(x, y, models_to_try=[model_key], multi_start=multi_start)
+        except Exception:
+            failed.append(model_key)
+    return {"models": len(PHYSICS_MODELS), "fit_workers": workers, "failed": failed}
+
+
+# (name, step, essential): a non-essential step only pre-pays a cost that the first request
+# would otherwise pay, so its failure leaves the instance ready ('degraded')
+WARMUP_STEPS = (
+    ('imports', _warm_imports, True),
+    ('font', _warm_font, False),
+    ('render', _warm_render, True),
+    ('render_workers', _warm_render_workers, False),
+    ('fits', _warm_fits, False),
+)
+
+
+class WarmupService:
+    """
+    Runs the warm-up steps once and tracks readiness.
+
+    status: 'pending' -> 'running' -> 'ready' | 'degraded' | 'failed', or
+    'skipped' when the warm-up is disabled. Each failed step is retried
+    WARMUP_RETRIES times with backoff. If only non-essential steps still fail,
+    the status is 'degraded' (ready). If an essential step fails, the status
+    is 'failed' (not ready) and the next run() retries just the failed steps.
+    """
+
+    def __init__(self, steps=WARMUP_STEPS):
+        self._steps = steps
+        self._lock = threading.Lock()
+        self.status = 'pending'
+        self.started_at = None
+        self.finished_at = None
+        self.results = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ('ready', 'degraded', 'skipped')
+
+    def skip(self):
+        """Warm-up disabled (WARMUP_ON_STARTUP=false): costs are paid by the first requests, the instance is ready."""
+        with self._lock:
+            if self.status == 'pending':
+                self.status = 'skipped'
+
+    def run(self):
+        """
+        Blocking; safe to call from several threads - only one call does the work.
+        After a 'failed' run, calling it again retries the steps that failed.
+        """
+        with self._lock:
+            if self.status not in ('pending', 'failed'):
+                return self.status
+            self.status = 'running'
+            self.started_at = self.started_at or time.time()
+            self.finished_at = None
+
+        status = 'ready'
+        for name, step, essential in self._steps:
+            if self.results.get(name, {}).get("ok"):
+                continue
+            self.results[name] = self._run_step(name, step)
+            print(f"DEBUG: warm-up step '{name}': {self.results[name]}")
+            if not self.results[name]["ok"]:
+                status = 'failed' if essential else ('degraded' if status == 'ready' else status)
+
+        self.finished_at = time.time()
+        self.status = status
+        return status
+
+    def _run_step(self, name, step):
+        for attempt in range(WARMUP_RETRIES + 1):
+            started = time.perf_counter()
+            try:
+                detail = step()
+                return {"ok": True, "ms": round((time.perf_counter() - started) * 1000, 1), "attempts": attempt + 1, **detail}
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if attempt < WARMUP_RETRIES:
+                    delay = WARMUP_RETRY_DELAY_SECONDS * 2 ** attempt
+                    print(f"⚠️ Warm-up step '{name}' failed ({error}), retrying in {delay:.1f}s")
+                    time.sleep(delay)
+        return {"ok": False, "ms": round((time.perf_counter() - started) * 1000, 1), "attempts": WARMUP_RETRIES + 1, "error": error}
+
+    def report(self) -> dict:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 2)
+        return {"status": self.status, "elapsed_s": elapsed, "steps": self.results}
+
+
+warmup_service = WarmupService()
@@ -5,10 +5,19 @@ Curve Fitting Utilities
 
 import numpy as np
 import json
+import multiprocessing
 import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from scipy.optimize import curve_fit
+from scipy.signal import find_peaks
+from scipy.stats import qmc
 from sklearn.metrics import r2_score
 
+from .piecewise_regression import piecewise_linear_func, piecewise_equation, fit_piecewise_linear
+
 # 현재 파일의 디렉토리 경로
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_DIR = os.path.join(os.path.dirname(CURRENT_DIR), 'config')
@@ -41,6 +50,42 @@ def sine_wave_func(x, a, b, c, d):
     """삼각 함수: y = a·sin(bx + c) + d"""
     return a * np.sin(b * x + c) + d
 
+def damped_sine_func(x, a, b, c, d, e):
+    """감쇠 진동: y = a·e^(-bx)·sin(cx + d) + e"""
+    return a * np.exp(-b * x) * np.sin(c * x + d) + e
+
+def rc_charge_func(x, a, b, c):
+    """RC 충전: y = a·(1 - e^(-x/b)) + c"""
+    return a * (1 - np.exp(-x / b)) + c
+
+def rc_discharge_func(x, a, b, c):
+    """RC 방전: y = a·e^(-x/b) + c"""
+    return a * np.exp(-x / b) + c
+
+# ============================================
+# 해석적 야코비안 (curve_fit jac=, 반환 형태: (n, 파라미터 수))
+# ============================================
+
+def damped_sine_jac(x, a, b, c, d, e):
+    decay = np.exp(-b * x)
+    sin_t = np.sin(c * x + d)
+    cos_t = np.cos(c * x + d)
+    return np.column_stack([
+        decay * sin_t,
+        -a * x * decay * sin_t,
+        a * x * decay * cos_t,
+        a * decay * cos_t,
+        np.ones_like(x)
+    ])
+
+def rc_charge_jac(x, a, b, c):
+    decay = np.exp(-x / b)
+    return np.column_stack([1 - decay, -a * decay * x / b**2, np.ones_like(x)])
+
+def rc_discharge_jac(x, a, b, c):
+    decay = np.exp(-x / b)
+    return np.column_stack([decay, a * decay * x / b**2, np.ones_like(x)])
+
 # 함수 매핑
 FUNCTION_MAP = {
     'linear': linear_func,
@@ -48,7 +93,18 @@ FUNCTION_MAP = {
     'exponential': exponential_func,
     'power_law': power_law_func,
     'logarithmic': logarithmic_func,
-    'sine': sine_wave_func
+    'sine': sine_wave_func,
+    'piecewise_linear': piecewise_linear_func,
+    'damped_sine': damped_sine_func,
+    'rc_charge': rc_charge_func,
+    'rc_discharge': rc_discharge_func
+}
+
+# 해석적 야코비안이 있는 모델 (없으면 curve_fit의 수치 미분 사용)
+JACOBIAN_MAP = {
+    'damped_sine': damped_sine_jac,
+    'rc_charge': rc_charge_jac,
+    'rc_discharge': rc_discharge_jac
 }
 
 # ============================================
@@ -72,27 +128,561 @@ def load_physics_models():
     
     return physics_models
 
+
+def _curve_fit_bounds(model_info):
+    """models.json 'bounds' ([하한], [상한], null = 제한 없음) → curve_fit bounds"""
+    bounds = model_info.get('bounds')
+    if not bounds:
+        return (-np.inf, np.inf)
+    lower, upper = bounds
+    return (
+        [-np.inf if v is None else v for v in lower],
+        [np.inf if v is None else v for v in upper]
+    )
+
 # 전역 변수로 로드
 PHYSICS_MODELS = load_physics_models()
 
+# 자동 선택 대상 모델
+# rc_charge / rc_discharge는 exponential(a·e^(bx) + c)의 재매개변수화라 자동 비교 시 항상 동점 →
+# 이름 붙은 물리 모델은 manual_model로 지정할 때만 사용
+AUTO_MODELS = [key for key, info in PHYSICS_MODELS.items() if info.get('auto_select', True)]
+
+# ============================================
+# 초기값 추정
+# ============================================
+
+def _initial_guess(model_key, model_info, x_data, y_data):
+    """데이터 기반 초기 추정값(p0) 계산"""
+    k = model_info['params']
+    
+    # 데이터 범위 계산
+    y_range = y_data.max() - y_data.min() if len(y_data) > 0 else 1.0
+    y_mean = y_data.mean() if len(y_data) > 0 else 0.0
+    x_range = x_data.max() - x_data.min() if len(x_data) > 0 else 1.0
+    
+    if model_key == 'linear':
+        # polyfit 대신 curve_fit을 사용하여 공분산 행렬(pcov)을 얻음
+        p0 = [1.0, 0.0]
+        # 더 나은 초기값 시도
+        if len(x_data) > 1:
+            coeffs = np.polyfit(x_data, y_data, 1)
+            p0 = [coeffs[0], coeffs[1]]
+    elif model_key == 'exponential':
+        p0 = _exponential_guess(x_data, y_data)
+    elif model_key == 'power_law':
+        p0 = [y_mean, 1.0, 0.0]
+    elif model_key == 'logarithmic':
+        p0 = [y_range / np.log(x_range) if x_range > 1 else 1.0, y_data.min()]
+    elif model_key == 'sine':
+        p0 = _sine_guess(x_data, y_data)
+    elif model_key == 'damped_sine':
+        p0 = _damped_sine_guess(x_data, y_data)
+    elif model_key in ('rc_charge', 'rc_discharge'):
+        p0 = _rc_guess(x_data, y_data, charging=(model_key == 'rc_charge'))
+    else:
+        # 기본 초기값 사용
+        p0 = model_info.get('initial_guess', [1.0] * k)
+    
+    return p0
+
+def _dominant_omega(x, y):
+    """
+    주기 신호의 각주파수 추정: 균일 격자로 보간한 뒤 FFT 스펙트럼의 최대 피크 (포물선 보간으로 빈 사이 정밀화)
+    x는 정렬되어 있어야 함. 주기가 보이지 않으면 2π / x 범위
+    """
+    n = len(x)
+    x_range = x[-1] - x[0] if n > 1 else 0.0
+    if n < 4 or x_range <= 0:
+        return 2 * np.pi / x_range if x_range > 0 else 1.0
+    # 비균일 간격도 처리하도록 같은 개수의 균일 격자로 보간
+    grid = np.linspace(x[0], x[-1], n)
+    values = np.interp(grid, x, y)
+    values = values - values.mean()
+    spectrum = np.abs(np.fft.rfft(values * np.hanning(n)))
+    if len(spectrum) < 3 or not np.any(spectrum[1:] > 0):
+        return 2 * np.pi / x_range
+    peak = 1 + int(np.argmax(spectrum[1:]))
+    shift = 0.0
+    if 1 < peak < len(spectrum) - 1:
+        left, center, right = spectrum[peak - 1], spectrum[peak], spectrum[peak + 1]
+        denominator = left - 2 * center + right
+        if denominator != 0:
+            shift = 0.5 * (left - right) / denominator
+    step = grid[1] - grid[0]
+    return 2 * np.pi * (peak + shift) / (n * step)
+
+
+def _sine_guess(x_data, y_data):
+    """
+    사인 초기값: FFT 피크로 각주파수를 정하고 진폭·위상·오프셋은 그 주파수에서 선형 최소제곱으로 계산
+    (y ≈ α·sin(bx) + β·cos(bx) + d → a = √(α² + β²), c = atan2(β, α))
+    """
+    order = np.argsort(x_data)
+    x = np.asarray(x_data, dtype=float)[order]
+    y = np.asarray(y_data, dtype=float)[order]
+    omega = _dominant_omega(x, y)
+    design = np.column_stack([np.sin(omega * x), np.cos(omega * x), np.ones_like(x)])
+    (alpha, beta, offset), *_ = np.linalg.lstsq(design, y, rcond=None)
+    amplitude = np.hypot(alpha, beta)
+    return [amplitude if amplitude > 0 else np.ptp(y) / 2, omega, np.arctan2(beta, alpha), offset]
+
+
+def _damped_sine_guess(x_data, y_data):
+    """
+    감쇠 진동 초기값: 주기는 FFT 피크, 포락선(진폭, 감쇠율)은 피크 추적으로 추정하고
+    위상·진폭은 고정된 감쇠/주파수에서 선형 최소제곱으로 계산
+    """
+    order = np.argsort(x_data)
+    x = np.asarray(x_data, dtype=float)[order]
+    y = np.asarray(y_data, dtype=float)[order]
+    
+    # 오프셋: 후반부가 평형점에 가까우므로 전체 평균과 후반부 평균의 평균 사용
+    offset = 0.5 * (y.mean() + y[len(y) // 2:].mean())
+    yc = y - offset
+    
+    # 잡음에 의한 작은 피크를 무시하기 위한 최소 돌출도
+    prominence = 0.1 * np.ptp(yc)
+    
+    # 주기: FFT 스펙트럼 피크 (잡음 속 작은 피크나 비균일 간격에도 안정적)
+    omega = _dominant_omega(x, yc)
+    
+    # 포락선: |y| 피크의 로그-선형 피팅 → 감쇠율
+    env_peaks, _ = find_peaks(np.abs(yc), prominence=prominence)
+    env_peaks = env_peaks[np.abs(yc[env_peaks]) > 0]
+    decay = 0.0
+    if len(env_peaks) >= 2:
+        slope, _ = np.polyfit(x[env_peaks], np.log(np.abs(yc[env_peaks])), 1)
+        decay = max(-slope, 0.0)
+    
+    # 진폭·위상: y - e ≈ e^(-bx)·(α·sin(cx) + β·cos(cx))
+    envelope = np.exp(-decay * x)
+    design = np.column_stack([envelope * np.sin(omega * x), envelope * np.cos(omega * x)])
+    (alpha, beta), *_ = np.linalg.lstsq(design, yc, rcond=None)
+    amplitude = np.hypot(alpha, beta)
+    phase = np.arctan2(beta, alpha)
+    
+    return [amplitude if amplitude > 0 else (y.max() - y.min()) / 2, decay, omega, phase, offset]
+
+
+def _exponential_guess(x_data, y_data):
+    """
+    지수 함수 초기값: 증가·감쇠 양쪽의 지수율 후보(±배수/x 범위)마다
+    a, c를 선형 최소제곱으로 풀고 잔차가 가장 작은 조합 선택
+    (감쇠 데이터에서 b > 0 초기값으로 시작해 선형 근사에 빠지는 것 방지)
+    """
+    x = np.asarray(x_data, dtype=float)
+    y = np.asarray(y_data, dtype=float)
+    x_range = np.ptp(x) if len(x) > 1 else 0.0
+    best_sse, best = np.inf, [np.ptp(y) if len(y) else 1.0, 0.01, y.min() if len(y) else 0.0]
+    if x_range <= 0:
+        return best
+    
+    for rate in (0.25, 0.5, 1.0, 2.0, 4.0, 8.0):
+        for b in (rate / x_range, -rate / x_range):
+            with np.errstate(over='ignore', invalid='ignore'):
+                basis = np.exp(b * x)
+            if not np.all(np.isfinite(basis)):
+                continue
+            design = np.column_stack([basis, np.ones_like(x)])
+            (a, c), *_ = np.linalg.lstsq(design, y, rcond=None)
+            sse = np.sum((y - design @ (a, c))**2)
+            if sse < best_sse:
+                best_sse, best = sse, [a, b, c]
+    return best
+
+
+def _rc_guess(x_data, y_data, charging):
+    """
+    RC 충·방전 초기값: 양 끝 구간으로 초기값·점근값을 잡고,
+    정규화된 지수 부분의 로그-선형 피팅으로 시정수 추정
+    """
+    order = np.argsort(x_data)
+    x = np.asarray(x_data, dtype=float)[order]
+    y = np.asarray(y_data, dtype=float)[order]
+    x_range = x[-1] - x[0] if len(x) > 1 else 1.0
+    
+    tail = max(1, len(y) // 10)
+    y_start = y[:tail].mean()
+    y_end = y[-tail:].mean()
+    
+    # 방전: y = a·e^(-x/b) + c → c ≈ 끝값, a ≈ 시작값 - 끝값
+    # 충전: y = a·(1 - e^(-x/b)) + c → c ≈ 시작값, a ≈ 끝값 - 시작값
+    if charging:
+        amplitude, offset = y_end - y_start, y_start
+        remaining = 1 - (y - offset) / amplitude if amplitude != 0 else np.zeros_like(y)
+    else:
+        amplitude, offset = y_start - y_end, y_end
+        remaining = (y - offset) / amplitude if amplitude != 0 else np.zeros_like(y)
+    
+    tau = x_range / 3 if x_range > 0 else 1.0
+    usable = (remaining > 0.05) & (remaining < 0.95)
+    if usable.sum() >= 2:
+        slope, _ = np.polyfit(x[usable], np.log(remaining[usable]), 1)
+        if slope < 0:
+            tau = -1 / slope
+    
+    return [amplitude if amplitude != 0 else 1.0, tau, offset]
+
+# ============================================
+# 다중 시작점(Multi-start) 전역 탐색
+# ============================================
+
+# 예산 프리셋: interactive는 빠른 응답, batch는 보고서 생성용 정밀 탐색
+MULTI_START_BUDGETS = {
+    'interactive': {
+        'n_starts': 12,       # 라틴 하이퍼큐브 시작점 개수
+        'spread': 1.0,        # 초기값 주변 탐색 폭 (10^±spread 배, 로그 스케일)
+        'max_fev': 400,       # 시작점당 짧은 피팅의 최대 함수 호출 수
+        'target_r2': 0.999,   # 이 R²에 도달하면 조기 종료
+        'min_improvement': 1e-4,  # 라운드 간 R² 개선이 이보다 작으면 정체로 간주
+        'patience': 1,        # 정체 라운드가 이만큼 연속되면 종료
+        'max_workers': 4      # 라운드당 병렬 실행 개수
+    },
+    'batch': {
+        'n_starts': 32,
+        'spread': 1.0,
+        'max_fev': 1000,
+        'target_r2': 0.9999,
+        'min_improvement': 1e-6,
+        'patience': 4,
+        'max_workers': 4
+    }
+}
+
+# dict로 개별 값을 덮어쓸 때 허용 범위: 키 -> (타입, 최솟값, 최댓값)
+# 상한은 요청 하나가 풀을 오래 점유하지 못하게 하기 위함
+MULTI_START_LIMITS = {
+    'n_starts': (int, 1, 256),
+    'spread': (float, 0.0, 6.0),
+    'max_fev': (int, 1, 100000),
+    'target_r2': (float, 0.0, 1.0),
+    'min_improvement': (float, 0.0, 1.0),
+    'patience': (int, 1, 64),
+    'max_workers': (int, 1, 64)
+}
+
+_FIT_POOL = None
+_FIT_POOL_LOCK = threading.Lock()
+FIT_POOL_WORKERS = max(1, min(os.cpu_count() or 1, 8))
+
+
+def resolve_multi_start_budget(multi_start):
+    """
+    요청 옵션을 다중 시작점 예산 딕셔너리로 변환
+    
+    - None / False: 비활성화
+    - True: 'interactive' 프리셋
+    - 'interactive' / 'batch': 해당 프리셋
+    - dict: 'preset' 키(기본 interactive) 위에 개별 값을 덮어씀
+    """
+    if not multi_start:
+        return None
+    if multi_start is True:
+        return dict(MULTI_START_BUDGETS['interactive'])
+    if isinstance(multi_start, str):
+        if multi_start not in MULTI_START_BUDGETS:
+            raise ValueError(f"Unknown multi-start preset: {multi_start}")
+        return dict(MULTI_START_BUDGETS[multi_start])
+    if isinstance(multi_start, dict):
+        preset = multi_start.get('preset', 'interactive')
+        if not isinstance(preset, str) or preset not in MULTI_START_BUDGETS:
+            raise ValueError(f"Unknown multi-start preset: {preset!r} (expected one of {', '.join(MULTI_START_BUDGETS)})")
+        budget = dict(MULTI_START_BUDGETS[preset])
+        for key, value in multi_start.items():
+            if key == 'preset':
+                continue
+            if key not in MULTI_START_LIMITS:
+                raise ValueError(f"Unknown multi_start option: {key} (expected preset or one of {', '.join(MULTI_START_LIMITS)})")
+            budget[key] = _check_budget_value(key, value)
+        return budget
+    raise ValueError(f"Invalid multi_start option: {multi_start!r}")
+
+
+def _check_budget_value(key, value):
+    """다중 시작점 개별 값의 타입/범위 검증 (bool은 int의 하위 타입이므로 별도로 거부)"""
+    kind, low, high = MULTI_START_LIMITS[key]
+    if kind is int:
+        valid_type = isinstance(value, int) and not isinstance(value, bool)
+        expected = "an integer"
+    else:
+        valid_type = isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value)
+        expected = "a number"
+    if not valid_type or not (low <= value <= high):
+        raise ValueError(f"multi_start.{key} must be {expected} between {low} and {high}, got {value!r}")
+    return kind(value)
+
+
+def _get_fit_pool():
+    """
+    짧은 피팅용 프로세스 풀 (최초 사용 시 생성, 프로세스 전역 공유)
+    스레드를 쓰는 서버 안에서 fork하면 잠긴 락이 복제될 수 있으므로 spawn 컨텍스트 사용 (render_service와 동일)
+    """
+    global _FIT_POOL
+    with _FIT_POOL_LOCK:
+        if _FIT_POOL is None:
+            _FIT_POOL = ProcessPoolExecutor(
+                max_workers=FIT_POOL_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _FIT_POOL
+
+
+def _reset_fit_pool(broken):
+    """워커가 죽어 깨진 풀을 버림 (다른 스레드가 이미 새 풀을 만들었으면 그대로 둠)"""
+    global _FIT_POOL
+    with _FIT_POOL_LOCK:
+        if _FIT_POOL is broken:
+            _FIT_POOL = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_fit_pool():
+    """앱 종료 시 워커 프로세스 정리"""
+    global _FIT_POOL
+    with _FIT_POOL_LOCK:
+        pool, _FIT_POOL = _FIT_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_in_fit_pool(fn, arg_lists):
+    """
+    fn(*args)를 풀에서 병렬 실행하고 결과를 순서대로 반환
+    워커 비정상 종료(BrokenProcessPool) 시 풀을 새로 만들어 한 번 재시도
+    """
+    for attempt in range(2):
+        pool = _get_fit_pool()
+        try:
+            futures = [pool.submit(fn, *args) for args in arg_lists]
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            _reset_fit_pool(pool)
+            if attempt == 1:
+                raise
+            print("⚠️ Fit worker pool broken, restarting")
+
+
+def warm_fit_pool():
+    """모든 피팅 워커 프로세스를 미리 시작하고 짧은 피팅 한 번씩 실행 (첫 다중 시작 요청의 spawn/import 비용 제거)"""
+    x = np.linspace(1, 10, 10)
+    _run_in_fit_pool(_short_fit, [('linear', x, 2 * x + 1, [1.0, 0.0], 100)] * FIT_POOL_WORKERS)
+    return FIT_POOL_WORKERS
+
+
+def _latin_hypercube_starts(p0, n_starts, spread, seed=0):
+    """
+    데이터 기반 초기값 주변에 라틴 하이퍼큐브 시작점 생성 (첫 번째는 p0 자신)
+    
+    - 0이 아닌 파라미터: p0 · 10^(±spread) 범위에서 로그 균등 탐색 (주파수, 지수 등 스케일 오차 대응)
+    - 0인 파라미터: ±spread · max|p0| 범위에서 선형 탐색 (위상, 오프셋 등)
+    """
+    p0 = np.asarray(p0, dtype=float)
+    sampler = qmc.LatinHypercube(d=len(p0), seed=seed)
+    unit = 2.0 * sampler.random(max(n_starts - 1, 1)) - 1.0  # [-1, 1]
+    
+    nonzero = np.abs(p0) > 1e-12
+    additive_scale = spread * max(np.abs(p0).max(), 1.0)
+    samples = np.where(
+        nonzero,
+        p0 * 10.0 ** (spread * unit),
+        additive_scale * unit
+    )
+    return np.vstack([p0, samples])[:n_starts]
+
+
+def _short_fit(model_key, x_data, y_data, p0, max_fev):
+    """워커 프로세스에서 실행되는 짧은 피팅: (R², popt) 또는 실패 시 None"""
+    func = FUNCTION_MAP[model_key]
+    try:
+        popt, _ = curve_fit(func, x_data, y_data, p0=p0, jac=JACOBIAN_MAP.get(model_key), maxfev=max_fev,
+                            bounds=_curve_fit_bounds(PHYSICS_MODELS[model_key]))
+    except Exception:
+        return None
+    r_squared = r2_score(y_data, func(x_data, *popt))
+    if np.isnan(r_squared):
+        return None
+    return r_squared, popt
+
+
+def _multi_start_search(model_key, x_data, y_data, p0, budget):
+    """
+    여러 시작점에서 짧은 피팅을 병렬 실행하고 가장 좋은 파라미터를 반환
+    (반환값은 최종 정밀 피팅의 초기값으로 사용됨)
+    """
+    starts = _latin_hypercube_starts(p0, budget['n_starts'], budget['spread'])
+    round_size = max(1, int(budget['max_workers']))
+    
+    best_r2, best_params = -np.inf, np.asarray(p0, dtype=float)
+    stalled_rounds = 0
+    for i in range(0, len(starts), round_size):
+        previous_best = best_r2
+        results = _run_in_fit_pool(_short_fit, [
+            (model_key, x_data, y_data, start, budget['max_fev'])
+            for start in starts[i:i + round_size]
+        ])
+        for result in results:
+            if result is not None and result[0] > best_r2:
+                best_r2, best_params = result
+        
+        # 조기 종료: 목표 R² 도달 또는 개선 정체
+        if best_r2 >= budget['target_r2']:
+            break
+        if np.isfinite(previous_best) and best_r2 - previous_best < budget['min_improvement']:
+            stalled_rounds += 1
+            if stalled_rounds >= budget['patience']:
+                break
+        else:
+            stalled_rounds = 0
+    
+    return list(best_params)
+
+# ============================================
+# 교차 검증 (k-fold Cross-Validation)
+# ============================================
+
+# 파라미터에 대해 선형인 모델의 설계 행렬 (열 순서 = 파라미터 순서)
+LINEAR_DESIGNS = {
+    'linear': lambda x: np.column_stack([x, np.ones_like(x)]),
+    'quadratic': lambda x: np.column_stack([x**2, x, np.ones_like(x)]),
+    'logarithmic': lambda x: np.column_stack([np.log(np.abs(x) + 1e-10), np.ones_like(x)])
+}
+
+# 모델 선택 기준: penalty(기존 차수 페널티), aic, cv(교차 검증 오차)
+SELECTION_CRITERIA = ('penalty', 'aic', 'cv')
+
+DEFAULT_CV_FOLDS = 5
+CV_MAX_FEV = 1000  # 폴드별 비선형 재피팅 최대 함수 호출 수 (전체 데이터 해에서 웜 스타트)
+
+
+def validate_fit_options(multi_start=None, selection='penalty', cv_folds=DEFAULT_CV_FOLDS):
+    """
+    요청의 피팅 옵션 검증 (라우트에서 피팅 전에 호출해 400으로 응답하기 위함)
+
+    Returns:
+    - dict: smart_curve_fitting에 그대로 넘길 {'multi_start', 'selection', 'cv_folds'}
+
+    Raises:
+    - ValueError: 알 수 없는 선택 기준 / 프리셋, 범위를 벗어난 multi_start 값, 정수가 아니거나 2 미만인 cv_folds
+    """
+    resolve_multi_start_budget(multi_start)
+    if selection not in SELECTION_CRITERIA:
+        raise ValueError(f"Unknown selection criterion: {selection} (expected one of {', '.join(SELECTION_CRITERIA)})")
+    if isinstance(cv_folds, bool) or not isinstance(cv_folds, (int, str)):
+        raise ValueError(f"cv_folds must be an integer >= 2, got {cv_folds!r}")
+    try:
+        folds = int(cv_folds)
+    except ValueError:
+        raise ValueError(f"cv_folds must be an integer >= 2, got {cv_folds!r}")
+    if folds < 2:
+        raise ValueError(f"cv_folds must be an integer >= 2, got {cv_folds!r}")
+    return {"multi_start": multi_start, "selection": selection, "cv_folds": folds}
+
+
+def _cv_test_masks(n, n_folds, seed=0):
+    """모든 폴드의 테스트 마스크를 한 번에 생성: (n_folds, n) bool 배열"""
+    n_folds = max(2, min(n_folds, n))
+    assignment = np.random.default_rng(seed).permutation(n) % n_folds
+    return assignment[None, :] == np.arange(n_folds)[:, None]
+
+
+def _cv_linear_sse(design, y_data, test_masks):
+    """
+    선형 파라미터 모델의 폴드별 테스트 SSE (배치 최소제곱)
+    학습 마스크를 곱한 설계 행렬 스택의 의사역행렬로 모든 폴드를 동시에 푼다
+    """
+    train = (~test_masks).astype(float)                       # (F, n)
+    masked_design = train[:, :, None] * design[None, :, :]   # (F, n, p)
+    coeffs = np.linalg.pinv(masked_design) @ (train * y_data)[:, :, None]  # (F, p, 1)
+    predictions = (design[None, :, :] @ coeffs)[:, :, 0]     # (F, n)
+    return np.sum(test_masks * (y_data[None, :] - predictions)**2, axis=1)
+
+
+def _cv_fold_sse(model_key, x_train, y_train, x_test, y_test, p0):
+    """워커 프로세스에서 실행: 한 폴드의 비선형 재피팅 후 테스트 SSE (실패 시 None)"""
+    model_info = PHYSICS_MODELS[model_key]
+    try:
+        if model_key == 'piecewise_linear':
+            fitted = fit_piecewise_linear(x_train, y_train, max_segments=model_info.get('max_segments', 2))
+            # 폴드에서 분할점이 뒷받침되지 않으면 모델이 직선으로 축소됨 (piecewise_linear_func(x, a, b) = ax + b)
+            popt = fitted[0] if fitted is not None else np.polyfit(x_train, y_train, 1)
+        else:
+            popt, _ = curve_fit(model_info['func'], x_train, y_train, p0=p0, jac=JACOBIAN_MAP.get(model_key), maxfev=CV_MAX_FEV,
+                                bounds=_curve_fit_bounds(model_info))
+    except Exception:
+        return None
+    residuals = y_test - model_info['func'](x_test, *popt)
+    sse = float(np.sum(residuals**2))
+    return sse if np.isfinite(sse) else None
+
+
+def _attach_cv_errors(results, x_data, y_data, n_folds):
+    """
+    각 결과에 'cv_error'(교차 검증 RMSE) 추가
+    - 선형 파라미터 모델: 배치 최소제곱으로 모든 폴드를 한 번에 계산
+    - 비선형 모델: 전체 데이터 해에서 웜 스타트한 폴드 피팅을 프로세스 풀에서 병렬 실행
+    """
+    n = len(x_data)
+    test_masks = _cv_test_masks(n, n_folds)
+    pending = []
+    jobs = []
+    
+    for result in results:
+        model_key = result['model_key']
+        if model_key in LINEAR_DESIGNS:
+            fold_sse = _cv_linear_sse(LINEAR_DESIGNS[model_key](x_data), y_data, test_masks)
+            result['cv_error'] = float(np.sqrt(fold_sse.sum() / n))
+        else:
+            pending.append(result)
+            jobs.extend(
+                (model_key, x_data[~mask], y_data[~mask], x_data[mask], y_data[mask], result['params'])
+                for mask in test_masks
+            )
+    
+    # 모든 비선형 모델의 폴드 피팅을 한 번에 제출
+    fold_results = _run_in_fit_pool(_cv_fold_sse, jobs) if jobs else []
+    for i, result in enumerate(pending):
+        fold_sse = fold_results[i * len(test_masks):(i + 1) * len(test_masks)]
+        if any(sse is None for sse in fold_sse):
+            # 한 폴드라도 실패하면 교차 검증 오차를 정의하지 않음 (선택에서 제외)
+            result['cv_error'] = None
+        else:
+            result['cv_error'] = float(np.sqrt(sum(fold_sse) / n))
+
+
+def _selection_key(criterion):
+    """선택 기준별 정렬 키 (클수록 좋음)"""
+    if criterion == 'aic':
+        return lambda r: -r['aic']
+    if criterion == 'cv':
+        return lambda r: -r['cv_error'] if r.get('cv_error') is not None else -np.inf
+    return lambda r: r['penalty_score']
+
 # ============================================
 # 스마트 커브 피팅 엔진
 # ============================================
 
-def smart_curve_fitting(x_data, y_data, models_to_try=None):
+def smart_curve_fitting(x_data, y_data, models_to_try=None, multi_start=None, selection='penalty', cv_folds=DEFAULT_CV_FOLDS):
     """
     여러 물리 모델을 자동으로 시도하고 최적 모델 반환 (차수 페널티 적용)
     
     Parameters:
     - x_data: X축 데이터
     - y_data: Y축 데이터
-    - models_to_try: 시도할 모델 리스트 (None이면 모두 시도)
+    - models_to_try: 시도할 모델 리스트 (None이면 자동 선택 대상 모델(AUTO_MODELS) 모두 시도)
+    - multi_start: 다중 시작점 탐색 예산 (None/False: 사용 안 함, True/'interactive'/'batch'/dict)
+    - selection: 모델 선택 기준 ('penalty': 차수 페널티, 'aic': AIC, 'cv': k-fold 교차 검증 RMSE)
+    - cv_folds: 교차 검증 폴드 수 (selection='cv'일 때만 사용)
     
     Returns:
     - best_model: 최적 모델 정보 딕셔너리
     """
     if models_to_try is None:
-        models_to_try = list(PHYSICS_MODELS.keys())
+        models_to_try = list(AUTO_MODELS)
+    
+    budget = resolve_multi_start_budget(multi_start)
+    if selection not in SELECTION_CRITERIA:
+        raise ValueError(f"Unknown selection criterion: {selection}")
     
     results = []
     n = len(x_data)  # 데이터 개수
@@ -104,42 +694,41 @@ def smart_curve_fitting(x_data, y_data, models_to_try=None):
         model_info = PHYSICS_MODELS[model_key]
         
         try:
-            # 초기 추정값 (데이터 기반으로 개선)
             k = model_info['params']  # 파라미터 개수
+            equation = model_info['equation']
             
-            # 데이터 범위 계산
-            y_range = y_data.max() - y_data.min() if len(y_data) > 0 else 1.0
-            y_mean = y_data.mean() if len(y_data) > 0 else 0.0
-            x_range = x_data.max() - x_data.min() if len(x_data) > 0 else 1.0
-            
-            # 스마트 초기값 설정
-            if model_key == 'linear':
-                # polyfit 대신 curve_fit을 사용하여 공분산 행렬(pcov)을 얻음
-                p0 = [1.0, 0.0]
-                # 더 나은 초기값 시도
-                if len(x_data) > 1:
-                    coeffs = np.polyfit(x_data, y_data, 1)
-                    p0 = [coeffs[0], coeffs[1]]
-            elif model_key == 'exponential':
-                p0 = [y_range, 0.01, y_data.min()]
-            elif model_key == 'power_law':
-                p0 = [y_mean, 1.0, 0.0]
-            elif model_key == 'logarithmic':
-                p0 = [y_range / np.log(x_range) if x_range > 1 else 1.0, y_data.min()]
-            elif model_key == 'sine':
-                p0 = [y_range/2, 2*np.pi/x_range if x_range > 0 else 1.0, 0.0, y_mean]
+            if model_key == 'piecewise_linear':
+                # 구간별 선형: 누적합 기반 분할점 탐색 (curve_fit 미사용)
+                fitted = fit_piecewise_linear(
+                    x_data,
+                    y_data,
+                    max_segments=model_info.get('max_segments', 2)
+                )
+                if fitted is None:
+                    # 분할점이 데이터로 뒷받침되지 않음 - 직선은 linear 모델이 담당 (실패가 아님)
+                    continue
+                popt, pcov = fitted
+                # 분할점도 파라미터로 계산 (k구간 = 2k개)
+                k = len(popt)
+                equation = piecewise_equation(k // 2)
             else:
-                # 기본 초기값 사용
-                p0 = model_info.get('initial_guess', [1.0] * k)
-            
-            # curve_fit 사용
-            popt, pcov = curve_fit(
-                model_info['func'], 
-                x_data, 
-                y_data, 
-                p0=p0, 
-                maxfev=5000
-            )
+                # 스마트 초기값 설정
+                p0 = _initial_guess(model_key, model_info, x_data, y_data)
+
+                # 다중 시작점 탐색 (국소 최솟값 회피)
+                if budget and model_info.get('multi_start'):
+                    p0 = _multi_start_search(model_key, x_data, y_data, p0, budget)
+                
+                # curve_fit 사용
+                popt, pcov = curve_fit(
+                    model_info['func'], 
+                    x_data, 
+                    y_data, 
+                    p0=p0, 
+                    jac=JACOBIAN_MAP.get(model_key),
+                    maxfev=5000,
+                    bounds=_curve_fit_bounds(model_info)
+                )
             y_pred = model_info['func'](x_data, *popt)
             
             # 표준 오차(Standard Error) 계산
@@ -200,13 +789,14 @@ def smart_curve_fitting(x_data, y_data, models_to_try=None):
                     'func': model_info['func'],
                     'params': params_list,
                     'standard_errors': standard_errors,
-                    'equation': model_info['equation'],
+                    'equation': equation,
                     'description': model_info['description'],
                     'r_squared': r_squared,
                     'adj_r_squared': adj_r_squared,
                     'aic': aic,
                     'param_count': k,
                     'penalty_score': penalty_score,
+                    'cv_error': None,
                     'trendline': trendline
                 })
         
@@ -219,11 +809,16 @@ def smart_curve_fitting(x_data, y_data, models_to_try=None):
     if not results:
         return None
     
-    # 차수 페널티 점수가 가장 높은 모델 선택 (단순한 모델 선호)
-    best_model = max(results, key=lambda x: x['penalty_score'])
+    if selection == 'cv':
+        _attach_cv_errors(results, np.asarray(x_data, dtype=float), np.asarray(y_data, dtype=float), cv_folds)
+    
+    # 선택 기준이 가장 좋은 모델 선택 (기본: 차수 페널티 점수, 단순한 모델 선호)
+    key = _selection_key(selection)
+    best_model = max(results, key=key)
+    best_model['selection'] = selection
     
     # 추가: 모든 결과 반환 (앱에서 활용 가능)
-    best_model['all_results'] = sorted(results, key=lambda x: x['penalty_score'], reverse=True)
+    best_model['all_results'] = sorted(results, key=key, reverse=True)
     
     return best_model
 
@@ -245,25 +840,68 @@ def equation_to_latex(equation, params):
     # Remove any existing $ signs to prevent nested delimiters
     latex_eq = equation.replace('$', '')
     
-    # 매개변수 치환
-    param_names = ['a', 'b', 'c', 'd', 'e', 'f']
-    for i, param in enumerate(params):
-        if i < len(param_names):
-            # 소수점 이하 4자리까지 표시
-            latex_eq = latex_eq.replace(param_names[i], f"{param:.4f}")
+    # 특수 함수 (매개변수 치환 전에 변환해 'cos'의 c 등이 치환되지 않도록 함)
+    latex_eq = re.sub(r'(?<![A-Za-z\\])(sin|cos|tan|ln|log)(?=\()', r'\\\1', latex_eq)
     
-    # LaTeX 기호 변환
-    latex_eq = latex_eq.replace('*', r'\cdot ')
-    latex_eq = latex_eq.replace('^', '^{')
+    # 매개변수 치환
+    param_names = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+    values = dict(zip(param_names, params))
+    if values:
+        # 'e^'는 자연상수이므로 매개변수 e로 치환하지 않음, 앞의 +/- 부호는 값의 부호와 합쳐서 처리
+        pattern = rf"(?P<sign>[+-]\s*)?(?<![A-Za-z\\])(?P<name>[{''.join(values)}])(?![A-Za-wyz^])"
+        latex_eq = re.sub(pattern, lambda match: _substitute_param(match, values), latex_eq)
     
-    # 거듭제곱 닫기
-    import re
-    latex_eq = re.sub(r'\^{(\w+)', r'^{\1}', latex_eq)
+    # 거듭제곱: 괄호 지수는 괄호째 중괄호로, 단일 토큰 지수는 중괄호로 감쌈
+    latex_eq = _brace_parenthesized_exponents(latex_eq)
+    latex_eq = re.sub(r'\^(?!\{)(-?\d+(?:\.\d+)?|[A-Za-z])', r'^{\1}', latex_eq)
     
-    # 특수 함수
-    latex_eq = latex_eq.replace('e^', 'e^')
-    latex_eq = latex_eq.replace('ln', r'\ln')
-    latex_eq = latex_eq.replace('sin', r'\sin')
-    latex_eq = latex_eq.replace('cos', r'\cos')
+    # LaTeX 기호 변환
+    latex_eq = latex_eq.replace('²', '^{2}').replace('³', '^{3}').replace('₊', '_{+}')
+    latex_eq = re.sub(r'\s*[*·]\s*', r' \\cdot ', latex_eq)
     
     return latex_eq
+
+
+def _substitute_param(match, values):
+    """매개변수 하나를 소수점 4자리 값으로 치환 (앞의 +/- 와 음수 값의 부호를 합침: '+ -2' -> '- 2', '(-(-2)' -> '(2')"""
+    value = values[match.group('name')]
+    text = f"{abs(value):.4f}"
+    sign = match.group('sign')
+    before = match.string[:match.start()].rstrip()
+    # 여는 괄호/등호/지수 바로 뒤의 부호는 단항 부호
+    unary = not before or before[-1] in '(=^{'
+    if sign:
+        negative = (sign[0] == '-') != (value < 0)
+        if unary:
+            return f"-{text}" if negative else text
+        return ('-' if negative else '+') + sign[1:] + text
+    if value < 0:
+        # 곱/나눗셈 뒤의 음수는 괄호로 감싸 '·-2', '/-2' 같은 표기를 피함
+        return f"-{text}" if unary else f"(-{text})"
+    return text
+
+
+def _brace_parenthesized_exponents(latex_eq):
+    """'^(...)'를 짝이 맞는 닫는 괄호까지 '^{...}'로 변환 (중첩 괄호 지원)"""
+    result = []
+    i = 0
+    while i < len(latex_eq):
+        if latex_eq.startswith('^(', i):
+            depth = 0
+            for j in range(i + 1, len(latex_eq)):
+                if latex_eq[j] == '(':
+                    depth += 1
+                elif latex_eq[j] == ')':
+                    depth -= 1
+                    if depth == 0:
+                        break
+            else:
+                # 닫히지 않은 괄호: 변환하지 않음
+                result.append(latex_eq[i:])
+                break
+            result.append('^{' + _brace_parenthesized_exponents(latex_eq[i + 2:j]) + '}')
+            i = j + 1
+        else:
+            result.append(latex_eq[i])
+            i += 1
+    return ''.join(result)
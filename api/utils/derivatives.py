@@ -0,0 +1,240 @@
+"""
+Numerical Differentiation Utilities
+비균등 격자 수치 미분 (중앙 차분 / Savitzky–Golay) 및 불확도 전파
+"""
+
+import numpy as np
+from math import factorial
+
+# 기본 미분 설정 (options.derivatives가 True일 때 사용)
+DEFAULT_DERIVATIVE_OPTIONS = {
+    'orders': [1, 2],     # 계산할 미분 차수 (1: 속도, 2: 가속도 등)
+    'method': 'savgol',   # 'savgol' 또는 'central'
+    'window': 7,          # Savitzky–Golay 창 크기 (홀수)
+    'polyorder': 3        # Savitzky–Golay 다항식 차수
+}
+
+DERIVATIVE_METHODS = ('savgol', 'central')
+
+# ============================================
+# 국소 다항식 미분 가중치
+# ============================================
+
+def _window_indices(n, window):
+    """각 점을 중심으로 하는 창의 인덱스 (n, window) - 양 끝에서는 안쪽으로 밀어 넣음"""
+    half = window // 2
+    starts = np.clip(np.arange(n) - half, 0, n - window)
+    return starts[:, None] + np.arange(window)[None, :]
+
+
+def local_polynomial_weights(x, window, polyorder, deriv=1):
+    """
+    비균등 격자의 국소 다항식(Savitzky–Golay) 미분 가중치
+
+    각 점 x_i에서 창 안의 데이터에 (x - x_i)의 polyorder차 다항식을 최소제곱으로
+    맞추고, deriv차 계수 × deriv! 를 미분값으로 사용한다. 모든 점의 계산을
+    배치 의사역행렬 한 번으로 처리한다.
+
+    Returns:
+    - idx: (n, window) 창 인덱스
+    - weights: (n, window) 미분 가중치 (derivative = Σ weights · y[idx])
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    if window > n:
+        raise ValueError(f"Window ({window}) larger than data length ({n})")
+    if not (deriv <= polyorder < window):
+        raise ValueError("Require deriv <= polyorder < window")
+
+    idx = _window_indices(n, window)
+    dx = x[idx] - x[:, None]  # (n, window)
+
+    # 창마다 스케일을 맞춰 조건수 개선
+    scale = np.abs(dx).max(axis=1, keepdims=True)
+    if np.any(scale == 0):
+        raise ValueError("X values must be distinct for differentiation")
+    vander = (dx / scale)[:, :, None] ** np.arange(polyorder + 1)  # (n, window, p+1)
+    coeff_op = np.linalg.pinv(vander)  # (n, p+1, window)
+
+    weights = coeff_op[:, deriv, :] * factorial(deriv) / scale**deriv
+    return idx, weights
+
+
+def differentiate(x, y, deriv=1, method='savgol', window=7, polyorder=3, y_err=None):
+    """
+    비균등 격자 수치 미분
+
+    Parameters:
+    - x, y: 데이터 (x 오름차순, 중복 없음)
+    - deriv: 미분 차수
+    - method: 'central' (3점 중앙 차분, 양 끝은 3점 한쪽 차분) 또는 'savgol'
+    - window, polyorder: Savitzky–Golay 설정 (데이터가 적으면 자동 축소)
+    - y_err: y의 표준 불확도 (스칼라 또는 배열, None이면 전파 생략)
+
+    Returns:
+    - derivative: 미분값 배열
+    - derivative_err: 전파된 불확도 배열 (y_err가 None이면 None)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    if method == 'central':
+        # 3점 보간 2차 다항식의 미분 = 비균등 중앙 차분
+        window, polyorder = 3, 2
+    elif method != 'savgol':
+        raise ValueError(f"Unknown differentiation method: {method}")
+
+    # 데이터 길이에 맞게 창 축소 (홀수 유지)
+    window = min(int(window), n if n % 2 == 1 else n - 1)
+    polyorder = min(int(polyorder), window - 1)
+    if polyorder < deriv:
+        raise ValueError(f"Not enough data points for order-{deriv} derivative (n={n})")
+
+    idx, weights = local_polynomial_weights(x, window, polyorder, deriv)
+    derivative = np.einsum('nw,nw->n', weights, y[idx])
+
+    derivative_err = None
+    if y_err is not None:
+        # 독립 오차 가정: σ_d² = Σ w² σ_y²
+        sigma = np.broadcast_to(np.asarray(y_err, dtype=float), (n,))
+        derivative_err = np.sqrt(np.einsum('nw,nw->n', weights**2, sigma[idx]**2))
+
+    return derivative, derivative_err
+
+
+def constant_summary(x, values, errors=None, window=1, z=3.0):
+    """
+    도함수 열이 상수(예: 자유 낙하의 가속도)인지 판정하고 평균 ± 불확도 계산
+
+    직선 피팅의 기울기가 표준 오차의 z배 이내이면 상수로 판단한다.
+    미분 창(window)을 공유하는 인접 값은 서로 상관되어 있으므로 유효 표본 수를
+    n / window로 보고 표준 오차를 √window배 한다.
+    불확도: 전파된 오차가 있으면 평균의 전파 오차 √(window·Σσ²)/n, 없으면 표준 오차 s/√(n/window)
+
+    Returns:
+    - {'is_constant', 'mean', 'uncertainty', 'slope', 'slope_error'}
+    """
+    x = np.asarray(x, dtype=float)
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    mean = float(values.mean())
+
+    if errors is not None:
+        sigma = np.broadcast_to(np.asarray(errors, dtype=float), (n,))
+        uncertainty = float(np.sqrt(window * np.sum(sigma**2)) / n)
+    else:
+        uncertainty = float(values.std(ddof=1) * np.sqrt(window / n)) if n > 1 else 0.0
+
+    slope, slope_error = 0.0, 0.0
+    sxx = np.sum((x - x.mean())**2)
+    if n > 2 and sxx > 0:
+        slope = float(np.sum((x - x.mean()) * (values - mean)) / sxx)
+        residuals = values - mean - slope * (x - x.mean())
+        slope_error = float(np.sqrt(np.sum(residuals**2) / (n - 2) / sxx * window))
+
+    return {
+        'is_constant': bool(n > 2 and abs(slope) <= z * slope_error),
+        'mean': mean,
+        'uncertainty': uncertainty,
+        'slope': slope,
+        'slope_error': slope_error
+    }
+
+
+def derived_unit(y_unit, x_unit, order):
+    """미분값의 단위 (예: m, s, 2 → m/s²)"""
+    if not y_unit and not x_unit:
+        return ""
+    superscripts = {1: "", 2: "²", 3: "³"}
+    x_part = f"{x_unit}{superscripts.get(order, f'^{order}')}" if x_unit else ""
+    return f"{y_unit or '1'}/{x_part}" if x_part else y_unit
+
+
+def resolve_derivative_options(option):
+    """요청 옵션을 미분 설정 딕셔너리로 변환 (None/False: 비활성화, True: 기본값, dict: 덮어쓰기)"""
+    if not option:
+        return None
+    resolved = dict(DEFAULT_DERIVATIVE_OPTIONS)
+    if isinstance(option, dict):
+        resolved.update({k: v for k, v in option.items() if k in resolved})
+    if resolved['method'] not in DERIVATIVE_METHODS:
+        raise ValueError(f"Unknown differentiation method: {resolved['method']}")
+
+    if resolved['method'] == 'central':
+        # 중앙 차분은 3점 2차 다항식 고정 (window/polyorder 설정은 사용하지 않음)
+        polyorder = 2
+    else:
+        polyorder = _require_int(resolved['polyorder'], 'polyorder')
+        window = _require_int(resolved['window'], 'window')
+        if polyorder < 1:
+            raise ValueError(f"Derivative polyorder must be at least 1, got {polyorder}")
+        # 창이 다항식 차수 + 1 이하이면 보간이 되어 평활화 효과가 없음
+        if window % 2 == 0 or window < polyorder + 2:
+            raise ValueError(f"Derivative window must be an odd integer >= polyorder + 2 ({polyorder + 2}), got {window}")
+        resolved['polyorder'], resolved['window'] = polyorder, window
+
+    orders = resolved['orders']
+    orders = sorted({_require_int(o, 'order') for o in (orders if isinstance(orders, list) else [orders])})
+    if not orders:
+        raise ValueError("At least one derivative order is required")
+    for order in orders:
+        if not 1 <= order <= polyorder:
+            raise ValueError(
+                f"Derivative order must be between 1 and the polynomial order ({polyorder}) "
+                f"for method '{resolved['method']}', got {order}"
+            )
+    resolved['orders'] = orders
+    return resolved
+
+
+def _require_int(value, name):
+    """미분 옵션의 정수 값 검증 (bool / 실수 / 문자열은 거부)"""
+    if isinstance(value, bool) or not isinstance(value, (int, np.integer)):
+        raise ValueError(f"Derivative {name} must be an integer, got {value!r}")
+    return int(value)
+
+
+def compute_derived_columns(x_data, y_data, options, y_err=None, x_unit="", y_unit=""):
+    """
+    미분 파이프라인: x 정렬 후 요청된 차수의 도함수 열과 단위를 생성
+
+    Returns:
+    - x_sorted: 정렬된 x
+    - columns: [{'order', 'unit', 'y', 'y_err', 'window'}, ...] (window: 미분에 사용된 창 크기)
+    """
+    order = np.argsort(x_data, kind='stable')
+    x_sorted = np.asarray(x_data, dtype=float)[order]
+    y_sorted = np.asarray(y_data, dtype=float)[order]
+    if np.any(np.diff(x_sorted) <= 0):
+        raise ValueError("X values must be distinct for differentiation")
+
+    err_sorted = None
+    if y_err is not None:
+        err = np.asarray(y_err, dtype=float)
+        err_sorted = err[order] if err.ndim else err
+
+    # 실제 창 크기 (differentiate와 같은 규칙: 중앙 차분은 3점, 데이터가 적으면 홀수로 축소)
+    n = len(x_sorted)
+    window = 3 if options['method'] == 'central' else int(options['window'])
+    window = min(window, n if n % 2 == 1 else n - 1)
+
+    columns = []
+    for deriv in options['orders']:
+        values, errors = differentiate(
+            x_sorted, y_sorted,
+            deriv=deriv,
+            method=options['method'],
+            window=options['window'],
+            polyorder=options['polyorder'],
+            y_err=err_sorted
+        )
+        columns.append({
+            'order': deriv,
+            'unit': derived_unit(y_unit, x_unit, deriv),
+            'y': values,
+            'y_err': errors,
+            'window': window
+        })
+
+    return x_sorted, columns
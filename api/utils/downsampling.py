@@ -0,0 +1,106 @@
+"""
+Series Downsampling Utilities
+그래프 표시용 대용량 시계열 축소 - LTTB (Largest-Triangle-Three-Buckets) 및 min/max 구간 축소
+"""
+
+import numpy as np
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+# ============================================
+# LTTB
+# ============================================
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 축소 (x 오름차순 가정)
+
+    첫/마지막 점은 고정하고, 가운데 점들을 n_out - 2개 구간으로 나눈 뒤
+    각 구간에서 (직전에 선택된 점, 다음 구간 평균점)과 이루는 삼각형 넓이가
+    가장 큰 점을 선택한다. 피크와 급변 구간 등 시각적 형태가 보존된다.
+
+    Returns:
+    - idx: 선택된 점의 인덱스 (오름차순, 길이 min(n, n_out))
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+
+    # 구간 경계: 1 ~ n-1 사이를 n_out - 2개로 균등 분할
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    # 각 구간의 평균점 (다음 구간 기준점으로 사용)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    idx = np.empty(n_out, dtype=int)
+    idx[0], idx[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        ax, ay = x[prev], y[prev]
+        cx, cy = avg_x[b + 1], avg_y[b + 1]
+        # 삼각형 넓이 × 2 (상수 배는 argmax에 영향 없음)
+        area = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        prev = lo + int(np.argmax(area))
+        idx[b + 1] = prev
+    return idx
+
+# ============================================
+# min/max 구간 축소
+# ============================================
+
+def minmax(x, y, n_out):
+    """
+    구간별 최소/최대값 축소 (x 오름차순 가정)
+
+    n_out // 2개 구간마다 y 최소·최대점을 남겨 포락선(envelope)을 보존한다.
+    완전 벡터화되어 LTTB보다 빠르지만 구간 내부의 형태는 버린다.
+
+    Returns:
+    - idx: 선택된 점의 인덱스 (오름차순, 중복 제거)
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    n_bins = n_out // 2
+    if n_out >= n or n_bins < 1:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_bins + 1).astype(int)
+    starts = edges[:-1]
+    bin_of = np.repeat(np.arange(n_bins), np.diff(edges))
+
+    def first_match(extreme):
+        # 구간별 극값과 같은 점 중 구간 내 첫 번째 점
+        hits = np.flatnonzero(y == extreme(y, starts)[bin_of])
+        return hits[np.unique(bin_of[hits], return_index=True)[1]]
+
+    idx = np.concatenate([first_match(np.minimum.reduceat), first_match(np.maximum.reduceat), [0, n - 1]])
+    return np.unique(idx)
+
+
+def downsample(x, y, n_out, method='lttb'):
+    """
+    표시용 축소 - x 기준 정렬 후 선택된 점 반환 (n_out 이하이면 정렬만 수행)
+
+    Returns:
+    - x_out, y_out: 축소된 데이터 (x 오름차순)
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    order = np.argsort(x, kind='stable')
+    x, y = x[order], y[order]
+    if len(x) <= n_out:
+        return x, y
+
+    idx = lttb(x, y, n_out) if method == 'lttb' else minmax(x, y, n_out)
+    return x[idx], y[idx]
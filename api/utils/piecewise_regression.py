@@ -0,0 +1,400 @@
+"""
+Piecewise Linear Regression Utilities
+연속 구간별 선형 회귀 (힌지 기저) - 누적합 기반 동적 계획법으로 분할점 초기값을 찾고
+분할점 좌표 탐색 + 비선형 최소제곱으로 연속 모델을 정밀화
+"""
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+# 구간당 최소 데이터 개수 (직선 + 잔차 추정에 필요)
+MIN_SEGMENT_POINTS = 3
+
+# 수식 문자(a~h)로 표현 가능한 최대 구간 수 (3구간 = 6개 파라미터)
+MAX_SEGMENTS = 3
+
+# 구간을 하나 더 나누려면 BIC가 이만큼 더 작아야 함 (ΔBIC > 10: 매우 강한 근거)
+# 잡음에 맞춘 가짜 분할점(단일 꺾임 데이터에서 3구간, 직선 데이터에서 2구간) 방지
+BIC_MARGIN = 10.0
+
+# 동적 계획법에 사용할 최대 분할 후보 수 (초과 시 균등 간격으로 추린 뒤 국소 정밀화)
+MAX_DP_CANDIDATES = 400
+
+# ============================================
+# 모델 함수 및 수식
+# ============================================
+
+def piecewise_linear_func(x, *params):
+    """
+    연속 구간별 선형 함수 (힌지 기저)
+    y = a·x + b + Σ cⱼ·(x - tⱼ)₊
+    params = [a, b, c₁, ..., c_(k-1), t₁, ..., t_(k-1)]
+    (a: 첫 구간 기울기, b: 절편, c: 분할점에서의 기울기 변화, t: 분할점)
+    """
+    params = np.asarray(params, dtype=float)
+    k = len(params) // 2
+    slope, intercept = params[0], params[1]
+    changes = params[2:k + 1]
+    breakpoints = params[k + 1:]
+
+    x = np.asarray(x, dtype=float)
+    y = slope * x + intercept
+    for change, t in zip(changes, breakpoints):
+        y = y + change * np.maximum(x - t, 0.0)
+    return y
+
+
+def piecewise_linear_jac(x, *params):
+    """piecewise_linear_func의 야코비안 (분할점 열은 x = t에서 한쪽 미분)"""
+    params = np.asarray(params, dtype=float)
+    k = len(params) // 2
+    changes = params[2:k + 1]
+    breakpoints = params[k + 1:]
+
+    x = np.asarray(x, dtype=float)
+    columns = [x, np.ones_like(x)]
+    columns += [np.maximum(x - t, 0.0) for t in breakpoints]
+    columns += [-c * (x > t) for c, t in zip(changes, breakpoints)]
+    return np.column_stack(columns)
+
+
+def piecewise_segments(params):
+    """힌지 파라미터 → 구간별 (기울기, 절편) 리스트 (표시용)"""
+    params = np.asarray(params, dtype=float)
+    k = len(params) // 2
+    slope, intercept = params[0], params[1]
+    segments = [(slope, intercept)]
+    for change, t in zip(params[2:k + 1], params[k + 1:]):
+        slope, intercept = slope + change, intercept - change * t
+        segments.append((slope, intercept))
+    return segments
+
+
+def piecewise_equation(n_segments):
+    """구간 수에 맞는 수식 문자열 생성 (예: y = ax + b + c·(x - d)₊)"""
+    letters = 'abcdefgh'
+    n_breaks = n_segments - 1
+    terms = [
+        f"{letters[2 + j]}·(x - {letters[2 + n_breaks + j]})₊"
+        for j in range(n_breaks)
+    ]
+    return "y = ax + b + " + " + ".join(terms)
+
+# ============================================
+# 누적합 기반 구간 비용
+# ============================================
+
+class _SegmentCost:
+    """
+    누적합(prefix sum)으로 임의 구간 [i, j)의 최소제곱 직선과 SSE를 O(1)에 계산
+    (x는 정렬되어 있어야 하며, 수치 안정성을 위해 평균을 빼고 누적)
+    """
+
+    def __init__(self, x, y):
+        self.x_shift = x.mean()
+        self.y_shift = y.mean()
+        xc = x - self.x_shift
+        yc = y - self.y_shift
+
+        def prefix(values):
+            return np.concatenate([[0.0], np.cumsum(values)])
+
+        self.s1 = np.arange(len(x) + 1, dtype=float)
+        self.sx = prefix(xc)
+        self.sy = prefix(yc)
+        self.sxx = prefix(xc * xc)
+        self.sxy = prefix(xc * yc)
+        self.syy = prefix(yc * yc)
+
+    def _centered_sums(self, i, j):
+        m = self.s1[j] - self.s1[i]
+        sx = self.sx[j] - self.sx[i]
+        sy = self.sy[j] - self.sy[i]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cxx = (self.sxx[j] - self.sxx[i]) - sx * sx / m
+            cxy = (self.sxy[j] - self.sxy[i]) - sx * sy / m
+            cyy = (self.syy[j] - self.syy[i]) - sy * sy / m
+        return m, sx, sy, cxx, cxy, cyy
+
+    def sse(self, i, j):
+        """구간 [i, j)의 직선 피팅 잔차제곱합 (i, j는 배열 가능)"""
+        m, _, _, cxx, cxy, cyy = self._centered_sums(i, j)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sse = np.where(cxx > 1e-300, cyy - cxy * cxy / cxx, cyy)
+        return np.where(m > 0, np.maximum(sse, 0.0), np.inf)
+
+    def line(self, i, j):
+        """구간 [i, j)의 최소제곱 직선 (기울기, 절편, 구간 합계)"""
+        m, sx, sy, cxx, cxy, _ = self._centered_sums(i, j)
+        slope = cxy / cxx if cxx > 1e-300 else 0.0
+        # 중심화 좌표의 절편을 원래 좌표로 복원
+        intercept_c = (sy - slope * sx) / m
+        intercept = intercept_c + self.y_shift - slope * self.x_shift
+        return slope, intercept, (m, sx, cxx)
+
+# ============================================
+# 분할점 탐색
+# ============================================
+
+def _optimal_splits(cost, candidates, n, n_segments, min_size):
+    """분할 후보 위에서 동적 계획법으로 n_segments 구간의 최적 분할 탐색 - O(k·m²)"""
+    positions = np.concatenate([[0], candidates, [n]])
+    m = len(positions)
+
+    # 모든 (시작, 끝) 후보 쌍의 구간 비용을 한 번에 계산 (각 O(1))
+    start, end = np.meshgrid(positions, positions, indexing='ij')
+    pair_cost = cost.sse(start, end)
+    pair_cost[(end - start) < min_size] = np.inf
+
+    best = pair_cost[0].copy()  # 1구간: 0 ~ q
+    back = []
+    for _ in range(n_segments - 1):
+        total = best[:, None] + pair_cost
+        back.append(np.argmin(total, axis=0))
+        best = total[back[-1], np.arange(m)]
+
+    if not np.isfinite(best[m - 1]):
+        return None
+
+    # 역추적
+    splits = []
+    q = m - 1
+    for layer in reversed(back):
+        q = layer[q]
+        splits.append(int(positions[q]))
+    return sorted(splits)
+
+
+def _refine_splits(cost, splits, valid, n, min_size, max_passes=3):
+    """
+    각 분할점을 이웃 분할점 사이의 모든 유효 위치에서 재탐색 (좌표별 O(n) 스캔)
+    후보를 추려 DP를 수행한 경우에도 정확한 국소 최적 분할을 보장
+    """
+    splits = list(splits)
+    for _ in range(max_passes):
+        changed = False
+        for idx in range(len(splits)):
+            left = splits[idx - 1] if idx > 0 else 0
+            right = splits[idx + 1] if idx + 1 < len(splits) else n
+            scan = valid[(valid >= left + min_size) & (valid <= right - min_size)]
+            if len(scan) == 0:
+                continue
+            total = cost.sse(left, scan) + cost.sse(scan, right)
+            best = int(scan[np.argmin(total)])
+            if best != splits[idx]:
+                splits[idx] = best
+                changed = True
+        if not changed:
+            break
+    return splits
+
+
+def _initial_breakpoints(cost, x, splits, n):
+    """불연속 최적 분할 → 분할점 초기값 (인접 직선의 교점이 두 데이터 사이에 있으면 교점, 아니면 중간점)"""
+    bounds = [0] + list(splits) + [n]
+    lines = [cost.line(bounds[j], bounds[j + 1]) for j in range(len(bounds) - 1)]
+
+    breakpoints = []
+    for j, s in enumerate(splits):
+        lo, hi = x[s - 1], x[s]
+        (a1, b1, _), (a2, b2, _) = lines[j], lines[j + 1]
+        t = (lo + hi) / 2
+        if a1 != a2:
+            crossing = (b2 - b1) / (a1 - a2)
+            if lo <= crossing <= hi:
+                t = crossing
+        breakpoints.append(t)
+    return breakpoints
+
+# ============================================
+# 연속(힌지) 모델 피팅
+# ============================================
+
+def _hinge_design(x, breakpoints):
+    """고정된 분할점에서의 선형 설계 행렬: [x, 1, (x - t₁)₊, ...]"""
+    return np.column_stack([x, np.ones_like(x)] + [np.maximum(x - t, 0.0) for t in breakpoints])
+
+
+def _profile_sse(cost, x, breakpoint_sets):
+    """
+    분할점 조합별 연속 모델 SSE - 정규방정식을 누적합으로 조립 (조합당 O(p³), 데이터 개수와 무관)
+    기저 x, 1, (x - tⱼ)₊는 모두 '분할 인덱스 이후에서만 0이 아닌 x의 1차식' (α·x + β)·[i ≥ s]이므로
+    그람 행렬과 우변의 각 원소가 구간 [max(s, s'), n)의 Σ1, Σx, Σx², Σy, Σxy로 표현됨
+
+    cost: x, y의 _SegmentCost (중심화 좌표의 누적합)
+    breakpoint_sets: (C, k-1) 배열 → (C,) SSE
+    """
+    sets = np.asarray(breakpoint_sets, dtype=float)
+    n_sets, n_breaks = sets.shape
+    n = len(x)
+    p = 2 + n_breaks
+
+    # 중심화 좌표 x' = x - x_shift 기준의 기저 계수 (x, 1과 x', 1은 같은 공간을 생성)
+    alpha = np.ones((n_sets, p))
+    beta = np.zeros((n_sets, p))
+    start = np.zeros((n_sets, p), dtype=int)
+    alpha[:, 1], beta[:, 1] = 0.0, 1.0
+    beta[:, 2:] = cost.x_shift - sets
+    start[:, 2:] = np.searchsorted(x, sets, side='right')
+
+    def tail(prefix, idx):
+        return prefix[n] - prefix[idx]
+
+    both = np.maximum(start[:, :, None], start[:, None, :])
+    gram = (alpha[:, :, None] * alpha[:, None, :] * tail(cost.sxx, both)
+            + (alpha[:, :, None] * beta[:, None, :] + beta[:, :, None] * alpha[:, None, :]) * tail(cost.sx, both)
+            + beta[:, :, None] * beta[:, None, :] * tail(cost.s1, both))
+    rhs = alpha * tail(cost.sxy, start) + beta * tail(cost.sy, start)
+    coeffs = np.linalg.solve(gram + 1e-12 * np.eye(p), rhs[:, :, None])[:, :, 0]
+    return np.maximum(cost.syy[n] - np.sum(rhs * coeffs, axis=1), 0.0)
+
+
+def _segment_counts_ok(x, breakpoint_sets, min_size):
+    """분할점 조합별로 정렬되어 있고 모든 구간에 min_size개 이상의 데이터가 있는지: (C, k-1) → (C,) bool"""
+    sets = np.atleast_2d(np.asarray(breakpoint_sets, dtype=float))
+    splits = np.searchsorted(x, sets, side='right')
+    bounds = np.concatenate([np.zeros((len(sets), 1), dtype=int), splits, np.full((len(sets), 1), len(x))], axis=1)
+    return np.all(np.diff(sets, axis=1) > 0, axis=1) & np.all(np.diff(bounds, axis=1) >= min_size, axis=1)
+
+
+def _fit_continuous(cost, x, y, breakpoints, valid, min_size, max_passes=3):
+    """
+    연속 모델 피팅 (x는 표준화·정렬된 좌표)
+    1. 분할점 좌표별 탐색: 각 분할점을 이웃 분할점 사이의 모든 데이터 중간점에서 재탐색 (누적합으로 후보당 O(1))
+    2. 비선형 최소제곱(curve_fit)으로 분할점까지 함께 정밀화 (구간 조건을 어기면 1의 해 유지)
+
+    Returns:
+    - (popt, pcov, sse) - pcov의 분할점 항목은 curve_fit 실패 시 데이터 간격 기반 해상도
+    """
+    n = len(x)
+    midpoints = (x[valid - 1] + x[valid]) / 2
+    breakpoints = np.array(breakpoints, dtype=float)
+
+    for _ in range(max_passes):
+        changed = False
+        for j in range(len(breakpoints)):
+            lo = breakpoints[j - 1] if j > 0 else -np.inf
+            hi = breakpoints[j + 1] if j + 1 < len(breakpoints) else np.inf
+            scan = midpoints[(midpoints > lo) & (midpoints < hi)]
+            if len(scan) == 0:
+                continue
+            sets = np.repeat(breakpoints[None, :], len(scan), axis=0)
+            sets[:, j] = scan
+            ok = _segment_counts_ok(x, sets, min_size)
+            if not ok.any():
+                continue
+            sse = np.where(ok, _profile_sse(cost, x, sets), np.inf)
+            best = scan[np.argmin(sse)]
+            if best != breakpoints[j]:
+                breakpoints[j] = best
+                changed = True
+        if not changed:
+            break
+
+    design = _hinge_design(x, breakpoints)
+    coeffs, *_ = np.linalg.lstsq(design, y, rcond=None)
+    popt = np.concatenate([coeffs, breakpoints])
+    sse = float(np.sum((y - design @ coeffs)**2))
+    k = len(popt)
+    s2 = sse / max(n - k, 1)
+
+    try:
+        refined, pcov = curve_fit(piecewise_linear_func, x, y, p0=popt, jac=piecewise_linear_jac, maxfev=2000)
+        refined_sse = float(np.sum((y - piecewise_linear_func(x, *refined))**2))
+        if (_segment_counts_ok(x, refined[len(coeffs):], min_size)[0] and refined_sse <= sse
+                and np.all(np.isfinite(pcov))):
+            return refined, pcov, refined_sse
+    except Exception:
+        pass
+
+    # 분할점 고정 선형 최소제곱의 공분산 + 분할점은 데이터 간격이 결정하는 해상도
+    pcov = np.zeros((k, k))
+    pcov[:len(coeffs), :len(coeffs)] = s2 * np.linalg.pinv(design.T @ design)
+    for j, t in enumerate(breakpoints):
+        idx = np.searchsorted(x, t)
+        pcov[len(coeffs) + j, len(coeffs) + j] = ((x[min(idx, n - 1)] - x[max(idx - 1, 0)]) / 2)**2
+    return popt, pcov, sse
+
+
+def _to_original_units(popt, pcov, shift, scale):
+    """표준화 좌표(x' = (x - shift) / scale)의 힌지 파라미터와 공분산을 원래 좌표로 변환 (선형 변환)"""
+    k = len(popt)
+    n_breaks = (k - 2) // 2
+    transform = np.zeros((k, k))
+    offset = np.zeros(k)
+    transform[0, 0] = 1 / scale                          # a = a' / s
+    transform[1, 0], transform[1, 1] = -shift / scale, 1  # b = b' - a'·m / s
+    for j in range(n_breaks):
+        transform[2 + j, 2 + j] = 1 / scale              # c = c' / s
+        transform[2 + n_breaks + j, 2 + n_breaks + j] = scale  # t = m + s·t'
+        offset[2 + n_breaks + j] = shift
+    return transform @ popt + offset, transform @ pcov @ transform.T
+
+
+def fit_piecewise_linear(x_data, y_data, max_segments=2, min_size=MIN_SEGMENT_POINTS):
+    """
+    연속 구간별 선형 회귀 (1 ~ max_segments 구간 중 BIC로 선택)
+    분할점도 파라미터로 계산 (k구간 = 2k개 파라미터)
+    구간을 하나 늘릴 때마다 BIC가 BIC_MARGIN 이상 줄어야 채택 - 직선으로 충분하면 None (linear 모델과 중복 방지)
+
+    Parameters:
+    - x_data, y_data: 데이터 (정렬 불필요)
+    - max_segments: 최대 구간 수 (MAX_SEGMENTS 이하)
+    - min_size: 구간당 최소 데이터 개수
+
+    Returns:
+    - (popt, pcov): popt = [a, b, c₁, ..., c_(k-1), t₁, ..., t_(k-1)] (piecewise_linear_func 참고), pcov = 공분산 행렬
+    - None: 적용 불가 (데이터 부족, 분할 후보 없음, 분할점이 데이터로 뒷받침되지 않음)
+    """
+    max_segments = min(int(max_segments), MAX_SEGMENTS)
+    order = np.argsort(x_data, kind='stable')
+    x = np.asarray(x_data, dtype=float)[order]
+    y = np.asarray(y_data, dtype=float)[order]
+    n = len(x)
+
+    if max_segments < 2 or n < 2 * min_size:
+        return None
+
+    # 수치 안정성을 위해 표준화한 x에서 피팅
+    shift = x.mean()
+    scale = x.std() or 1.0
+    xs = (x - shift) / scale
+    cost = _SegmentCost(xs, y)
+
+    # 유효 분할 위치: 같은 x 값 사이는 나눌 수 없음
+    valid = np.nonzero(np.diff(x) > 0)[0] + 1
+    valid = valid[(valid >= min_size) & (valid <= n - min_size)]
+    if len(valid) == 0:
+        return None
+
+    candidates = valid
+    if len(candidates) > MAX_DP_CANDIDATES:
+        pick = np.linspace(0, len(candidates) - 1, MAX_DP_CANDIDATES).round().astype(int)
+        candidates = candidates[np.unique(pick)]
+
+    # 기준: 단일 직선 (2개 파라미터)
+    line_sse = float(cost.sse(0, n))
+    line_bic = n * np.log(max(line_sse, 1e-300) / n) + 2 * np.log(n)
+
+    best = None
+    best_bic = line_bic
+    for n_segments in range(2, max_segments + 1):
+        if n < n_segments * min_size:
+            break
+        # 불연속 모델의 최적 분할(DP)을 연속 모델의 초기값으로 사용
+        splits = _optimal_splits(cost, candidates, n, n_segments, min_size)
+        if splits is None:
+            continue
+        splits = _refine_splits(cost, splits, valid, n, min_size)
+        breakpoints = _initial_breakpoints(cost, xs, splits, n)
+        popt, pcov, sse = _fit_continuous(cost, xs, y, breakpoints, valid, min_size)
+
+        # BIC (작을수록 좋음) - 구간 수 선택 (분할점 포함 2k개 파라미터)
+        k = len(popt)
+        bic = n * np.log(max(sse, 1e-300) / n) + k * np.log(n)
+        if bic < best_bic - BIC_MARGIN:
+            best, best_bic = (popt, pcov), bic
+
+    if best is None:
+        return None
+    return _to_original_units(best[0], best[1], shift, scale)
@@ -77,6 +77,28 @@ export interface AnalysisUnit {
     rawStrings?: Record<string, string[]>; // Store raw string representations for sig-fig counting
 }
 
+export interface ChartSeries {
+    x: number[];
+    y: (number | null)[];
+}
+
+export interface ChartAxisSpec {
+    label: string;
+    unit: string;
+    range: [number | null, number | null] | null;
+    scale: 'linear' | 'log';
+}
+
+// Declarative chart description returned by /api/analyze (options.chart_spec) and report previews
+export interface ChartSpec {
+    version: number;
+    title: string;
+    axes: { x: ChartAxisSpec; y: ChartAxisSpec; residual_y: ChartAxisSpec };
+    series: { data: ChartSeries; fit: ChartSeries; residuals: ChartSeries };
+    point_count: number;
+    downsampled: boolean;
+}
+
 export interface BackendAnalysis {
     status: string;
     best_model: {
@@ -92,6 +114,7 @@ export interface BackendAnalysis {
         trendline: { x: number; y: number }[];
     };
     residuals: number[];
+    chart_spec?: ChartSpec | null;
     recommended_formulas: any[];
     data_info: {
         original_count: number;
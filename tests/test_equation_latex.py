@@ -0,0 +1,52 @@
+"""
+LaTeX Equation Tests
+모든 물리 모델 수식에 양수/음수 매개변수를 넣었을 때 중괄호 짝과 부호 표기가 올바른지 확인
+
+실행: python -m pytest -q tests
+"""
+import os
+import re
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.utils.curve_fitting import PHYSICS_MODELS, equation_to_latex  # noqa: E402
+from api.utils.piecewise_regression import piecewise_equation  # noqa: E402
+
+EQUATIONS = [(key, info['equation'], info['params']) for key, info in PHYSICS_MODELS.items()]
+EQUATIONS += [(f"piecewise_{n}", piecewise_equation(n), 2 * n) for n in (3, 4)]
+
+
+def _assert_balanced(latex):
+    depth = {'{': 0, '(': 0}
+    closing = {'}': '{', ')': '('}
+    for char in latex:
+        if char in depth:
+            depth[char] += 1
+        elif char in closing:
+            depth[closing[char]] -= 1
+            assert depth[closing[char]] >= 0, latex
+    assert depth == {'{': 0, '(': 0}, latex
+
+
+@pytest.mark.parametrize("key, equation, n_params", EQUATIONS, ids=[item[0] for item in EQUATIONS])
+@pytest.mark.parametrize("seed", range(8))
+def test_latex_is_well_formed(key, equation, n_params, seed):
+    rng = np.random.default_rng(seed)
+    params = rng.uniform(0.5, 5, n_params) * rng.choice([-1, 1], n_params)
+    latex = equation_to_latex(equation, list(params))
+
+    _assert_balanced(latex)
+    assert not re.search(r'[+-]\s*[+-]', latex), latex       # '--', '+ -' 등 중복 부호 없음
+    assert not re.search(r'(\\cdot|/)\s*-', latex), latex    # 곱/나눗셈 뒤 음수는 괄호로 감쌈
+    assert '^(' not in latex and '·' not in latex, latex
+    # 자연상수 e 외의 매개변수 문자는 모두 숫자로 치환됨
+    assert not re.search(r'(?<![A-Za-z\\])[a-dfgh](?![A-Za-wyz])|(?<![A-Za-z\\])e(?!\^)', latex.replace(' ', '')), latex
+
+
+def test_damped_sine_negative_decay():
+    latex = equation_to_latex(PHYSICS_MODELS['damped_sine']['equation'], [1.5, -2.25, 3.125, 4.0, 5.5])
+    assert latex == r"y = 1.5000 \cdot e^{2.2500x} \cdot \sin(3.1250x + 4.0000) + 5.5000"
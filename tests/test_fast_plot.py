@@ -0,0 +1,130 @@
+"""
+Fast Plot Image-Diff Tests
+Pillow 고속 경로와 matplotlib 렌더링을 축 영역 기준으로 비교 (데이터 점·곡선 위치 일치 여부)
+
+실행: python -m pytest -q tests
+"""
+import io
+import os
+import sys
+import warnings
+
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.services.plot_service import get_renderer  # noqa: E402
+
+# 축 영역을 이 크기로 축소하고 흐리게 해서 비교 (레이아웃의 몇 픽셀 차이는 흡수)
+GRID_SIZE = (64, 48)
+BLUR_RADIUS = 1.5
+MIN_CORRELATION = 0.8
+
+
+@pytest.fixture(scope="module")
+def renderer():
+    warnings.filterwarnings("ignore", category=UserWarning)  # 누락 글리프 / 동일 축 범위 경고
+    return get_renderer()
+
+
+@pytest.fixture(scope="module")
+def data():
+    x = np.linspace(1, 10, 20)
+    y = 2 * x + np.sin(x)
+    return x, y, 2 * x
+
+
+def _load(image_bytes):
+    """RGB 배열 (투명 배경은 흰색 위에 합성)"""
+    image = Image.open(io.BytesIO(image_bytes)).convert("RGBA")
+    background = Image.new("RGBA", image.size, "white")
+    return np.asarray(Image.alpha_composite(background, image).convert("RGB"), dtype=float)
+
+
+def _axes_area(pixels):
+    """검은 축 테두리(spine) 안쪽 영역"""
+    dark = pixels.mean(axis=2) < 160  # 안티앨리어싱된 1px 테두리도 포함
+    cols = np.nonzero(dark.sum(axis=0) > 0.5 * dark.sum(axis=0).max())[0]
+    rows = np.nonzero(dark.sum(axis=1) > 0.5 * dark.sum(axis=1).max())[0]
+    return pixels[rows[0] + 3:rows[-1] - 2, cols[0] + 3:cols[-1] - 2]
+
+
+def _ink(area, kind):
+    """색상별 잉크 맵 (marker: 파랑/보라 산점, line: 빨강 곡선/0선) → GRID_SIZE로 평균 축소"""
+    r, g, b = area[..., 0], area[..., 1], area[..., 2]
+    if kind == "marker":
+        mask = (b > 150) & (b - g > 50)
+    else:
+        mask = (r > 150) & (r - b > 80)
+    image = Image.fromarray((mask * 255).astype(np.uint8)).resize(GRID_SIZE, Image.BOX)
+    image = image.filter(ImageFilter.GaussianBlur(BLUR_RADIUS))
+    return np.asarray(image, dtype=float).ravel()
+
+
+def _similarity(fast_bytes, reference_bytes, kind):
+    a = _ink(_axes_area(_load(fast_bytes)), kind)
+    b = _ink(_axes_area(_load(reference_bytes)), kind)
+    return float(np.corrcoef(a, b)[0, 1])
+
+
+def _regression_pair(renderer, data, **kwargs):
+    x, y, y_pred = data
+    options = dict(x_label="t", y_label="v", title="T", **kwargs)
+    return (
+        renderer.render_regression(x, y, y_pred, fast_path=True, **options),
+        renderer.render_regression(x, y, y_pred, fast_path=False, **options)
+    )
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"x_range": [0, 12], "y_range": [-5, 25]},
+    {"x_range": [8, 2]},
+])
+def test_regression_matches_matplotlib(renderer, data, kwargs):
+    fast, reference = _regression_pair(renderer, data, **kwargs)
+    assert _similarity(fast, reference, "marker") > MIN_CORRELATION
+    assert _similarity(fast, reference, "line") > MIN_CORRELATION
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"x_range": [2, 2]},
+    {"y_range": [0, 0]},
+    {"x_range": [2, 2], "y_range": [0, 0]},
+])
+def test_degenerate_range_matches_matplotlib(renderer, kwargs):
+    # 폭이 0인 축 범위는 matplotlib처럼 ±5% 넓혀서 그림 (0으로 나누기 없음)
+    # 데이터는 넓혀진 범위 (1.9 ~ 2.1, -0.05 ~ 0.05) 안에 있도록 구성
+    x = np.linspace(1.91, 2.09, 30)
+    y = 0.03 * np.sin(40 * x)
+    fast, reference = _regression_pair(renderer, (x, y, 0.1 * (x - 2)), **kwargs)
+    assert _similarity(fast, reference, "marker") > MIN_CORRELATION
+    assert _similarity(fast, reference, "line") > MIN_CORRELATION
+
+
+def test_residual_matches_matplotlib(renderer, data):
+    x, y, y_pred = data
+    residuals = y - y_pred
+    fast = renderer.render_residual(x, residuals, x_label="t", y_label="v", fast_path=True)
+    reference = renderer.render_residual(x, residuals, x_label="t", y_label="v", fast_path=False)
+    assert _similarity(fast, reference, "marker") > MIN_CORRELATION
+    assert _similarity(fast, reference, "line") > MIN_CORRELATION
+
+
+def test_similarity_detects_different_plots(renderer, data):
+    # 비교 기준 자체의 검증: 다른 데이터를 그린 이미지는 통과하지 않아야 함
+    x, y, y_pred = data
+    fast = renderer.render_regression(x, y, y_pred, fast_path=True)
+    other = renderer.render_regression(x, -y, -y_pred, fast_path=False)
+    assert _similarity(fast, other, "marker") < MIN_CORRELATION
+    assert _similarity(fast, other, "line") < MIN_CORRELATION
+
+
+def test_inverted_range_does_not_leak(renderer, data):
+    # 재사용 figure: 뒤집힌 범위로 그린 다음 렌더링은 다시 정방향이어야 함
+    _regression_pair(renderer, data, x_range=[8, 2])
+    fast, reference = _regression_pair(renderer, data)
+    assert _similarity(fast, reference, "marker") > MIN_CORRELATION
+    assert _similarity(fast, reference, "line") > MIN_CORRELATION